@@ -0,0 +1,50 @@
+"""Keyset (cursor) pagination helpers shared by list endpoints."""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen primary key as an opaque cursor."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by ``encode_cursor``; 400 if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+        if not isinstance(last_id, int):
+            raise TypeError(last_id)
+        return last_id
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        ) from e
+
+
+def next_cursor(items: Sequence[Any], limit: int) -> str | None:
+    """Cursor for the page after ``items``, or None on the last page."""
+    if len(items) < limit or not items:
+        return None
+    return encode_cursor(items[-1].id)
+
+
+def set_next_cursor_headers(
+    request: Request, response: Response, cursor: str | None
+) -> None:
+    """Expose the next cursor as ``X-Next-Cursor`` and an RFC 8288 ``Link``."""
+    if cursor is None:
+        return
+    next_url = request.url.remove_query_params("skip").include_query_params(
+        cursor=cursor
+    )
+    response.headers["X-Next-Cursor"] = cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
@@ -6,10 +6,19 @@ from typing import Any
 from fastapi import APIRouter
 from structlog import get_logger
 
+from app.core.admission import admission_controller
+from app.core.cache import cache_response, response_cache
 from app.core.config import settings
+from app.core.logging import logging_stats
+from app.core.rate_limit import rate_limiter
+from app.core.timing import TimedAPIRoute
+from app.db.base import engine
+from app.db.pool import pool_status
+from app.db.replicas import read_router
+from app.services.postal_code_cache import postal_code_cache
 
 logger = get_logger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
 
 
 @router.get("/")  # type: ignore
@@ -24,6 +33,7 @@ async def health_check() -> dict[str, Any]:
 
 
 @router.get("/detailed")  # type: ignore
+@cache_response("health", ttl=5)
 async def detailed_health_check() -> dict[str, Any]:
     """Detailed health check with system information."""
     return {
@@ -40,4 +50,23 @@ async def detailed_health_check() -> dict[str, Any]:
         ),
         "cors_enabled": bool(settings.ALLOWED_ORIGINS),
         "redis_configured": bool(settings.REDIS_URL),
+        "postal_code_cache": postal_code_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "admission": admission_controller.stats(),
+        "logging": logging_stats(),
+    }
+
+
+@router.get("/db-pool")  # type: ignore
+async def database_pool_status() -> dict[str, Any]:
+    """Database connection pool usage and checkout wait statistics.
+
+    ``replicas`` lists the read replica pools, in ``DATABASE_READ_URLS``
+    order.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "pool": pool_status(engine),
+        "replicas": [pool_status(replica) for replica in read_router.engines],
     }
@@ -1,16 +1,22 @@
 """Postal code endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, Field, model_validator
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 
+from app.api.pagination import decode_cursor, next_cursor, set_next_cursor_headers
+from app.core.cache import cache_response
+from app.core.config import settings
+from app.core.serialization import ResponseSerializer
+from app.core.timing import TimedAPIRoute
 from app.crud.postal_code import postal_code
-from app.db.base import get_db
+from app.db.replicas import get_read_db, read_only
 from app.models.postal_code import PostalCode
+from app.services.postal_code_cache import postal_code_cache
 
 logger = get_logger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
 
 
 class PostalCodeResponse(BaseModel):
@@ -24,26 +30,107 @@ class PostalCodeResponse(BaseModel):
         from_attributes = True
 
 
+class PostalCodeBatchRequest(BaseModel):
+    """Postal codes to look up, by ID or by code string."""
+
+    ids: list[int] | None = Field(None, max_length=settings.BATCH_LOOKUP_MAX_ITEMS)
+    codes: list[str] | None = Field(None, max_length=settings.BATCH_LOOKUP_MAX_ITEMS)
+
+    @model_validator(mode="after")  # type: ignore
+    def check_one_key(self) -> "PostalCodeBatchRequest":
+        """Require exactly one of ``ids`` and ``codes``."""
+        if (self.ids is None) == (self.codes is None):
+            raise ValueError("Pass either ids or codes")
+        return self
+
+
+postal_code_list_serializer = ResponseSerializer(list[PostalCodeResponse])
+postal_code_batch_serializer = ResponseSerializer(list[PostalCodeResponse | None])
+
+
 @router.get("/", response_model=list[PostalCodeResponse])  # type: ignore
+@cache_response(
+    postal_code.cache_namespace,
+    ttl=settings.POSTAL_CODE_CACHE_TTL,
+    model=list[PostalCodeResponse],
+)
 async def get_postal_codes(
-    db: AsyncSession = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
-) -> list[PostalCode]:
-    """Get all Parisian postal codes."""
-    logger.info("Retrieving all Parisian postal codes", skip=skip, limit=limit)
-    postal_codes = await postal_code.get_multi(db, skip=skip, limit=limit)
-    return postal_codes
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+) -> list[PostalCode] | Response:
+    """Get all Parisian postal codes.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to page by
+    keyset; ``skip`` offset paging is kept for compatibility.
+    """
+    logger.info(
+        "Retrieving all Parisian postal codes", skip=skip, limit=limit, cursor=cursor
+    )
+    after_id = decode_cursor(cursor) if cursor else None
+    postal_codes = await postal_code.get_multi(
+        db, skip=skip, limit=limit, after_id=after_id
+    )
+    set_next_cursor_headers(request, response, next_cursor(postal_codes, limit))
+    return postal_code_list_serializer.respond(postal_codes, response)
+
+
+# Declared before /{postal_code_id} so "search" is not parsed as an ID
+@router.get("/search", response_model=list[PostalCodeResponse])  # type: ignore
+async def search_postal_codes(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=settings.POSTAL_CODE_SEARCH_MAX_RESULTS),
+    db: AsyncSession = Depends(get_read_db),
+) -> list[PostalCode] | Response:
+    """Type-ahead search on postal code and city name prefixes.
+
+    ``750`` returns the 20 Paris codes, ``paris 1`` the 1st then the
+    10th-19th arrondissements; case, accents and hyphens in city names are ignored.
+    """
+    results = await postal_code_cache.search(db, q, limit=limit)
+    return postal_code_list_serializer.respond(results, response)
+
+
+@router.post("/batch", response_model=list[PostalCodeResponse | None])  # type: ignore
+@read_only
+async def get_postal_codes_batch(
+    batch: PostalCodeBatchRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+) -> list[PostalCode | None] | Response:
+    """Look up many postal codes at once.
+
+    Results are in request order, with null for each unknown ID or code.
+    """
+    logger.info(
+        "Retrieving postal codes in batch",
+        ids=len(batch.ids or ()),
+        codes=len(batch.codes or ()),
+    )
+    if batch.ids is not None:
+        results = await postal_code_cache.get_many(db, batch.ids)
+    else:
+        results = await postal_code_cache.get_many_by_postal_code(db, batch.codes or [])
+    return postal_code_batch_serializer.respond(results, response)
 
 
 @router.get("/{postal_code_id}", response_model=PostalCodeResponse)  # type: ignore
+@cache_response(
+    postal_code.cache_namespace,
+    ttl=settings.POSTAL_CODE_CACHE_TTL,
+    model=PostalCodeResponse,
+)
 async def get_postal_code(
-    postal_code_id: int, db: AsyncSession = Depends(get_db)
+    postal_code_id: int, db: AsyncSession = Depends(get_read_db)
 ) -> PostalCode:
     """Get a specific postal code by ID."""
     logger.info("Retrieving postal code", postal_code_id=postal_code_id)
 
-    db_postal_code = await postal_code.get(db, id=postal_code_id)
+    db_postal_code = await postal_code_cache.get(db, id=postal_code_id)
     if not db_postal_code:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,15 +140,18 @@ async def get_postal_code(
 
 
 @router.get("/by-code/{postal_code_str}", response_model=PostalCodeResponse)  # type: ignore
+@cache_response(
+    postal_code.cache_namespace,
+    ttl=settings.POSTAL_CODE_CACHE_TTL,
+    model=PostalCodeResponse,
+)
 async def get_postal_code_by_code(
-    postal_code_str: str, db: AsyncSession = Depends(get_db)
+    postal_code_str: str, db: AsyncSession = Depends(get_read_db)
 ) -> PostalCode:
     """Get a specific postal code by postal code string."""
     logger.info("Retrieving postal code by code", postal_code=postal_code_str)
 
-    db_postal_code = await postal_code.get_by_postal_code(
-        db, postal_code=postal_code_str
-    )
+    db_postal_code = await postal_code_cache.get_by_postal_code(db, postal_code_str)
     if not db_postal_code:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
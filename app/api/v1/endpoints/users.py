@@ -1,17 +1,43 @@
 """User endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+import csv
+import io
+from collections.abc import AsyncIterator, Callable
+from typing import Any, Literal
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 
+from app.api.pagination import decode_cursor, next_cursor, set_next_cursor_headers
+from app.api.v1.endpoints.postal_codes import PostalCodeResponse
+from app.core.cache import cache_response
+from app.core.config import settings
+from app.core.rate_limit import rate_limit
+from app.core.serialization import ResponseSerializer
+from app.core.timing import TimedAPIRoute
 from app.crud.postal_code import postal_code
 from app.crud.user import user
 from app.db.base import get_db
+from app.db.errors import is_foreign_key_violation, is_unique_violation
+from app.db.replicas import get_read_db, get_read_session_factory, read_only
 from app.models.user import User
+from app.services.postal_code_cache import postal_code_cache
 
 logger = get_logger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
 
 
 class UserBase(BaseModel):
@@ -40,55 +66,185 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserWithPostalCodeResponse(UserResponse):
+    """User response model with the postal code embedded."""
+
+    postal_code: PostalCodeResponse | None
+
+
+class BulkUserError(BaseModel):
+    """A record rejected by bulk user creation."""
+
+    index: int
+    email: str
+    detail: str
+
+
+class BulkUserCreateResponse(BaseModel):
+    """Bulk user creation result."""
+
+    created: list[UserResponse]
+    errors: list[BulkUserError]
+
+
+class UserBatchRequest(BaseModel):
+    """Users to look up by ID."""
+
+    ids: list[int] = Field(..., max_length=settings.BATCH_LOOKUP_MAX_ITEMS)
+
+
+user_list_serializer = ResponseSerializer(list[UserResponse])
+user_with_postal_code_serializer = ResponseSerializer(UserWithPostalCodeResponse)
+user_with_postal_code_list_serializer = ResponseSerializer(
+    list[UserWithPostalCodeResponse]
+)
+user_batch_serializer = ResponseSerializer(list[UserResponse | None])
+
+
+def _constraint_violation(exc: IntegrityError) -> HTTPException:
+    """Map a failed user write to the 400 the old pre-checks returned."""
+    if is_unique_violation(exc):
+        detail = "User with this email already exists"
+    elif is_foreign_key_violation(exc):
+        detail = "Invalid postal code ID"
+    else:
+        detail = "Invalid user data"
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
 @router.get("/", response_model=list[UserResponse])  # type: ignore
 async def get_users(
-    db: AsyncSession = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
-) -> list[User]:
-    """Get all users."""
-    logger.info("Retrieving all users", skip=skip, limit=limit)
-    users = await user.get_multi(db, skip=skip, limit=limit)
-    return users
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    include: Literal["postal_code"] | None = None,
+) -> list[User] | Response:
+    """Get all users.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to page by
+    keyset; ``skip`` offset paging is kept for compatibility. With
+    ``include=postal_code`` each user embeds its postal code object.
+    """
+    logger.info(
+        "Retrieving all users", skip=skip, limit=limit, cursor=cursor, include=include
+    )
+    after_id = decode_cursor(cursor) if cursor else None
+    users = await user.get_multi(
+        db,
+        skip=skip,
+        limit=limit,
+        after_id=after_id,
+        include_postal_code=include == "postal_code",
+    )
+    set_next_cursor_headers(request, response, next_cursor(users, limit))
+    if include == "postal_code":
+        # Always pre-rendered: response_model would drop the nested object
+        return user_with_postal_code_list_serializer.response(
+            users, headers_from=response
+        )
+    return user_list_serializer.respond(users, response)
+
+
+def _ndjson_batch(rows: list[UserResponse], _: bool) -> str:
+    return "".join(row.model_dump_json() + "\n" for row in rows)
+
+
+def _csv_batch(rows: list[UserResponse], include_header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(UserResponse.model_fields))
+    if include_header:
+        writer.writeheader()
+    writer.writerows(row.model_dump() for row in rows)
+    return buffer.getvalue()
+
+
+EXPORT_FORMATS: dict[str, tuple[str, Callable[[list[UserResponse], bool], str]]] = {
+    "ndjson": ("application/x-ndjson", _ndjson_batch),
+    "csv": ("text/csv", _csv_batch),
+}
+
+
+@router.get("/export", response_class=StreamingResponse)  # type: ignore
+async def export_users(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    session_factory: Any = Depends(get_read_session_factory),
+) -> StreamingResponse:
+    """Stream every user as NDJSON or CSV.
+
+    Rows are fetched and serialized one batch at a time, so memory use stays
+    flat regardless of table size.
+    """
+    logger.info("Exporting users", format=format)
+    media_type, render_batch = EXPORT_FORMATS[format]
+
+    async def generate() -> AsyncIterator[str]:
+        # The request's dependencies are torn down before streaming starts,
+        # so the export owns its session.
+        async with session_factory() as db:
+            first = True
+            async for batch in user.stream_all(
+                db, batch_size=settings.EXPORT_BATCH_SIZE
+            ):
+                rows = [UserResponse.model_validate(row) for row in batch]
+                yield render_batch(rows, first)
+                first = False
+            if first and format == "csv":
+                yield render_batch([], True)
+
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
 
 
 @router.get("/{user_id}", response_model=UserResponse)  # type: ignore
-async def get_user(user_id: int, db: AsyncSession = Depends(get_db)) -> User:
-    """Get a specific user by ID."""
-    logger.info("Retrieving user", user_id=user_id)
-
-    db_user = await user.get(db, id=user_id)
+@cache_response(
+    user.cache_namespace,
+    model=UserResponse,
+    depends_on=(postal_code.cache_namespace,),
+)
+async def get_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    include: Literal["postal_code"] | None = None,
+) -> User | Response:
+    """Get a specific user by ID.
+
+    With ``include=postal_code`` the user embeds its postal code object,
+    loaded in the same query.
+    """
+    logger.info("Retrieving user", user_id=user_id, include=include)
+
+    db_user = await user.get(
+        db, id=user_id, include_postal_code=include == "postal_code"
+    )
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
+    if include == "postal_code":
+        return user_with_postal_code_serializer.response(db_user)
     return db_user
 
 
 @router.post(
-    "/", response_model=UserResponse, status_code=status.HTTP_201_CREATED
+    "/",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    # Each request runs bcrypt, so one client could otherwise hold a worker
+    dependencies=[Depends(rate_limit("users:create", settings.RATE_LIMIT_USER_CREATE))],
 )  # type: ignore
 async def create_user(user_in: UserCreate, db: AsyncSession = Depends(get_db)) -> User:
     """Create a new user."""
     logger.info("Creating new user", email=user_in.email)
 
-    # Check if user already exists
-    existing_user = await user.get_by_email(db, email=user_in.email)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email already exists",
-        )
-
-    # Validate postal code if provided
-    if user_in.postal_code_id is not None:
-        db_postal_code = await postal_code.get(db, id=user_in.postal_code_id)
-        if not db_postal_code:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid postal code ID",
-            )
+    # The email and postal code are checked by the unique and foreign key
+    # constraints on insert, saving a round trip each
 
     # Create user data dict
     user_data = {
@@ -101,10 +257,107 @@ async def create_user(user_in: UserCreate, db: AsyncSession = Depends(get_db)) -
         "postal_code_id": user_in.postal_code_id,
     }
 
-    db_user = await user.create(db, obj_in=user_data)
+    try:
+        db_user = await user.create(db, obj_in=user_data)
+    except IntegrityError as e:
+        await db.rollback()
+        raise _constraint_violation(e) from e
     return db_user
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkUserCreateResponse,
+    dependencies=[
+        Depends(rate_limit("users:bulk-create", settings.RATE_LIMIT_USER_BULK_CREATE))
+    ],
+)  # type: ignore
+async def create_users_bulk(
+    users_in: list[UserCreate] = Body(..., max_length=settings.BULK_CREATE_MAX_ITEMS),
+    db: AsyncSession = Depends(get_db),
+) -> BulkUserCreateResponse:
+    """Create many users at once, reporting rejected records individually.
+
+    Emails and postal codes are validated with set-based lookups, and valid
+    records are inserted in chunks of ``BULK_CREATE_CHUNK_SIZE``, one
+    transaction per chunk. A record a constraint still rejects, after a
+    concurrent write, is reported on its own.
+    """
+    logger.info("Creating users in bulk", count=len(users_in))
+    errors: list[BulkUserError] = []
+
+    def reject(index: int, detail: str) -> None:
+        errors.append(
+            BulkUserError(index=index, email=users_in[index].email, detail=detail)
+        )
+
+    chunk_size = settings.BULK_CREATE_CHUNK_SIZE
+    existing_emails: set[str] = set()
+    emails = list({user_in.email for user_in in users_in})
+    for start in range(0, len(emails), chunk_size):
+        existing_emails |= await user.get_existing_emails(
+            db, emails[start : start + chunk_size]
+        )
+    valid_postal_code_ids = await postal_code_cache.get_existing_ids(
+        db,
+        {u.postal_code_id for u in users_in if u.postal_code_id is not None},
+    )
+
+    accepted: list[int] = []
+    seen_emails: set[str] = set()
+    for index, user_in in enumerate(users_in):
+        if user_in.email in existing_emails or user_in.email in seen_emails:
+            reject(index, "User with this email already exists")
+        elif (
+            user_in.postal_code_id is not None
+            and user_in.postal_code_id not in valid_postal_code_ids
+        ):
+            reject(index, "Invalid postal code ID")
+        else:
+            seen_emails.add(user_in.email)
+            accepted.append(index)
+
+    # End the validation reads' transaction, so no pooled connection sits
+    # idle in it while the passwords of each chunk are hashed
+    await db.rollback()
+
+    created: list[User] = []
+    for start in range(0, len(accepted), chunk_size):
+        chunk = accepted[start : start + chunk_size]
+        results = await user.create_many(
+            db, objs_in=[users_in[index].model_dump() for index in chunk]
+        )
+        for index, result in zip(chunk, results, strict=True):
+            if isinstance(result, IntegrityError):
+                # A concurrent writer won a race on this email
+                reject(index, str(_constraint_violation(result).detail))
+            else:
+                created.append(result)
+
+    errors.sort(key=lambda error: error.index)
+    logger.info("Bulk user creation done", created=len(created), errors=len(errors))
+    return BulkUserCreateResponse(
+        created=[UserResponse.model_validate(db_user) for db_user in created],
+        errors=errors,
+    )
+
+
+@router.post("/batch", response_model=list[UserResponse | None])  # type: ignore
+@read_only
+async def get_users_batch(
+    batch: UserBatchRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+) -> list[User | None] | Response:
+    """Look up many users at once with one query.
+
+    Results are in request order, with null for each unknown ID.
+    """
+    logger.info("Retrieving users in batch", count=len(batch.ids))
+    users = await user.get_many(db, batch.ids)
+    return user_batch_serializer.respond(users, response)
+
+
 @router.put("/{user_id}", response_model=UserResponse)  # type: ignore
 async def update_user(
     user_id: int,
@@ -114,33 +367,17 @@ async def update_user(
     """Update a user."""
     logger.info("Updating user", user_id=user_id)
 
-    db_user = await user.get(db, id=user_id)
+    user_data = user_in.model_dump(exclude_unset=True)
+    try:
+        db_user = await user.update_by_id(db, id=user_id, obj_in=user_data)
+    except IntegrityError as e:
+        await db.rollback()
+        raise _constraint_violation(e) from e
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-
-    # Check if email is being changed and if it already exists
-    if user_in.email != db_user.email:
-        existing_user = await user.get_by_email(db, email=user_in.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User with this email already exists",
-            )
-
-    # Validate postal code if provided
-    if user_in.postal_code_id is not None:
-        db_postal_code = await postal_code.get(db, id=user_in.postal_code_id)
-        if not db_postal_code:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid postal code ID",
-            )
-
-    user_data = user_in.model_dump(exclude_unset=True)
-    db_user = await user.update(db, db_obj=db_user, obj_in=user_data)
     return db_user
 
 
@@ -0,0 +1,303 @@
+"""Admission control: cap the requests each worker works on at once.
+
+When the database slows down, requests otherwise pile up waiting for pool
+connections until they all time out together. ``AdmissionControlMiddleware``
+admits at most ``limit`` reads and ``limit`` writes at a time per worker; a
+request over the limit waits in a short FIFO queue for up to the queue
+timeout, and is answered 503 with ``Retry-After`` when the queue is full or
+its wait runs out. Clients retry quickly and healthy requests keep
+finishing within their deadlines.
+
+With ``ADMISSION_ADAPTIVE`` the limits follow observed latency (AIMD):
+they grow by one per window of fast requests while they are being used, and
+shrink by ``backoff`` when requests take longer than the latency target.
+Latency is measured to the start of the response, so long streamed bodies
+such as exports do not read as congestion.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Iterable
+from contextlib import suppress
+from typing import Any
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+from structlog import get_logger
+
+from app.core.config import settings
+from app.core.metrics import record_admission_rejection
+
+logger = get_logger(__name__)
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AIMDLimit:
+    """Concurrency limit adjusted by additive increase, multiplicative decrease.
+
+    Each request finished under ``latency_target`` while the limit is at
+    least half used adds ``1 / limit``, so the limit grows by about one per
+    limit's worth of requests. A slower or failed request multiplies it by
+    ``backoff``, at most once per ``latency_target`` so a burst of slow
+    completions counts as one congestion signal.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        *,
+        minimum: int,
+        maximum: int,
+        latency_target: float,
+        backoff: float = 0.9,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._last_decrease = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        """Current limit."""
+        return int(self._limit)
+
+    def update(self, latency: float, in_flight: int, failed: bool = False) -> None:
+        """Adjust the limit after a request took ``latency`` seconds."""
+        if failed or latency > self.latency_target:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency_target:
+                self._last_decrease = now
+                self._limit = max(self.minimum, self._limit * self.backoff)
+        elif in_flight * 2 >= self._limit:
+            self._limit = min(self.maximum, self._limit + 1 / self._limit)
+
+
+class AdmissionGate:
+    """Counting gate with a bounded FIFO queue of waiting requests."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        limit: int,
+        max_queue: int,
+        adaptive: AIMDLimit | None = None,
+    ) -> None:
+        self.name = name
+        self.max_queue = max(0, max_queue)
+        self.adaptive = adaptive
+        self._static_limit = max(1, limit)
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def limit(self) -> int:
+        """Maximum number of requests admitted at once."""
+        return self.adaptive.limit if self.adaptive else self._static_limit
+
+    @property
+    def in_flight(self) -> int:
+        """Number of admitted requests not yet finished."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting up to ``timeout`` seconds in the queue.
+
+        Returns False, without a slot, when the queue is full or the wait
+        runs out.
+        """
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            self.admitted += 1
+            return True
+        if timeout <= 0 or len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        # release() hands its slot straight to the oldest waiter
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            with suppress(ValueError):
+                self._waiters.remove(waiter)
+        if waiter.done() and not waiter.cancelled():
+            self.admitted += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def release(self, latency: float | None = None, failed: bool = False) -> None:
+        """Free a slot; ``latency`` feeds the adaptive limit, if any."""
+        if self.adaptive is not None and latency is not None:
+            self.adaptive.update(latency, self._in_flight, failed)
+        self._in_flight -= 1
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._in_flight += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for the health endpoint."""
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionController:
+    """A read gate and a write gate, so slow writes cannot starve reads."""
+
+    def __init__(
+        self,
+        *,
+        read_limit: int,
+        write_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        adaptive: bool = False,
+        min_limit: int = 1,
+        latency_target: float = 0.25,
+        exempt_paths: Iterable[str] = (),
+        enabled: bool = True,
+    ) -> None:
+        def gate(name: str, limit: int) -> AdmissionGate:
+            aimd = (
+                AIMDLimit(
+                    limit,
+                    minimum=min_limit,
+                    maximum=limit,
+                    latency_target=latency_target,
+                )
+                if adaptive
+                else None
+            )
+            return AdmissionGate(name, limit=limit, max_queue=max_queue, adaptive=aimd)
+
+        self.read = gate("read", read_limit)
+        self.write = gate("write", write_limit)
+        self.queue_timeout = queue_timeout
+        self.exempt_paths = tuple(path.rstrip("/") for path in exempt_paths)
+        self.enabled = enabled
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        """Build the controller configured by ``ADMISSION_*`` settings."""
+        return cls(
+            read_limit=settings.ADMISSION_READ_LIMIT,
+            write_limit=settings.ADMISSION_WRITE_LIMIT,
+            max_queue=settings.ADMISSION_QUEUE_SIZE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+            adaptive=settings.ADMISSION_ADAPTIVE,
+            min_limit=settings.ADMISSION_MIN_LIMIT,
+            latency_target=settings.ADMISSION_LATENCY_TARGET_MS / 1000,
+            exempt_paths=settings.ADMISSION_EXEMPT_PATHS,
+            enabled=settings.ADMISSION_CONTROL_ENABLED,
+        )
+
+    def is_exempt(self, path: str) -> bool:
+        """Whether ``path`` bypasses admission control (health checks)."""
+        return any(
+            path == exempt or path.startswith(exempt + "/")
+            for exempt in self.exempt_paths
+        )
+
+    def gate_for(self, method: str) -> AdmissionGate:
+        """The gate requests with ``method`` go through."""
+        return self.read if method in READ_METHODS else self.write
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for the health endpoint."""
+        return {
+            "enabled": self.enabled,
+            "read": self.read.stats(),
+            "write": self.write.stats(),
+        }
+
+
+admission_controller = AdmissionController.from_settings()
+
+
+class AdmissionControlMiddleware:
+    """Admit requests through ``controller``; 503 the ones it turns away."""
+
+    def __init__(
+        self, app: ASGIApp, controller: AdmissionController | None = None
+    ) -> None:
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.controller.is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        gate = self.controller.gate_for(scope["method"])
+        if not await gate.acquire(self.controller.queue_timeout):
+            logger.warning(
+                "Rejecting request, admission limit reached",
+                gate=gate.name,
+                limit=gate.limit,
+                path=scope["path"],
+            )
+            record_admission_rejection(gate.name)
+            await _busy(send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+        latency: float | None = None
+
+        async def send_wrapper(message: Any) -> None:
+            nonlocal status_code, latency
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Time to headers: a streamed body's length is set by its
+                # size and the client's reading speed, not by congestion
+                latency = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if latency is None:
+                latency = time.perf_counter() - start
+            # The slot is held until the body is sent
+            gate.release(latency, failed=status_code >= 500)
+
+
+async def _busy(send: Send) -> None:
+    body = b'{"detail":"Server busy, please retry"}'
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", b"1"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
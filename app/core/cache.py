@@ -0,0 +1,408 @@
+"""Response caching for GET endpoints.
+
+``cache_response`` stores the serialized body of an endpoint in a pluggable
+backend (Redis when ``REDIS_URL`` is configured, an in-process LRU
+otherwise), tags it with an ``ETag`` and answers ``If-None-Match`` with 304.
+
+Entries are grouped in namespaces (``"users"``, ``"postal-codes"``, ...).
+Every key embeds its namespace's version number, so CRUD writes invalidate a
+whole namespace with a single ``invalidate`` call instead of tracking keys.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+from structlog import get_logger
+
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.core.redis import get_redis
+from app.core.serialization import BODY_HEADERS, ResponseSerializer
+
+logger = get_logger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# Response headers that must not be replayed from the cache
+_UNCACHED_HEADERS = BODY_HEADERS | {"etag", "set-cookie"}
+
+
+class CacheBackend(ABC):
+    """Byte-oriented key/value store used by ``ResponseCache``."""
+
+    name: str
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Return the value stored under ``key``, or ``None``."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int:
+        """Return the integer counter stored under ``key`` (0 if unset)."""
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Increment the counter stored under ``key`` and return it."""
+
+    @abstractmethod
+    async def clear(self, prefix: str) -> None:
+        """Delete every key starting with ``prefix``."""
+
+
+class InMemoryLRUBackend(CacheBackend):
+    """Per-process LRU with per-entry expiry.
+
+    Invalidation only reaches the current process, so with several workers a
+    stale entry can be served until its TTL runs out; configure Redis for
+    shared invalidation.
+    """
+
+    name = "memory"
+
+    def __init__(self, *, max_entries: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> bytes | None:
+        """Return the value stored under ``key``, or ``None``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_counter(self, key: str) -> int:
+        """Return the integer counter stored under ``key`` (0 if unset)."""
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        """Increment the counter stored under ``key`` and return it."""
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def clear(self, prefix: str) -> None:
+        """Delete every key starting with ``prefix``."""
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+        for key in [k for k in self._counters if k.startswith(prefix)]:
+            del self._counters[key]
+
+
+class RedisBackend(CacheBackend):
+    """Backend shared by every worker through a Redis server."""
+
+    name = "redis"
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    async def get(self, key: str) -> bytes | None:
+        """Return the value stored under ``key``, or ``None``."""
+        value = await self.client.get(key)
+        return bytes(value) if value is not None else None
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+        await self.client.set(key, value, ex=ttl)
+
+    async def get_counter(self, key: str) -> int:
+        """Return the integer counter stored under ``key`` (0 if unset)."""
+        value = await self.client.get(key)
+        return int(value) if value is not None else 0
+
+    async def incr(self, key: str) -> int:
+        """Increment the counter stored under ``key`` and return it."""
+        return int(await self.client.incr(key))
+
+    async def clear(self, prefix: str) -> None:
+        """Delete every key starting with ``prefix``."""
+        keys = [key async for key in self.client.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+@dataclass
+class CachedResponse:
+    """A serialized response body with the headers to replay."""
+
+    body: bytes
+    etag: str
+    headers: dict[str, str]
+
+    def encode(self) -> bytes:
+        """Serialize for storage in a backend."""
+        meta = json.dumps({"etag": self.etag, "headers": self.headers})
+        return meta.encode() + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CachedResponse":
+        """Inverse of ``encode``."""
+        meta, _, body = data.partition(b"\n")
+        fields = json.loads(meta)
+        return cls(body=body, etag=fields["etag"], headers=fields["headers"])
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """Whether an ``If-None-Match`` header value matches ``etag``."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """Namespaced, versioned response cache on top of a ``CacheBackend``.
+
+    Backend errors are logged and treated as misses so an unavailable Redis
+    degrades to uncached responses rather than failed requests.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        *,
+        prefix: str,
+        default_ttl: int,
+        enabled: bool = True,
+    ) -> None:
+        self.backend = backend
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.errors = 0
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.prefix}:version:{namespace}"
+
+    async def key_for(
+        self, namespace: str, request: Request, depends_on: tuple[str, ...] = ()
+    ) -> str:
+        """Derive the cache key for ``request`` from its path and query.
+
+        The key embeds the version of ``namespace`` and of each namespace in
+        ``depends_on``, so invalidating any of them retires the entry.
+        """
+        versions = [
+            str(await self.backend.get_counter(self._version_key(name)))
+            for name in (namespace, *depends_on)
+        ]
+        version = ".".join(versions)
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{self.prefix}:{namespace}:v{version}:{request.url.path}?{query}"
+
+    async def get(self, key: str) -> CachedResponse | None:
+        """Return the cached response stored under ``key``, if any."""
+        try:
+            data = await self.backend.get(key)
+            entry = CachedResponse.decode(data) if data is not None else None
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Response cache read failed", key=key, error=str(e))
+            return None
+        record_cache_lookup("response", entry is not None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse, ttl: int) -> None:
+        """Store ``entry`` under ``key`` for ``ttl`` seconds."""
+        try:
+            await self.backend.set(key, entry.encode(), ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Response cache write failed", key=key, error=str(e))
+
+    async def invalidate(self, namespace: str) -> None:
+        """Drop every cached response in ``namespace``."""
+        if not self.enabled:
+            return
+        try:
+            await self.backend.incr(self._version_key(namespace))
+        except Exception as e:
+            self.errors += 1
+            logger.error(
+                "Response cache invalidation failed", namespace=namespace, error=str(e)
+            )
+
+    async def clear(self) -> None:
+        """Drop every entry and namespace version."""
+        await self.backend.clear(f"{self.prefix}:")
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for the health endpoint."""
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+        }
+
+
+def create_backend() -> CacheBackend:
+    """Use Redis when configured, the in-process LRU otherwise."""
+    client = get_redis()
+    if client is not None:
+        return RedisBackend(client)
+    return InMemoryLRUBackend(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(
+    create_backend(),
+    prefix=settings.RESPONSE_CACHE_PREFIX,
+    default_ttl=settings.RESPONSE_CACHE_DEFAULT_TTL,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
+
+
+def _not_modified(entry: CachedResponse) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={**entry.headers, "ETag": entry.etag},
+    )
+
+
+def _replay(entry: CachedResponse, cache_status: str) -> Response:
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers={**entry.headers, "ETag": entry.etag, "X-Cache": cache_status},
+    )
+
+
+def cache_response(
+    namespace: str,
+    *,
+    ttl: int | None = None,
+    model: Any = Any,
+    depends_on: tuple[str, ...] = (),
+) -> Callable[[F], F]:
+    """Cache a GET endpoint's response in ``namespace``.
+
+    Apply below the router decorator. The endpoint result is validated and
+    serialized with ``model`` (normally the route's ``response_model``);
+    headers the endpoint sets on its ``Response`` parameter are cached with
+    the body. An endpoint that renders its own 200 ``Response`` is cached
+    as-is. Errors raised by the endpoint are never cached. Responses that
+    embed rows from other namespaces list them in ``depends_on`` so they
+    are invalidated with those rows too.
+    """
+    serializer = ResponseSerializer(model)
+
+    def decorator(func: F) -> F:
+        signature = inspect.signature(func)
+        parameters = list(signature.parameters.values())
+        names = {param.name: param.annotation for param in parameters}
+        request_name = next((n for n, a in names.items() if a is Request), None)
+        response_name = next((n for n, a in names.items() if a is Response), None)
+        if request_name is None:
+            request_name = "_cache_request"
+            parameters.append(
+                inspect.Parameter(
+                    request_name, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+                )
+            )
+        if response_name is None:
+            response_name = "_cache_response"
+            parameters.append(
+                inspect.Parameter(
+                    response_name, inspect.Parameter.KEYWORD_ONLY, annotation=Response
+                )
+            )
+        injected = {request_name, response_name} - set(signature.parameters)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request: Request = kwargs[request_name]
+            response: Response = kwargs[response_name]
+            for name in injected:
+                del kwargs[name]
+
+            if not response_cache.enabled:
+                return await func(*args, **kwargs)
+
+            if_none_match = request.headers.get("if-none-match")
+            try:
+                key = await response_cache.key_for(namespace, request, depends_on)
+            except Exception as e:
+                response_cache.errors += 1
+                logger.warning(
+                    "Response cache unavailable, serving uncached",
+                    namespace=namespace,
+                    error=str(e),
+                )
+                return await func(*args, **kwargs)
+            entry = await response_cache.get(key)
+            if entry is not None:
+                if etag_matches(entry.etag, if_none_match):
+                    response_cache.not_modified += 1
+                    return _not_modified(entry)
+                return _replay(entry, "HIT")
+
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code != status.HTTP_200_OK:
+                    return result
+                body, response = bytes(result.body), result
+            else:
+                body = serializer.dump(result)
+            headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name not in _UNCACHED_HEADERS
+            }
+            entry = CachedResponse(body=body, etag=compute_etag(body), headers=headers)
+            await response_cache.set(
+                key, entry, ttl if ttl is not None else response_cache.default_ttl
+            )
+            if etag_matches(entry.etag, if_none_match):
+                response_cache.not_modified += 1
+                return _not_modified(entry)
+            return _replay(entry, "MISS")
+
+        wrapper.__signature__ = signature.replace(  # type: ignore[attr-defined]
+            parameters=parameters
+        )
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
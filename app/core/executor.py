@@ -0,0 +1,145 @@
+"""Bounded executor pools for offloading blocking work from the event loop."""
+
+import asyncio
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from structlog import get_logger
+
+from app.core.metrics import record_executor_depth, record_executor_rejection
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a bounded executor has no free worker or queue slot."""
+
+    def __init__(self, name: str, limit: int) -> None:
+        super().__init__(f"Executor '{name}' is saturated ({limit} tasks in flight)")
+        self.name = name
+        self.limit = limit
+
+
+class BoundedExecutor:
+    """Thread or process pool with a queue-depth limit.
+
+    At most ``max_workers`` tasks run concurrently and at most ``max_queue``
+    more wait for a worker. Submitting beyond that raises
+    ``ExecutorSaturatedError`` immediately instead of queueing without bound,
+    so callers can shed load (the API maps it to a 503).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_workers: int,
+        max_queue: int,
+        kind: str = "thread",
+    ) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor kind: {kind}")
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.kind = kind
+        self._executor: Executor | None = None
+        self._in_flight = 0
+        # Set whenever a slot is freed; map() waits on it for capacity
+        self._slot_freed = asyncio.Event()
+
+    @property
+    def limit(self) -> int:
+        """Maximum number of running plus queued tasks."""
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        """Number of tasks currently running or queued."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a free worker."""
+        return max(0, self._in_flight - self.max_workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` in the pool, failing fast when saturated."""
+        if self._in_flight >= self.limit:
+            logger.warning(
+                "Executor saturated",
+                executor=self.name,
+                in_flight=self._in_flight,
+                limit=self.limit,
+            )
+            record_executor_rejection(self.name)
+            raise ExecutorSaturatedError(self.name, self.limit)
+
+        return await self._submit(func, *args)
+
+    async def map(
+        self,
+        func: Callable[[Any], T],
+        items: Iterable[Any],
+        *,
+        concurrency: int | None = None,
+    ) -> list[T]:
+        """Run ``func`` over ``items`` in the pool, preserving order.
+
+        Meant for batch jobs: at most ``concurrency`` (default: one per
+        worker) items are submitted at once, and when the pool is saturated
+        by other callers the batch waits for a free slot instead of failing.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.max_workers)
+
+        async def call(item: Any) -> T:
+            async with semaphore:
+                while self._in_flight >= self.limit:
+                    self._slot_freed.clear()
+                    await self._slot_freed.wait()
+                return await self._submit(func, item)
+
+        return list(await asyncio.gather(*(call(item) for item in items)))
+
+    async def _submit(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(func, *args)
+        self._in_flight += 1
+        record_executor_depth(self.name, self._in_flight, self.queue_depth)
+
+        def release(_: Future[T]) -> None:
+            # The slot is held until the task finishes, not until its caller
+            # stops waiting: a cancelled caller leaves the task running
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:  # the loop is closed; nobody waits for a slot
+                self._release()
+
+        # Added before wrap_future's callback, so the slot is free by the
+        # time the caller resumes
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        record_executor_depth(self.name, self._in_flight, self.queue_depth)
+        self._slot_freed.set()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying pool; it is recreated on next use."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -1,24 +1,74 @@
-"""Structured logging configuration using structlog."""
+"""Structured logging configuration using structlog.
 
+Log lines are rendered to JSON by structlog in the calling coroutine. With
+``LOG_ASYNC`` enabled the rendered line is handed to a bounded queue and a
+``QueueListener`` thread writes it to stdout, so a slow stdout pipe never
+blocks the event loop; when the queue is full new lines are dropped and
+counted rather than waited on.
+"""
+
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
+import orjson
 import structlog
 from structlog.stdlib import LoggerFactory
 
 from app.core.config import settings
 
+logger = structlog.get_logger(__name__)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when full."""
+
+    def __init__(self, log_queue: queue.Queue[logging.LogRecord]) -> None:
+        super().__init__(log_queue)
+        self.queue: queue.Queue[logging.LogRecord] = log_queue
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queue ``record``, or count it as dropped if the queue is full."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: logging.Handler | None = None
+_listener: QueueListener | None = None
+
+
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    return orjson.dumps(obj, default=str).decode()
+
 
 def setup_logging() -> None:
-    """Configure structured logging with structlog."""
+    """Configure structured logging with structlog.
+
+    Safe to call again: the handler installed by a previous call is
+    replaced, so settings changes (level, ``LOG_ASYNC``) take effect.
+    """
+    global _handler, _listener
+
+    shutdown_logging()
 
     # Configure standard library logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, settings.LOG_LEVEL.upper()),
-    )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    if settings.LOG_ASYNC:
+        _handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        _listener = QueueListener(_handler.queue, stream_handler)
+        _listener.start()
+    else:
+        _handler = stream_handler
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
 
     # Configure structlog
     structlog.configure(
@@ -32,7 +82,7 @@ def setup_logging() -> None:
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
             (
-                structlog.processors.JSONRenderer()
+                structlog.processors.JSONRenderer(serializer=_orjson_dumps)
                 if settings.LOG_FORMAT == "json"
                 else structlog.dev.ConsoleRenderer()
             ),
@@ -44,19 +94,57 @@ def setup_logging() -> None:
     )
 
 
+def shutdown_logging() -> None:
+    """Flush queued log lines and remove the handler ``setup_logging`` added."""
+    global _handler, _listener
+    dropped = getattr(_handler, "dropped", 0)
+    if dropped:
+        # Logged while the listener still runs, so stop() flushes it
+        logger.warning("Log records were dropped", dropped=dropped)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+
+
+atexit.register(shutdown_logging)
+
+
+def logging_stats() -> dict[str, Any]:
+    """Queue usage and drop counter of the async logging pipeline."""
+    if not isinstance(_handler, DroppingQueueHandler):
+        return {"async": False}
+    return {
+        "async": True,
+        "queued": _handler.queue.qsize(),
+        "max_queued": settings.LOG_QUEUE_SIZE,
+        "dropped": _handler.dropped,
+    }
+
+
 def get_logger(name: str) -> structlog.stdlib.BoundLogger:
     """Get a structured logger instance."""
     return structlog.get_logger(name)
 
 
-def log_request_info(request: Any, response: Any) -> None:
-    """Log request and response information."""
+def log_request_info(
+    request: Any, status_code: int, *, slow: bool = False, **fields: Any
+) -> None:
+    """Log request and response information.
+
+    Extra ``fields`` (timings, route template, ...) are added to the line;
+    slow requests are logged at warning level.
+    """
     logger = get_logger(__name__)
-    logger.info(
-        "Request processed",
+    log = logger.warning if slow else logger.info
+    log(
+        "Slow request" if slow else "Request processed",
         method=request.method,
         url=str(request.url),
-        status_code=response.status_code,
+        status_code=status_code,
         client_ip=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent"),
+        **fields,
     )
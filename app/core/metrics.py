@@ -0,0 +1,224 @@
+"""Prometheus metrics.
+
+With several uvicorn workers each process keeps its own samples, so
+``prometheus_client`` must run in multiprocess mode: every process writes
+its samples to files in ``PROMETHEUS_MULTIPROC_DIR`` and ``/metrics``
+aggregates all of them, whichever worker answers the scrape. The mode is
+chosen when ``prometheus_client`` is first imported, so this module sets the
+environment variable before importing it. The directory must be emptied
+before the workers start (``app.serve`` does this).
+"""
+
+import os
+import time
+from typing import Any
+
+from fastapi import Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.timing import on_query
+
+# Must be set before prometheus_client is imported
+MULTIPROCESS = settings.WORKERS > 1 or "PROMETHEUS_MULTIPROC_DIR" in os.environ
+if MULTIPROCESS:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.PROMETHEUS_MULTIPROC_DIR)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Methods labeled as sent; any other method a client makes up is "other"
+HTTP_METHODS = frozenset(
+    {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"}
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status",
+    ["route", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Database query execution time",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_IDLE = Gauge(
+    "db_pool_idle_connections",
+    "Connections idle in the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond the pool size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requests turned away by admission control, by gate (read or write)",
+    ["gate"],
+)
+RATE_LIMITED = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected by a route's rate limit",
+    ["scope"],
+)
+EXECUTOR_IN_FLIGHT = Gauge(
+    "executor_in_flight_tasks",
+    "Tasks running or queued in a bounded executor",
+    ["executor"],
+    multiprocess_mode="livesum",
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "executor_queue_depth",
+    "Tasks waiting for a free executor worker",
+    ["executor"],
+    multiprocess_mode="livesum",
+)
+EXECUTOR_REJECTED = Counter(
+    "executor_rejected_total",
+    "Tasks rejected because the executor was saturated",
+    ["executor"],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count one cache lookup; the hit ratio is computed in PromQL."""
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_admission_rejection(gate: str) -> None:
+    """Count a request rejected by the admission ``gate``."""
+    ADMISSION_REJECTED.labels(gate).inc()
+
+
+def record_rate_limited(scope: str) -> None:
+    """Count a request rejected by the rate limit of ``scope``."""
+    RATE_LIMITED.labels(scope).inc()
+
+
+def record_executor_depth(executor: str, in_flight: int, queue_depth: int) -> None:
+    """Publish a bounded executor's current load."""
+    EXECUTOR_IN_FLIGHT.labels(executor).set(in_flight)
+    EXECUTOR_QUEUE_DEPTH.labels(executor).set(queue_depth)
+
+
+def record_executor_rejection(executor: str) -> None:
+    """Count a task shed by a saturated executor."""
+    EXECUTOR_REJECTED.labels(executor).inc()
+
+
+def observe_query(duration: float) -> None:
+    """Record one query's execution time in seconds."""
+    DB_QUERY_LATENCY.observe(duration)
+
+
+on_query(observe_query)
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> None:
+    """Keep the pool gauges for ``engine`` current on every checkout/checkin."""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+
+    def update(*args: Any) -> None:
+        DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+        DB_POOL_IDLE.labels(name).set(pool.checkedin())
+        DB_POOL_OVERFLOW.labels(name).set(max(0, pool.overflow()))
+
+    event.listen(pool, "checkout", update)
+    event.listen(pool, "checkin", update)
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        wait_stats.observers.append(DB_POOL_CHECKOUT_WAIT.labels(name).observe)
+
+
+class PrometheusMiddleware:
+    """Record latency and in-flight requests for every HTTP request.
+
+    Requests are labeled with the matched route template (``/users/{id}``),
+    never the raw path, and nonstandard methods share the ``other`` label,
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                getattr(route, "path", "unmatched"), method, str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+def metrics_response() -> Response:
+    """Render every metric, aggregated across worker processes if needed."""
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead(pid: int | None = None) -> None:
+    """Drop a stopped worker's live gauges from the aggregate."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
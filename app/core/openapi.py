@@ -0,0 +1,177 @@
+"""Precomputed OpenAPI schema.
+
+FastAPI builds the schema on the first request to the OpenAPI URL, in every
+worker, and re-encodes it on each request after that. The schema only
+changes with the code and settings, so it is generated once, at build time
+or by ``app.serve`` before it starts the workers::
+
+    python -m app.core.openapi [path]
+
+Next to the file goes a fingerprint of the code and settings it was
+generated from. Outside development, ``install_openapi`` preloads the file
+when the fingerprint matches and serves its bytes as they are, with an
+``ETag`` so pollers get ``304 Not Modified``. In development, or when the
+file is missing or stale, the schema is generated live on the first request
+and then served the same way.
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import orjson
+from fastapi import FastAPI, Request, Response
+from starlette.routing import BaseRoute
+from structlog import get_logger
+
+from app.core.cache import compute_etag, etag_matches
+from app.core.config import settings
+
+logger = get_logger(__name__)
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+# Secrets and per-process values, which never reach the schema
+UNHASHED_SETTINGS = {
+    "DATABASE_READ_URLS",
+    "DATABASE_URL",
+    "EXTERNAL_API_KEY",
+    "JWT_SIGNING_KEYS",
+    "OPENAPI_SCHEMA_FILE",
+    "RATE_LIMIT_API_KEYS",
+    "REDIS_URL",
+    "SECRET_KEY",
+    "SMTP_PASSWORD",
+    "WORKERS",
+}
+
+
+def schema_fingerprint() -> str:
+    """Digest of the code and settings the schema is generated from.
+
+    Hashes the ``app`` package source, so any code change counts without a
+    version bump, and the settings, since route constraints such as
+    ``MAX_PAGE_SIZE`` are read from them. Takes about 2 ms.
+    """
+    digest = hashlib.sha256()
+    for source in sorted(APP_DIR.rglob("*.py")):
+        digest.update(source.relative_to(APP_DIR).as_posix().encode())
+        digest.update(source.read_bytes())
+    digest.update(settings.model_dump_json(exclude=UNHASHED_SETTINGS).encode())
+    return digest.hexdigest()
+
+
+def fingerprint_path(path: Path) -> Path:
+    """Where the fingerprint of the schema in ``path`` is stored."""
+    return path.with_name(path.name + ".fingerprint")
+
+
+def stored_fingerprint(path: Path) -> str | None:
+    """Fingerprint written with the schema in ``path``, if any."""
+    try:
+        return fingerprint_path(path).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def render_schema(app: FastAPI) -> bytes:
+    """Generate ``app``'s OpenAPI schema as JSON bytes."""
+    return orjson.dumps(app.openapi(), option=orjson.OPT_SORT_KEYS)
+
+
+def write_schema(app: FastAPI, path: Path) -> None:
+    """Write ``app``'s schema to ``path`` with the current fingerprint.
+
+    Each file is replaced atomically, so workers starting meanwhile read
+    either the old schema or the new one.
+    """
+    # Generate from the code, never from a previously loaded file
+    app.openapi_schema = None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for target, content in (
+        (path, render_schema(app)),
+        (fingerprint_path(path), schema_fingerprint().encode()),
+    ):
+        partial = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        partial.write_bytes(content)
+        os.replace(partial, target)
+
+
+def load_schema(app: FastAPI, path: Path) -> bytes | None:
+    """Read a precomputed schema and make ``app.openapi()`` return it.
+
+    Returns None, so the schema is generated live, if the file is missing
+    or was generated from other code or settings.
+    """
+    try:
+        body = path.read_bytes()
+    except FileNotFoundError:
+        logger.warning("Precomputed OpenAPI schema not found", path=str(path))
+        return None
+    if stored_fingerprint(path) != schema_fingerprint():
+        logger.warning(
+            "Ignoring precomputed OpenAPI schema generated from other code "
+            "or settings",
+            path=str(path),
+        )
+        return None
+    schema: dict[str, Any] = orjson.loads(body)
+    app.openapi_schema = schema
+    return body
+
+
+class SchemaDocument:
+    """Encoded schema and its ETag, generated on first use if not preloaded."""
+
+    def __init__(self, app: FastAPI, body: bytes | None = None) -> None:
+        self.app = app
+        self.body = body
+        self.etag = compute_etag(body) if body is not None else None
+
+    def response(self, request: Request) -> Response:
+        """Serve the schema, or ``304`` if the client's copy is current."""
+        if self.body is None or self.etag is None:
+            self.body = render_schema(self.app)
+            self.etag = compute_etag(self.body)
+        headers = {"ETag": self.etag}
+        if etag_matches(self.etag, request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+def install_openapi(app: FastAPI, schema_file: str | None = None) -> None:
+    """Serve ``app.openapi_url`` from pre-encoded bytes with an ``ETag``.
+
+    Replaces the route FastAPI registers for the schema; ``/docs`` and
+    ``/redoc`` keep pointing at the same URL.
+    """
+    if not app.openapi_url:
+        return
+    body = None
+    if schema_file and not settings.is_development:
+        body = load_schema(app, Path(schema_file))
+    document = SchemaDocument(app, body)
+
+    async def openapi(request: Request) -> Response:
+        return document.response(request)
+
+    routes: list[BaseRoute] = app.router.routes
+    app.router.routes = [
+        route for route in routes if getattr(route, "path", None) != app.openapi_url
+    ]
+    app.add_route(app.openapi_url, openapi, include_in_schema=False)
+
+
+def main() -> None:
+    """Write the schema of ``create_application()`` to a file."""
+    from app.main import create_application
+
+    path = Path(sys.argv[1] if len(sys.argv) > 1 else settings.OPENAPI_SCHEMA_FILE)
+    write_schema(create_application(), path)
+    print(f"Wrote OpenAPI schema to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""Token bucket rate limiting for API routes.
+
+Routes declare their limit with a dependency::
+
+    @router.post("/", dependencies=[Depends(rate_limit("users:create", "20/minute"))])
+
+Each client gets a bucket of ``limit`` tokens per route scope, refilled
+continuously over ``period``; a request takes one token and gets 429 when
+the bucket is empty. Clients are identified by JWT subject, then by a
+configured API key, then by IP address.
+
+Buckets live in Redis when ``REDIS_URL`` is configured, updated atomically
+by a Lua script so every worker shares them, and in process memory
+otherwise. ``RateLimitHeadersMiddleware`` adds the ``RateLimit-*`` headers
+to every limited response.
+"""
+
+import hashlib
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import HTTPException, Request, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from structlog import get_logger
+
+from app.core.config import settings
+from app.core.metrics import record_rate_limited
+from app.core.redis import get_redis
+from app.core.security import verify_token
+
+logger = get_logger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Key of the result in the request state, read by the headers middleware
+STATE_KEY = "rate_limit"
+
+
+@dataclass(frozen=True)
+class Rate:
+    """``limit`` requests per ``period`` seconds, with bursts up to ``limit``."""
+
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Parse ``"<limit>/<second|minute|hour|day>"``, e.g. ``"20/minute"``."""
+        count, _, unit = value.partition("/")
+        try:
+            rate = cls(int(count), PERIODS[unit.strip().removesuffix("s")])
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid rate limit {value!r}") from None
+        if rate.limit <= 0:
+            raise ValueError(f"Invalid rate limit {value!r}")
+        return rate
+
+    @property
+    def per_second(self) -> float:
+        """Tokens added back to the bucket each second."""
+        return self.limit / self.period
+
+    @property
+    def policy(self) -> str:
+        """``RateLimit-Policy`` header value."""
+        return f"{self.limit};w={int(self.period)}"
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of taking a token from a client's bucket."""
+
+    allowed: bool
+    rate: Rate
+    tokens: float
+
+    @property
+    def remaining(self) -> int:
+        """Whole requests left in the bucket."""
+        return max(0, math.floor(self.tokens))
+
+    @property
+    def reset(self) -> int:
+        """Seconds until the bucket is full again."""
+        return math.ceil((self.rate.limit - self.tokens) / self.rate.per_second)
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds until the next request would be allowed."""
+        if self.tokens >= 1:
+            return 0
+        return max(1, math.ceil((1 - self.tokens) / self.rate.per_second))
+
+    def headers(self) -> dict[str, str]:
+        """``RateLimit-*`` response headers."""
+        return {
+            "RateLimit-Limit": str(self.rate.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+            "RateLimit-Policy": self.rate.policy,
+        }
+
+
+class TokenBucketBackend(ABC):
+    """Storage for token buckets."""
+
+    name: str
+
+    @abstractmethod
+    async def take(self, key: str, rate: Rate) -> tuple[bool, float]:
+        """Refill the bucket under ``key`` and take one token if there is one.
+
+        Returns whether a token was taken and the tokens left.
+        """
+
+    @abstractmethod
+    async def clear(self, prefix: str) -> None:
+        """Delete every bucket whose key starts with ``prefix``."""
+
+
+class InMemoryTokenBuckets(TokenBucketBackend):
+    """Per-process buckets, least recently used evicted past ``max_keys``.
+
+    ``take`` never awaits, so on the event loop a refill and its update
+    cannot interleave with another request's and no lock is needed. Each
+    worker process has its own buckets, so with several workers a client
+    gets up to ``WORKERS`` times the limit; configure Redis to share them.
+    """
+
+    name = "memory"
+
+    def __init__(self, *, max_keys: int) -> None:
+        self.max_keys = max(1, max_keys)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, rate: Rate) -> tuple[bool, float]:
+        """Refill the bucket under ``key`` and take one token if there is one."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(rate.limit)
+        else:
+            tokens, updated = bucket
+            tokens = min(rate.limit, tokens + (now - updated) * rate.per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    async def clear(self, prefix: str) -> None:
+        """Delete every bucket whose key starts with ``prefix``."""
+        for key in [k for k in self._buckets if k.startswith(prefix)]:
+            del self._buckets[key]
+
+
+# Refill and take in one round trip, atomically. Uses the Redis server clock
+# so workers on different hosts agree, and expires buckets once they would
+# be full again. ARGV: limit, tokens per second.
+TAKE_TOKEN_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1])
+if tokens == nil then
+    tokens = limit
+else
+    local elapsed = math.max(0, now - tonumber(bucket[2]))
+    tokens = math.min(limit, tokens + elapsed * per_second)
+end
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((limit - tokens) / per_second * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisTokenBuckets(TokenBucketBackend):
+    """Buckets shared by every worker through a Redis server (5.0 or later)."""
+
+    name = "redis"
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+        self._take = client.register_script(TAKE_TOKEN_SCRIPT)
+
+    async def take(self, key: str, rate: Rate) -> tuple[bool, float]:
+        """Refill the bucket under ``key`` and take one token if there is one."""
+        allowed, tokens = await self._take(
+            keys=[key], args=[rate.limit, rate.per_second]
+        )
+        return bool(allowed), float(tokens)
+
+    async def clear(self, prefix: str) -> None:
+        """Delete every bucket whose key starts with ``prefix``."""
+        keys = [key async for key in self.client.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+class RateLimiter:
+    """Token buckets per route scope and client.
+
+    When the backend fails, requests are let through: an unreachable Redis
+    should not take the API down with it.
+    """
+
+    def __init__(
+        self, backend: TokenBucketBackend, *, prefix: str, enabled: bool = True
+    ) -> None:
+        self.backend = backend
+        self.prefix = prefix
+        self.enabled = enabled
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    async def hit(self, scope: str, client: str, rate: Rate) -> RateLimitResult | None:
+        """Take a token for ``client`` in ``scope``; None if the backend failed."""
+        try:
+            allowed, tokens = await self.backend.take(
+                f"{self.prefix}:{scope}:{client}", rate
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Rate limiter unavailable", scope=scope, error=str(e))
+            return None
+        if allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+            record_rate_limited(scope)
+        return RateLimitResult(allowed=allowed, rate=rate, tokens=tokens)
+
+    async def clear(self) -> None:
+        """Drop every bucket."""
+        await self.backend.clear(f"{self.prefix}:")
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for the health endpoint."""
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "errors": self.errors,
+        }
+
+
+def create_backend() -> TokenBucketBackend:
+    """Use Redis when configured, in-process buckets otherwise."""
+    client = get_redis()
+    if client is not None:
+        return RedisTokenBuckets(client)
+    return InMemoryTokenBuckets(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(
+    create_backend(),
+    prefix=settings.RATE_LIMIT_PREFIX,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+
+
+def client_identity(request: Request) -> str:
+    """Identify the client a request counts against.
+
+    Only verified identities get their own bucket: a valid bearer token's
+    subject, then an API key listed in ``RATE_LIMIT_API_KEYS``. Anything
+    else, including invalid credentials, is limited by IP address, so
+    rotating made-up credentials does not escape the limit. Behind a reverse
+    proxy that address is only the client's when the proxy is listed in
+    ``FORWARDED_ALLOW_IPS``.
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        subject = verify_token(token)
+        if subject is not None:
+            return f"sub:{subject}"
+    api_key = request.headers.get(settings.RATE_LIMIT_API_KEY_HEADER)
+    if api_key and api_key in settings.RATE_LIMIT_API_KEYS:
+        return f"key:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+    host = request.client.host if request.client else "unknown"
+    return f"ip:{host}"
+
+
+def rate_limit(scope: str, rate: str) -> Callable[[Request], Awaitable[None]]:
+    """Dependency limiting each client to ``rate`` requests in ``scope``.
+
+    ``rate`` is parsed when the route is declared, so a malformed limit
+    fails at import rather than on the first request.
+    """
+    parsed = Rate.parse(rate)
+
+    async def dependency(request: Request) -> None:
+        if not rate_limiter.enabled:
+            return
+        result = await rate_limiter.hit(scope, client_identity(request), parsed)
+        if result is None:
+            return
+        setattr(request.state, STATE_KEY, result)
+        if not result.allowed:
+            logger.info("Rate limit exceeded", scope=scope, path=request.url.path)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(result.retry_after)},
+            )
+
+    return dependency
+
+
+class RateLimitHeadersMiddleware:
+    """Add ``RateLimit-*`` headers to responses of rate limited routes.
+
+    The headers are set here rather than by the dependency so they also
+    reach responses an endpoint renders itself and error responses.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                result = scope.get("state", {}).get(STATE_KEY)
+                if result is not None:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        *(
+                            (name.lower().encode(), value.encode())
+                            for name, value in result.headers().items()
+                        ),
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
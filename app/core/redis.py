@@ -0,0 +1,37 @@
+"""Shared Redis client.
+
+Redis is optional: ``get_redis`` returns ``None`` when ``REDIS_URL`` is unset
+or the ``redis`` package (``poetry install -E redis``) is not installed, and
+callers fall back to in-process implementations.
+"""
+
+from typing import Any
+
+from structlog import get_logger
+
+from app.core.config import settings
+
+logger = get_logger(__name__)
+
+_client: Any = None
+
+
+def get_redis() -> Any:
+    """Return the shared ``redis.asyncio`` client, or ``None`` if unavailable."""
+    global _client
+    if _client is None and settings.REDIS_URL:
+        try:
+            from redis.asyncio import Redis
+        except ImportError:
+            logger.warning("REDIS_URL is set but the redis package is not installed")
+            return None
+        _client = Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,16 +1,30 @@
 """Security utilities for password hashing and JWT tokens."""
 
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any
 
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.executor import BoundedExecutor
+from app.core.metrics import record_cache_lookup
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool so bcrypt never runs on the event loop
+password_hash_executor = BoundedExecutor(
+    "password-hash",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -22,32 +36,178 @@ def get_password_hash(password: str) -> str:
     return str(pwd_context.hash(password))
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash in the password hashing pool."""
+    return await password_hash_executor.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the password hashing pool."""
+    return await password_hash_executor.run(get_password_hash, password)
+
+
+async def get_password_hashes_async(passwords: list[str]) -> list[str]:
+    """Hash many passwords in parallel in the password hashing pool."""
+    return await password_hash_executor.map(get_password_hash, passwords)
+
+
+class JWTKeyring:
+    """HMAC signing keys for access tokens, parsed once.
+
+    Tokens are signed with the active key and carry its ``kid`` header.
+    Verification picks the key named by the token's ``kid``, so older keys
+    can stay configured while their tokens expire; tokens without a ``kid``
+    (issued before rotation was configured) are checked against every key.
+    """
+
+    def __init__(
+        self, keys: dict[str, str], *, active_kid: str | None, algorithm: str
+    ) -> None:
+        if not keys:
+            raise ValueError("At least one JWT signing key is required")
+        self.algorithm = algorithm
+        self.keys: dict[str, Key] = {
+            kid: jwk.construct(secret, algorithm) for kid, secret in keys.items()
+        }
+        self.active_kid = active_kid or next(iter(keys))
+        if self.active_kid not in self.keys:
+            raise ValueError(f"Unknown JWT_ACTIVE_KID: {self.active_kid}")
+
+    @classmethod
+    def from_settings(cls) -> "JWTKeyring":
+        """Build the keyring from ``JWT_SIGNING_KEYS`` or ``SECRET_KEY``."""
+        return cls(
+            settings.JWT_SIGNING_KEYS or {"default": settings.SECRET_KEY},
+            active_kid=settings.JWT_ACTIVE_KID,
+            algorithm=settings.ALGORITHM,
+        )
+
+    @property
+    def signing_key(self) -> Key:
+        """Key used for new tokens."""
+        return self.keys[self.active_kid]
+
+    def verification_keys(self, kid: str | None) -> tuple[Key, ...]:
+        """Keys a token with header ``kid`` may be signed with."""
+        if kid is None:
+            return tuple(self.keys.values())
+        key = self.keys.get(kid)
+        return (key,) if key is not None else ()
+
+
+class VerifiedTokenCache:
+    """LRU of tokens that passed verification, keyed by their SHA-256 digest.
+
+    An entry never outlives its token's ``exp`` claim (nor ``ttl`` seconds),
+    so a cache hit is exactly as valid as a fresh ``jwt.decode``. Only
+    successful verifications are stored; invalid tokens always go through
+    the full check.
+    """
+
+    def __init__(self, *, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[float, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        """Cache key for ``token``."""
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, digest: bytes) -> str | None:
+        """Return the cached subject, or None if missing or expired."""
+        entry = self._entries.get(digest)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[digest]
+            self.misses += 1
+            record_cache_lookup("jwt", False)
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        record_cache_lookup("jwt", True)
+        return entry[1]
+
+    def set(self, digest: bytes, subject: str, exp: float | None) -> None:
+        """Remember a verified token until ``exp`` (or ``ttl``, if sooner)."""
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        self._entries[digest] = (expires_at, subject)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every verified token."""
+        self._entries.clear()
+
+
+jwt_keyring = JWTKeyring.from_settings()
+verified_token_cache = VerifiedTokenCache(
+    max_entries=settings.JWT_VERIFY_CACHE_SIZE, ttl=settings.JWT_VERIFY_CACHE_TTL
+)
+ACCESS_TOKEN_EXPIRE = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
 def create_access_token(
     subject: str | Any, expires_delta: timedelta | None = None
 ) -> str:
-    """Create a JWT access token."""
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+    """Create a JWT access token signed with the active key."""
+    expire = datetime.utcnow() + (expires_delta or ACCESS_TOKEN_EXPIRE)
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        to_encode,
+        jwt_keyring.signing_key,
+        algorithm=jwt_keyring.algorithm,
+        headers={"kid": jwt_keyring.active_kid},
     )
     return str(encoded_jwt)
 
 
-def verify_token(token: str) -> str | None:
-    """Verify and decode a JWT token."""
+def decode_token(token: str) -> dict[str, Any] | None:
+    """Verify a JWT token and return its claims, bypassing the cache."""
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        username: str | None = payload.get("sub")
-        if username is None:
+        kid = jwt.get_unverified_header(token).get("kid")
+        keys = jwt_keyring.verification_keys(kid)
+        if not keys:
             return None
-        return str(username)
+        payload: dict[str, Any] = jwt.decode(
+            token, keys, algorithms=[jwt_keyring.algorithm]
+        )
+        return payload
     except JWTError:
         return None
+
+
+def verify_token(token: str) -> str | None:
+    """Verify a JWT token and return its subject.
+
+    Tokens that verified before are answered from ``verified_token_cache``
+    until they expire.
+    """
+    digest = verified_token_cache.digest(token)
+    subject = verified_token_cache.get(digest)
+    if subject is not None:
+        return subject
+
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    username = payload.get("sub")
+    if username is None:
+        return None
+    exp = payload.get("exp")
+    verified_token_cache.set(
+        digest, str(username), float(exp) if exp is not None else None
+    )
+    return str(username)
@@ -0,0 +1,93 @@
+"""Precompiled response serializers.
+
+FastAPI validates an endpoint's return value against ``response_model``,
+dumps it to Python primitives, runs ``jsonable_encoder`` over the result and
+only then encodes JSON. ``ResponseSerializer`` builds the ``TypeAdapter`` for
+a response model once and goes straight from ORM rows to JSON bytes in
+pydantic-core, which is where most of the CPU goes on large list pages.
+"""
+
+from types import NoneType, UnionType
+from typing import Any, TypeVar, Union, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+from app.core.timing import serialize_stage
+
+# Headers that describe the body and must not be copied between responses
+BODY_HEADERS = {"content-length", "content-type"}
+
+T = TypeVar("T")
+
+
+class ResponseSerializer:
+    """Validate objects against ``model`` and dump them as JSON bytes."""
+
+    def __init__(self, model: Any) -> None:
+        self.model = model
+        self.adapter: TypeAdapter[Any] = TypeAdapter(model)
+        item = get_args(model)[0] if get_origin(model) is list else model
+        if get_origin(item) in (Union, UnionType):
+            # list[Model | None]: nulls pass through, rows keep the fast path
+            item = next(arg for arg in get_args(item) if arg is not NoneType)
+        self._fields: frozenset[str] = (
+            frozenset(item.model_fields)
+            if isinstance(item, type) and issubclass(item, BaseModel)
+            else frozenset()
+        )
+
+    def _source(self, obj: Any) -> Any:
+        # Loaded ORM column values live in the instance __dict__; validating
+        # that dict skips the instrumented attribute descriptors, which cost
+        # more than the validation itself. Rows with expired or deferred
+        # fields go through attribute access so they are never misread.
+        state = getattr(obj, "__dict__", None)
+        if (
+            self._fields
+            and state is not None
+            and "_sa_instance_state" in state
+            and state.keys() >= self._fields
+        ):
+            return state
+        return obj
+
+    def dump(self, obj: Any) -> bytes:
+        """Serialize ``obj`` (ORM rows or plain data) to JSON."""
+        with serialize_stage():
+            if isinstance(obj, list):
+                source: Any = [self._source(item) for item in obj]
+            else:
+                source = self._source(obj)
+            return self.adapter.dump_json(
+                self.adapter.validate_python(source, from_attributes=True)
+            )
+
+    def response(self, obj: Any, *, headers_from: Response | None = None) -> Response:
+        """Render ``obj`` as a JSON response.
+
+        Headers the endpoint set on its injected ``Response`` parameter are
+        dropped by FastAPI when a response is returned directly, so pass it
+        as ``headers_from`` to carry them over.
+        """
+        headers = {}
+        if headers_from is not None:
+            headers = {
+                name: value
+                for name, value in headers_from.headers.items()
+                if name not in BODY_HEADERS
+            }
+        return Response(
+            content=self.dump(obj), media_type="application/json", headers=headers
+        )
+
+    def respond(self, obj: T, response: Response | None = None) -> T | Response:
+        """Pre-render ``obj`` when ``FAST_JSON_RESPONSES`` is enabled.
+
+        Otherwise ``obj`` is returned unchanged for FastAPI to serialize
+        through the route's ``response_model``.
+        """
+        if not settings.FAST_JSON_RESPONSES:
+            return obj
+        return self.response(obj, headers_from=response)
@@ -0,0 +1,214 @@
+"""Per-request timing: total latency, database time, query count, serialization.
+
+``RequestTimingMiddleware`` opens a ``RequestTimings`` record for each HTTP
+request in a context variable. Engines passed to ``instrument_engine`` add
+their cursor execution time to it, ``TimedAPIRoute`` marks when the endpoint
+returns so response validation and rendering count as serialization, and
+``ResponseSerializer`` reports the lists it renders itself. The totals are
+sent as a ``Server-Timing`` header and logged once per request.
+"""
+
+import functools
+import inspect
+import random
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logging import log_request_info
+
+_QUERY_START_KEY = "request_timing_query_start"
+
+
+@dataclass
+class RequestTimings:
+    """Timings collected while one request is served."""
+
+    start: float = field(default_factory=time.perf_counter)
+    db_ms: float = 0.0
+    db_queries: int = 0
+    serialize_ms: float = 0.0
+    endpoint_done: float | None = None
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the request started."""
+        return (time.perf_counter() - self.start) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        """Render the ``Server-Timing`` header value."""
+        app_ms = max(0.0, total_ms - self.db_ms - self.serialize_ms)
+        return ", ".join(
+            [
+                f"total;dur={total_ms:.1f}",
+                f'db;dur={self.db_ms:.1f};desc="{self.db_queries} queries"',
+                f"serialize;dur={self.serialize_ms:.1f}",
+                f"app;dur={app_ms:.1f}",
+            ]
+        )
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def current_timings() -> RequestTimings | None:
+    """Timings of the request being served, if any."""
+    return _current.get()
+
+
+@contextmanager
+def serialize_stage() -> Iterator[None]:
+    """Count the enclosed block as serialization time."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialize_ms += (time.perf_counter() - start) * 1000
+
+
+_query_observers: list[Callable[[float], None]] = []
+
+
+def on_query(observer: Callable[[float], None]) -> None:
+    """Register a callback run with the duration in seconds of every query."""
+    _query_observers.append(observer)
+
+
+def _before_cursor_execute(conn: Any, *args: Any) -> None:
+    conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Any, *args: Any) -> None:
+    starts = conn.info.get(_QUERY_START_KEY)
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    for observer in _query_observers:
+        observer(duration)
+    timings = _current.get()
+    if timings is not None:
+        timings.db_ms += duration * 1000
+        timings.db_queries += 1
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time the engine's queries for the current request and ``on_query``."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _mark_endpoint_done(call: Callable[..., Any]) -> Callable[..., Any]:
+    if not inspect.iscoroutinefunction(call):
+        return call
+
+    @functools.wraps(call)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = await call(*args, **kwargs)
+        timings = _current.get()
+        if timings is not None:
+            timings.endpoint_done = time.perf_counter()
+        return result
+
+    return wrapper
+
+
+class TimedAPIRoute(APIRoute):
+    """Route that marks when its endpoint returns.
+
+    Whatever FastAPI does between that point and sending the response
+    headers (``response_model`` validation, JSON encoding, rendering) is
+    reported as serialization time.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        """Wrap the endpoint call before FastAPI builds the handler."""
+        if self.dependant.call is not None:
+            self.dependant.call = _mark_endpoint_done(self.dependant.call)
+        return super().get_route_handler()
+
+
+class RequestTimingMiddleware:
+    """Measure each HTTP request, add ``Server-Timing`` and log it.
+
+    One log line is written for a ``sample_rate`` fraction of requests;
+    requests slower than ``slow_threshold_ms`` and server errors are always
+    logged, at warning level.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        sample_rate: float = 1.0,
+        slow_threshold_ms: float = 1000.0,
+        server_timing: bool = True,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if timings.endpoint_done is not None:
+                    timings.serialize_ms += (
+                        time.perf_counter() - timings.endpoint_done
+                    ) * 1000
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing", timings.server_timing(timings.elapsed_ms())
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._log(scope, status_code, timings)
+
+    def _log(self, scope: Scope, status_code: int, timings: RequestTimings) -> None:
+        total_ms = timings.elapsed_ms()
+        slow = total_ms >= self.slow_threshold_ms
+        sampled = random.random() < self.sample_rate  # nosec B311
+        if not (slow or sampled or status_code >= 500):
+            return
+        route = scope.get("route")
+        log_request_info(
+            Request(scope),
+            status_code,
+            slow=slow,
+            route=getattr(route, "path", None),
+            duration_ms=round(total_ms, 2),
+            db_ms=round(timings.db_ms, 2),
+            db_queries=timings.db_queries,
+            serialize_ms=round(timings.serialize_ms, 2),
+        )
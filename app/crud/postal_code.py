@@ -1,16 +1,37 @@
 """Postal code CRUD operations."""
 
+from collections.abc import Callable
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import response_cache
 from app.models.postal_code import PostalCode
 
 
 class CRUDPostalCode:
     """CRUD operations for PostalCode model."""
 
+    cache_namespace = "postal-codes"
+
+    def __init__(self) -> None:
+        self._change_listeners: list[Callable[[], None]] = []
+
+    def on_change(self, listener: Callable[[], None]) -> None:
+        """Register a callback run after postal codes are created, updated or removed."""
+        self._change_listeners.append(listener)
+
+    def off_change(self, listener: Callable[[], None]) -> None:
+        """Unregister a callback added with ``on_change``."""
+        self._change_listeners.remove(listener)
+
+    async def _notify_change(self) -> None:
+        for listener in self._change_listeners:
+            listener()
+        await response_cache.invalidate(self.cache_namespace)
+
     async def get(self, db: AsyncSession, id: int) -> PostalCode | None:
         """Get postal code by ID."""
         result = await db.execute(select(PostalCode).where(PostalCode.id == id))
@@ -35,11 +56,91 @@ class CRUDPostalCode:
             else None
         )
 
+    async def get_many(
+        self, db: AsyncSession, ids: list[int]
+    ) -> list[PostalCode | None]:
+        """Get postal codes by ID in one query, in the order of ``ids``.
+
+        Unknown IDs give None; a repeated ID repeats its postal code.
+        """
+        if not ids:
+            return []
+        result = await db.execute(select(PostalCode).where(PostalCode.id.in_(set(ids))))
+        found = {row.id: row for row in result.scalars().all()}
+        return [found.get(id) for id in ids]
+
+    async def get_many_by_postal_code(
+        self, db: AsyncSession, postal_codes: list[str]
+    ) -> list[PostalCode | None]:
+        """Like ``get_many``, by postal code string."""
+        if not postal_codes:
+            return []
+        result = await db.execute(
+            select(PostalCode).where(PostalCode.postal_code.in_(set(postal_codes)))
+        )
+        found = {row.postal_code: row for row in result.scalars().all()}
+        return [found.get(code) for code in postal_codes]
+
+    async def get_existing_ids(self, db: AsyncSession, ids: set[int]) -> set[int]:
+        """Return which of ``ids`` exist, in one query."""
+        if not ids:
+            return set()
+        result = await db.execute(select(PostalCode.id).where(PostalCode.id.in_(ids)))
+        return set(result.scalars().all())
+
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: int | None = None,
     ) -> list[PostalCode]:
-        """Get multiple postal codes."""
-        result = await db.execute(select(PostalCode).offset(skip).limit(limit))
+        """Get multiple postal codes ordered by ID.
+
+        When ``after_id`` is given, rows are fetched by keyset (``id >
+        after_id``) and ``skip`` is ignored, so deep pages cost the same as
+        the first one.
+        """
+        query = select(PostalCode).order_by(PostalCode.id).limit(limit)
+        if after_id is not None:
+            query = query.where(PostalCode.id > after_id)
+        else:
+            query = query.offset(skip)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    async def search(
+        self, db: AsyncSession, query: str, *, limit: int
+    ) -> list[PostalCode]:
+        """Postal codes whose code or city name starts with ``query``.
+
+        ``LIKE`` fallback for when the postal code cache is disabled; unlike
+        the cached index it is accent-sensitive and only matches the start
+        of city names.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        pattern = (
+            query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        )
+        result = await db.execute(
+            select(PostalCode)
+            .where(
+                or_(
+                    PostalCode.postal_code.like(pattern, escape="\\"),
+                    func.lower(PostalCode.city_name).like(pattern.lower(), escape="\\"),
+                )
+            )
+            .order_by(PostalCode.postal_code)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_all(self, db: AsyncSession) -> list[PostalCode]:
+        """Get every postal code."""
+        result = await db.execute(select(PostalCode).order_by(PostalCode.id))
         return list(result.scalars().all())
 
     async def create(self, db: AsyncSession, *, obj_in: dict[str, Any]) -> PostalCode:
@@ -51,8 +152,44 @@ class CRUDPostalCode:
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await self._notify_change()
         return db_obj
 
+    async def upsert_many(
+        self, db: AsyncSession, *, objs_in: list[dict[str, Any]]
+    ) -> int:
+        """Insert postal codes and update the city of codes that already exist.
+
+        Runs one ``INSERT ... ON CONFLICT (postal_code) DO UPDATE``
+        executemany and commits. Rows whose city is unchanged are left
+        untouched, so reloading the same data writes nothing. A code repeated
+        in ``objs_in`` keeps its last city, since one statement may not
+        update a row twice. Returns the number of rows inserted or updated,
+        counted from ``RETURNING``.
+        """
+        rows = {
+            obj_in["postal_code"]: {
+                "postal_code": obj_in["postal_code"],
+                "city_name": obj_in["city_name"],
+            }
+            for obj_in in objs_in
+        }
+        if not rows:
+            return 0
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(PostalCode)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PostalCode.postal_code],
+            set_={"city_name": stmt.excluded.city_name},
+            where=PostalCode.city_name != stmt.excluded.city_name,
+        )
+        result = await db.execute(stmt.returning(PostalCode.id), list(rows.values()))
+        written = len(result.all())
+        await db.commit()
+        if written:
+            await self._notify_change()
+        return written
+
     async def update(
         self, db: AsyncSession, *, db_obj: PostalCode, obj_in: dict[str, Any]
     ) -> PostalCode:
@@ -61,6 +198,7 @@ class CRUDPostalCode:
             setattr(db_obj, field, value)
         await db.commit()
         await db.refresh(db_obj)
+        await self._notify_change()
         return db_obj
 
     async def remove(self, db: AsyncSession, *, id: int) -> PostalCode | None:
@@ -69,6 +207,7 @@ class CRUDPostalCode:
         if obj:
             await db.delete(obj)
             await db.commit()
+            await self._notify_change()
         return obj if isinstance(obj, PostalCode) or obj is None else None
 
 
@@ -1,65 +1,220 @@
 """User CRUD operations."""
 
+from collections.abc import AsyncIterator
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.core.security import get_password_hash, verify_password
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.core.cache import response_cache
+from app.core.security import (
+    get_password_hash_async,
+    get_password_hashes_async,
+    verify_password_async,
+)
 from app.models.user import User
 
 
 class CRUDUser:
-    """CRUD operations for User model."""
+    """CRUD operations for User model.
+
+    Updates and removals invalidate the ``cache_namespace`` response cache;
+    creates need not, since only existing users are cached.
+    """
+
+    cache_namespace = "users"
 
-    async def get(self, db: AsyncSession, id: int) -> User | None:
-        """Get user by ID."""
-        result = await db.execute(select(User).where(User.id == id))
+    async def get(
+        self, db: AsyncSession, id: int, *, include_postal_code: bool = False
+    ) -> User | None:
+        """Get user by ID.
+
+        With ``include_postal_code`` the postal code is joined into the same
+        query, so ``User.postal_code`` can be read without a lazy load.
+        """
+        query = select(User).where(User.id == id)
+        if include_postal_code:
+            query = query.options(joinedload(User.postal_code))
+        result = await db.execute(query)
         user = result.scalar_one_or_none()
         return user if isinstance(user, User) or user is None else None
 
+    async def get_many(self, db: AsyncSession, ids: list[int]) -> list[User | None]:
+        """Get users by ID in one query, in the order of ``ids``.
+
+        Unknown IDs give None; a repeated ID repeats its user.
+        """
+        if not ids:
+            return []
+        result = await db.execute(select(User).where(User.id.in_(set(ids))))
+        found = {db_user.id: db_user for db_user in result.scalars().all()}
+        return [found.get(id) for id in ids]
+
     async def get_by_email(self, db: AsyncSession, email: str) -> User | None:
         """Get user by email."""
         result = await db.execute(select(User).where(User.email == email))
         user = result.scalar_one_or_none()
         return user if isinstance(user, User) or user is None else None
 
+    async def get_existing_emails(
+        self, db: AsyncSession, emails: list[str]
+    ) -> set[str]:
+        """Return which of ``emails`` already belong to a user, in one query."""
+        if not emails:
+            return set()
+        result = await db.execute(select(User.email).where(User.email.in_(emails)))
+        return set(result.scalars().all())
+
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: int | None = None,
+        include_postal_code: bool = False,
     ) -> list[User]:
-        """Get multiple users."""
-        result = await db.execute(select(User).offset(skip).limit(limit))
+        """Get multiple users ordered by ID.
+
+        When ``after_id`` is given, rows are fetched by keyset (``id >
+        after_id``) and ``skip`` is ignored, so deep pages cost the same as
+        the first one. With ``include_postal_code`` the page's postal codes
+        are loaded by one extra ``IN`` query, two queries whatever the page
+        size.
+        """
+        query = select(User).order_by(User.id).limit(limit)
+        if include_postal_code:
+            query = query.options(selectinload(User.postal_code))
+        if after_id is not None:
+            query = query.where(User.id > after_id)
+        else:
+            query = query.offset(skip)
+        result = await db.execute(query)
         return list(result.scalars().all())
 
+    async def stream_all(
+        self, db: AsyncSession, *, batch_size: int = 1000
+    ) -> AsyncIterator[list[User]]:
+        """Stream every user ordered by ID, ``batch_size`` rows at a time.
+
+        Uses a server-side cursor where the driver supports it, so memory
+        use does not grow with the table.
+        """
+        result = await db.stream_scalars(
+            select(User).order_by(User.id).execution_options(yield_per=batch_size)
+        )
+        async for batch in result.partitions():
+            yield list(batch)
+
+    @staticmethod
+    def _row(obj_in: dict[str, Any], hashed_password: str) -> dict[str, Any]:
+        return {
+            "email": obj_in["email"],
+            "hashed_password": hashed_password,
+            "full_name": obj_in.get("full_name"),
+            "is_active": obj_in.get("is_active", True),
+            "is_superuser": obj_in.get("is_superuser", False),
+            "address": obj_in.get("address"),
+            "age": obj_in.get("age"),
+            "postal_code_id": obj_in.get("postal_code_id"),
+        }
+
     async def create(self, db: AsyncSession, *, obj_in: dict[str, Any]) -> User:
-        """Create a new user."""
-        db_obj = User(
-            email=obj_in["email"],
-            hashed_password=get_password_hash(obj_in["password"]),
-            full_name=obj_in.get("full_name"),
-            is_active=obj_in.get("is_active", True),
-            is_superuser=obj_in.get("is_superuser", False),
-            address=obj_in.get("address"),
-            age=obj_in.get("age"),
-            postal_code_id=obj_in.get("postal_code_id"),
+        """Create a new user with a single ``INSERT ... RETURNING``.
+
+        Constraint violations (duplicate email, unknown postal code) surface
+        as ``IntegrityError`` for the caller to map.
+        """
+        hashed_password = await get_password_hash_async(obj_in["password"])
+        result = await db.scalars(
+            insert(User).values(self._row(obj_in, hashed_password)).returning(User)
         )
-        db.add(db_obj)
+        db_obj = result.one()
         await db.commit()
-        await db.refresh(db_obj)
         return db_obj
 
+    async def create_many(
+        self, db: AsyncSession, *, objs_in: list[dict[str, Any]]
+    ) -> list[User | IntegrityError]:
+        """Create many users in one transaction.
+
+        Passwords are hashed in parallel off the event loop before the
+        transaction starts, and rows are written with a multi-row ``INSERT
+        ... RETURNING``. When a constraint rejects that insert, say because a
+        concurrent writer took one of the emails, each row is retried in its
+        own SAVEPOINT so only the offending rows fail. Results are in the
+        order of ``objs_in``, with the ``IntegrityError`` for each rejected
+        row.
+        """
+        if not objs_in:
+            return []
+        hashed_passwords = await get_password_hashes_async(
+            [obj_in["password"] for obj_in in objs_in]
+        )
+        rows = [
+            self._row(obj_in, hashed_password)
+            for obj_in, hashed_password in zip(objs_in, hashed_passwords, strict=True)
+        ]
+        results: list[User | IntegrityError] = []
+        try:
+            result = await db.scalars(
+                insert(User).returning(User, sort_by_parameter_order=True), rows
+            )
+            results += result.all()
+        except IntegrityError:
+            await db.rollback()
+            for row in rows:
+                try:
+                    async with db.begin_nested():
+                        result = await db.scalars(
+                            insert(User).values(row).returning(User)
+                        )
+                        results.append(result.one())
+                except IntegrityError as e:
+                    results.append(e)
+        await db.commit()
+        return results
+
     async def update(
         self, db: AsyncSession, *, db_obj: User, obj_in: dict[str, Any]
     ) -> User:
         """Update a user."""
         for field, value in obj_in.items():
             if field == "password":
-                hashed_password = get_password_hash(value)
+                hashed_password = await get_password_hash_async(value)
                 db_obj.hashed_password = hashed_password
             else:
                 setattr(db_obj, field, value)
         await db.commit()
-        await db.refresh(db_obj)
+        await response_cache.invalidate(self.cache_namespace)
+        return db_obj
+
+    async def update_by_id(
+        self, db: AsyncSession, *, id: int, obj_in: dict[str, Any]
+    ) -> User | None:
+        """Update a user with a single ``UPDATE ... RETURNING``.
+
+        Returns None when no user has this ID. Constraint violations surface
+        as ``IntegrityError`` for the caller to map.
+        """
+        values = dict(obj_in)
+        if "password" in values:
+            values["hashed_password"] = await get_password_hash_async(
+                values.pop("password")
+            )
+        result = await db.scalars(
+            update(User)
+            .where(User.id == id)
+            .values(**values)
+            .returning(User)
+            .execution_options(synchronize_session=False)
+        )
+        db_obj = result.one_or_none()
+        await db.commit()
+        if db_obj is not None:
+            await response_cache.invalidate(self.cache_namespace)
         return db_obj
 
     async def remove(self, db: AsyncSession, *, id: int) -> User | None:
@@ -68,6 +223,7 @@ class CRUDUser:
         if obj:
             await db.delete(obj)
             await db.commit()
+            await response_cache.invalidate(self.cache_namespace)
         return obj if isinstance(obj, User) or obj is None else None
 
     async def authenticate(
@@ -77,7 +233,7 @@ class CRUDUser:
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
@@ -1,17 +1,84 @@
 """Database base configuration."""
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import ast
+import asyncio
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from structlog import get_logger
 
 from app.core.config import settings
+from app.core.metrics import instrument_pool
+from app.core.timing import instrument_engine
 from app.db.base_class import Base
+from app.db.pool import InstrumentedAsyncAdaptedQueuePool, pool_status
+
+logger = get_logger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations" / "versions"
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """The database is not at the Alembic head revision."""
+
+
+def engine_options(database_url: str) -> dict[str, Any]:
+    """Build ``create_async_engine`` keyword arguments from settings."""
+    url = make_url(database_url)
+    options: dict[str, Any] = {
+        "echo": settings.DATABASE_ECHO,
+        "future": True,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+
+    # In-memory SQLite needs its default single-connection StaticPool
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+def enforce_sqlite_foreign_keys(engine: AsyncEngine) -> None:
+    """Make SQLite check foreign keys on ``engine``'s connections, like PostgreSQL.
+
+    Writes rely on the foreign keys rather than on pre-checks, and SQLite
+    ignores them unless asked per connection. A no-op for other databases.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection: Any, _: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DATABASE_ECHO,
-    future=True,
+    **engine_options(settings.DATABASE_URL),
 )
+enforce_sqlite_foreign_keys(engine)
+instrument_engine(engine)
+instrument_pool(engine, "primary")
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
@@ -37,3 +104,92 @@ async def init_db() -> None:
         from app.models import user  # noqa: F401
 
         await conn.run_sync(Base.metadata.create_all)
+
+
+def migration_graph(versions_dir: Path = MIGRATIONS_DIR) -> dict[str, set[str]]:
+    """Map each Alembic revision in ``versions_dir`` to its parent revisions.
+
+    The scripts' ``revision``/``down_revision`` assignments are read with
+    ``ast``: importing Alembic loads the DDL support of every SQLAlchemy
+    dialect, which alone costs each worker about 200 ms at startup.
+    """
+    graph: dict[str, set[str]] = {}
+    for script in versions_dir.glob("*.py"):
+        values: dict[str, Any] = {}
+        for node in ast.parse(script.read_text()).body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1:
+                target, value = node.targets[0], node.value
+            elif isinstance(node, ast.AnnAssign) and node.value is not None:
+                target, value = node.target, node.value
+            else:
+                continue
+            if isinstance(target, ast.Name):
+                with suppress(ValueError):
+                    values[target.id] = ast.literal_eval(value)
+        if "revision" not in values:
+            continue
+        down_revision = values.get("down_revision")
+        if isinstance(down_revision, str):
+            graph[values["revision"]] = {down_revision}
+        else:
+            graph[values["revision"]] = set(down_revision or ())
+    return graph
+
+
+def migration_heads(versions_dir: Path = MIGRATIONS_DIR) -> set[str]:
+    """Head revisions of the Alembic migration scripts in ``versions_dir``."""
+    graph = migration_graph(versions_dir)
+    return graph.keys() - set().union(*graph.values())
+
+
+def _ancestors(graph: dict[str, set[str]], revisions: set[str]) -> set[str]:
+    """``revisions`` and every revision they were migrated from."""
+    seen: set[str] = set()
+    pending = list(revisions)
+    while pending:
+        revision = pending.pop()
+        if revision not in seen:
+            seen.add(revision)
+            pending.extend(graph.get(revision, ()))
+    return seen
+
+
+def _has_version_table(connection: Connection) -> bool:
+    return inspect(connection).has_table("alembic_version")
+
+
+async def check_schema_revision(engine: AsyncEngine) -> None:
+    """Raise ``SchemaOutOfDateError`` if ``engine`` is behind the Alembic head.
+
+    One read of ``alembic_version`` instead of the per-table reflection
+    ``create_all`` does, for deployments where migrations own the schema.
+    A revision this code has no script for was applied by newer code, as
+    in a rolling deploy that migrates first: that only logs a warning, so
+    old workers can still be restarted.
+    """
+    current: set[str] = set()
+    async with engine.connect() as conn:
+        if await conn.run_sync(_has_version_table):
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            current = set(result.scalars())
+    graph = migration_graph()
+    heads = graph.keys() - set().union(*graph.values())
+    if current - graph.keys():
+        logger.warning(
+            "Database schema is ahead of this code's migrations",
+            current=sorted(current),
+            heads=sorted(heads),
+        )
+        return
+    if not current or not heads <= _ancestors(graph, current):
+        raise SchemaOutOfDateError(
+            f"Database is at revision {sorted(current) or 'none'}, expected "
+            f"{sorted(heads)}; run 'alembic upgrade head'"
+        )
+
+
+async def log_pool_status(engine: AsyncEngine, interval: float) -> None:
+    """Periodically emit the engine's pool status as a structured log line."""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info("Database pool status", **pool_status(engine))
@@ -0,0 +1,25 @@
+"""Helpers for classifying database constraint violations."""
+
+from sqlalchemy.exc import IntegrityError
+
+# PostgreSQL SQLSTATE codes
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def _sqlstate(exc: IntegrityError) -> str | None:
+    return getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+
+
+def is_unique_violation(exc: IntegrityError) -> bool:
+    """Whether ``exc`` was raised by a unique constraint."""
+    if _sqlstate(exc) == UNIQUE_VIOLATION:
+        return True
+    return "UNIQUE constraint failed" in str(exc.orig)
+
+
+def is_foreign_key_violation(exc: IntegrityError) -> bool:
+    """Whether ``exc`` was raised by a foreign key constraint."""
+    if _sqlstate(exc) == FOREIGN_KEY_VIOLATION:
+        return True
+    return "FOREIGN KEY constraint failed" in str(exc.orig)
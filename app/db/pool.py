@@ -0,0 +1,94 @@
+"""Connection pool instrumentation."""
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+from structlog import get_logger
+
+from app.core.config import settings
+
+logger = get_logger(__name__)
+
+
+class PoolWaitStats:
+    """Running statistics of how long checkouts waited for a connection."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.slow_checkouts = 0
+        self.observers: list[Callable[[float], None]] = []
+
+    def record(self, wait: float) -> None:
+        """Record one checkout that waited ``wait`` seconds."""
+        for observer in self.observers:
+            observer(wait)
+        self.checkouts += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics in milliseconds."""
+        return {
+            "checkouts": self.checkouts,
+            "slow_checkouts": self.slow_checkouts,
+            "avg_wait_ms": (
+                round(self.total_wait / self.checkouts * 1000, 3)
+                if self.checkouts
+                else 0.0
+            ),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout wait time."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def connect(self) -> PoolProxiedConnection:
+        """Check out a connection, timing how long it took."""
+        start = time.perf_counter()
+        connection = super().connect()
+        wait = time.perf_counter() - start
+        self.wait_stats.record(wait)
+        if wait * 1000 >= settings.DATABASE_POOL_SLOW_CHECKOUT_MS:
+            self.wait_stats.slow_checkouts += 1
+            logger.warning(
+                "Slow database connection checkout",
+                wait_ms=round(wait * 1000, 3),
+                **pool_status_for(self),
+            )
+        return connection
+
+
+def pool_status_for(pool: Any) -> dict[str, Any]:
+    """Return size and usage counters for a SQLAlchemy pool."""
+    status: dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    return status
+
+
+def pool_status(engine: AsyncEngine) -> dict[str, Any]:
+    """Return pool counters and wait statistics for an async engine."""
+    pool = engine.sync_engine.pool
+    status = pool_status_for(pool)
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status["wait"] = wait_stats.as_dict()
+    return status
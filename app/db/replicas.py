@@ -0,0 +1,149 @@
+"""Read replica routing for read-only endpoints."""
+
+import itertools
+import time
+from collections.abc import AsyncGenerator, Callable
+from typing import Any, TypeVar
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import instrument_pool
+from app.core.timing import instrument_engine
+from app.db.base import AsyncSessionLocal, enforce_sqlite_foreign_keys, engine_options
+
+# Cookie holding the unix time until which reads stick to the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+EndpointT = TypeVar("EndpointT", bound=Callable[..., Any])
+
+_read_only_endpoints: set[Callable[..., Any]] = set()
+
+
+def read_only(endpoint: EndpointT) -> EndpointT:
+    """Mark a non-GET endpoint that writes nothing, such as a batch lookup.
+
+    Its requests do not pin the client's reads to the primary. Apply below
+    the route decorator.
+    """
+    _read_only_endpoints.add(endpoint)
+    return endpoint
+
+
+class ReadReplicaRouter:
+    """Round-robin session factories over a set of read replicas.
+
+    Falls back to the primary session factory when no replica is configured
+    or when the caller must read its own writes.
+    """
+
+    def __init__(self, read_urls: list[str], primary: Any) -> None:
+        self.primary = primary
+        self.engines: list[AsyncEngine] = [
+            create_async_engine(url, **engine_options(url)) for url in read_urls
+        ]
+        for index, engine in enumerate(self.engines):
+            enforce_sqlite_foreign_keys(engine)
+            instrument_engine(engine)
+            instrument_pool(engine, f"replica-{index}")
+        self._factories = [
+            async_sessionmaker(engine, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self._cycle = itertools.cycle(self._factories)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether at least one read replica is configured."""
+        return bool(self._factories)
+
+    def session_factory(self, use_primary: bool = False) -> Any:
+        """Return the next replica session factory, or the primary one."""
+        if use_primary or not self._factories:
+            return self.primary
+        return next(self._cycle)
+
+    async def dispose(self) -> None:
+        """Close all replica connection pools."""
+        for engine in self.engines:
+            await engine.dispose()
+
+
+def must_read_primary(request: Request) -> bool:
+    """Whether this client wrote recently and must read from the primary."""
+    until = request.cookies.get(READ_PRIMARY_COOKIE)
+    if not until:
+        return False
+    try:
+        return float(until) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Pin a client's reads to the primary for a while after it writes.
+
+    Successful non-GET requests set a short-lived cookie, so replication
+    lag never hides the client's own changes from its next reads. Endpoints
+    marked ``read_only`` are exempt.
+    """
+
+    def __init__(self, app: ASGIApp, window: float) -> None:
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            endpoint = getattr(scope.get("route"), "endpoint", None)
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < 400
+                and endpoint not in _read_only_endpoints
+            ):
+                until = time.time() + self.window
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={until:.3f}; Max-Age={int(self.window) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+read_router = ReadReplicaRouter(settings.DATABASE_READ_URLS, AsyncSessionLocal)
+
+
+def get_read_session_factory(request: Request) -> Any:
+    """Get a read session factory, for work that outlives request dependencies.
+
+    Streaming responses run after dependency teardown, so they must open
+    their own session instead of using ``get_read_db``.
+    """
+    return read_router.session_factory(use_primary=must_read_primary(request))
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get a database session for read-only work, preferring a replica."""
+    factory = get_read_session_factory(request)
+    async with factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -1,17 +1,34 @@
 """FastAPI Enterprise Template Main Application."""
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from typing import Any
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from structlog import get_logger
 
 from app.api.v1.api import api_router
+from app.core.admission import AdmissionControlMiddleware
 from app.core.config import settings
+from app.core.executor import ExecutorSaturatedError
 from app.core.logging import setup_logging
-from app.db.base import init_db
+from app.core.metrics import PrometheusMiddleware, mark_process_dead, metrics_response
+from app.core.openapi import install_openapi
+from app.core.rate_limit import RateLimitHeadersMiddleware
+from app.core.redis import close_redis
+from app.core.security import password_hash_executor
+from app.core.timing import RequestTimingMiddleware, TimedAPIRoute
+from app.db.base import (
+    AsyncSessionLocal,
+    check_schema_revision,
+    engine,
+    init_db,
+    log_pool_status,
+)
+from app.db.replicas import ReadYourWritesMiddleware, read_router
+from app.services.postal_code_cache import postal_code_cache
 
 logger = get_logger(__name__)
 
@@ -24,17 +41,44 @@ async def lifespan(app: FastAPI) -> Any:
     setup_logging()
 
     # Initialize database
+    startup_mode = settings.database_startup_mode
     try:
-        await init_db()
-        logger.info("Database initialized successfully")
+        if startup_mode == "create":
+            await init_db()
+        elif startup_mode == "check":
+            await check_schema_revision(engine)
+        logger.info("Database initialized successfully", startup_mode=startup_mode)
     except Exception as e:
         logger.error("Failed to initialize database", error=str(e))
         raise
 
+    # Preload reference data; lookups load it lazily if this fails
+    if postal_code_cache.enabled:
+        try:
+            async with AsyncSessionLocal() as db:
+                await postal_code_cache.load(db)
+        except Exception as e:
+            logger.warning("Failed to preload postal code cache", error=str(e))
+
+    pool_logger = None
+    if settings.DATABASE_POOL_LOG_INTERVAL > 0:
+        pool_logger = asyncio.create_task(
+            log_pool_status(engine, settings.DATABASE_POOL_LOG_INTERVAL)
+        )
+
     yield
 
     # Shutdown
     logger.info("Shutting down FastAPI Enterprise Template application")
+    if pool_logger is not None:
+        pool_logger.cancel()
+        with suppress(asyncio.CancelledError):
+            await pool_logger
+    password_hash_executor.shutdown(wait=False)
+    await read_router.dispose()
+    await engine.dispose()
+    await close_redis()
+    mark_process_dead()
 
 
 def create_application() -> FastAPI:
@@ -49,6 +93,9 @@ def create_application() -> FastAPI:
         docs_url=settings.DOCS_URL,
         redoc_url=settings.REDOC_URL,
         lifespan=lifespan,
+        default_response_class=(
+            ORJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
+        ),
     )
 
     # Set up CORS middleware
@@ -60,8 +107,51 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Pin reads to the primary right after a client writes
+    if read_router.enabled:
+        app.add_middleware(
+            ReadYourWritesMiddleware,
+            window=settings.DATABASE_READ_AFTER_WRITE_SECONDS,
+        )
+
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitHeadersMiddleware)
+
+    # Inside the metrics middleware, so rejections show up as 503s
+    if settings.ADMISSION_CONTROL_ENABLED:
+        app.add_middleware(AdmissionControlMiddleware)
+
+    if settings.METRICS_ENABLED:
+        app.add_middleware(PrometheusMiddleware)
+
+    # Outermost, so timings cover every other middleware
+    app.add_middleware(
+        RequestTimingMiddleware,
+        sample_rate=settings.REQUEST_LOG_SAMPLE_RATE,
+        slow_threshold_ms=settings.SLOW_REQUEST_THRESHOLD_MS,
+        server_timing=settings.SERVER_TIMING_ENABLED,
+    )
+    app.router.route_class = TimedAPIRoute
+
     # Include API router
     app.include_router(api_router, prefix=settings.API_V1_STR)
+    install_openapi(app, settings.OPENAPI_SCHEMA_FILE)
+
+    @app.exception_handler(ExecutorSaturatedError)  # type: ignore
+    async def executor_saturated_handler(
+        request: Request, exc: ExecutorSaturatedError
+    ) -> JSONResponse:
+        """Shed load when a bounded worker pool is full."""
+        logger.warning(
+            "Rejecting request, executor saturated",
+            executor=exc.name,
+            path=request.url.path,
+        )
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server busy, please retry"},
+            headers={"Retry-After": "1"},
+        )
 
     @app.exception_handler(Exception)  # type: ignore
     async def global_exception_handler(
@@ -88,6 +178,13 @@ def create_application() -> FastAPI:
         """Health check endpoint."""
         return {"status": "healthy"}
 
+    if settings.METRICS_ENABLED:
+
+        @app.get("/metrics", include_in_schema=False)  # type: ignore
+        async def metrics() -> Response:
+            """Prometheus metrics, aggregated across worker processes."""
+            return metrics_response()
+
     return app
 
 
@@ -0,0 +1,182 @@
+"""Production server entry point.
+
+Run with::
+
+    python -m app.serve
+
+Starts ``WORKERS`` uvicorn worker processes (one per available CPU when
+``WORKERS=0``) behind uvicorn's process supervisor, which restarts workers
+that exit. uvloop and httptools are used when installed. On SIGTERM each
+worker stops accepting connections and gives in-flight requests up to
+``GRACEFUL_SHUTDOWN_TIMEOUT`` seconds to finish. With
+``WORKER_MAX_REQUESTS`` set, a worker exits after that many requests, plus a
+random jitter, and the supervisor starts a fresh one. A precomputed OpenAPI
+schema that no longer matches the code or settings is regenerated once here
+rather than by every worker.
+"""
+
+import importlib.util
+import os
+import random
+import socket
+import sys
+from pathlib import Path
+
+import uvicorn
+from structlog import get_logger
+from uvicorn.supervisors import Multiprocess
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+
+logger = get_logger(__name__)
+
+# Exit code uvicorn uses when the application fails to start
+STARTUP_FAILURE = 3
+
+
+def worker_count(configured: int) -> int:
+    """Resolve ``WORKERS``: a positive value as is, 0 for one per CPU."""
+    if configured > 0:
+        return configured
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    return max(1, cpus)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def prepare_multiprocess_metrics(workers: int) -> str | None:
+    """Point workers at an empty Prometheus multiprocess directory.
+
+    Sample files left by a previous run would otherwise be aggregated into
+    the new run's metrics. Returns the directory, or None when the workers
+    run in single-process mode.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if workers <= 1 and directory is None:
+        return None
+    directory = directory or settings.PROMETHEUS_MULTIPROC_DIR
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for sample_file in path.glob("*.db"):
+        sample_file.unlink()
+    return directory
+
+
+def prepare_openapi_schema() -> None:
+    """Regenerate the precomputed OpenAPI schema if it is stale.
+
+    Workers only preload the file when its fingerprint matches their code
+    and settings, which differ from the image build's when the deployment
+    overrides a limit. Failing to write it is not fatal: workers then
+    generate the schema live.
+    """
+    if settings.is_development or not settings.OPENAPI_SCHEMA_FILE:
+        return
+    # Imported here, and run before prepare_multiprocess_metrics so it wipes
+    # any metric sample files loading the application creates
+    from app.core.openapi import schema_fingerprint, stored_fingerprint, write_schema
+
+    path = Path(settings.OPENAPI_SCHEMA_FILE)
+    if stored_fingerprint(path) == schema_fingerprint():
+        return
+    from app.main import create_application
+
+    try:
+        write_schema(create_application(), path)
+    except OSError as e:
+        logger.warning(
+            "Could not write the OpenAPI schema", path=str(path), error=str(e)
+        )
+        return
+    logger.info("Regenerated the precomputed OpenAPI schema", path=str(path))
+
+
+class RecyclingServer(uvicorn.Server):
+    """Server that adds a per-process random jitter to its max-requests limit."""
+
+    def __init__(self, config: uvicorn.Config, max_requests_jitter: int = 0) -> None:
+        super().__init__(config)
+        self.max_requests_jitter = max_requests_jitter
+
+    def run(self, sockets: list[socket.socket] | None = None) -> None:
+        """Run the server; each worker process draws its own jitter."""
+        if self.config.limit_max_requests and self.max_requests_jitter:
+            self.config.limit_max_requests += random.randint(  # nosec B311
+                0, self.max_requests_jitter
+            )
+        super().run(sockets=sockets)
+
+
+def build_config(workers: int) -> uvicorn.Config:
+    """Build the uvicorn configuration from ``settings``."""
+    return uvicorn.Config(
+        "app.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        limit_max_requests=settings.WORKER_MAX_REQUESTS or None,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        # The client address, which rate limits key on, is taken from
+        # X-Forwarded-For only when the peer is a listed proxy
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        # Requests are logged by RequestTimingMiddleware; uvicorn's own
+        # records go through the root logger configured by setup_logging
+        access_log=False,
+        log_config=None,
+        log_level=settings.LOG_LEVEL.lower(),
+    )
+
+
+def main() -> None:
+    """Start the workers and block until they stop."""
+    setup_logging()
+    workers = worker_count(settings.WORKERS)
+    # Workers re-read settings; make them agree on the resolved count
+    os.environ["WORKERS"] = str(workers)
+    prepare_openapi_schema()
+    metrics_dir = prepare_multiprocess_metrics(workers)
+    config = build_config(workers)
+    server = RecyclingServer(config, settings.WORKER_MAX_REQUESTS_JITTER)
+
+    logger.info(
+        "Starting production server",
+        app=settings.APP_NAME,
+        version=settings.APP_VERSION,
+        environment=settings.ENVIRONMENT,
+        bind=f"{config.host}:{config.port}",
+        workers=workers,
+        workers_auto=settings.WORKERS <= 0,
+        cpus=os.cpu_count(),
+        loop=config.loop,
+        http=config.http,
+        max_requests=settings.WORKER_MAX_REQUESTS or None,
+        max_requests_jitter=settings.WORKER_MAX_REQUESTS_JITTER,
+        graceful_shutdown_timeout=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        metrics_multiproc_dir=metrics_dir,
+        pid=os.getpid(),
+    )
+
+    # The supervisor restarts workers that exit, including recycled ones, so
+    # it is used for a single worker too when recycling is enabled
+    if workers > 1 or config.limit_max_requests:
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+        if not server.started:
+            sys.exit(STARTUP_FAILURE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""In-process cache of the postal code reference table."""
+
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog import get_logger
+
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.crud.postal_code import postal_code
+from app.models.postal_code import PostalCode
+from app.services.prefix_index import PrefixIndex, normalize
+
+logger = get_logger(__name__)
+
+
+class PostalCodeCache:
+    """Full in-memory copy of ``postal_codes`` indexed by id and by code.
+
+    The table is small, static reference data, so the whole table is loaded
+    at once and lookups of known keys never touch the database while the
+    snapshot is fresh. The snapshot is reloaded when it is older than ``ttl``
+    seconds or after ``CRUDPostalCode`` reports a write.
+
+    Invalidation is per process, so a key the snapshot lacks may have been
+    added by another worker or by the seeder: lookups fall back to the
+    database for such keys before answering "not found", and a key found
+    there marks the snapshot stale. Renamed codes and ``search`` results
+    are only refreshed by the TTL.
+
+    Each load also builds the prefix indexes behind ``search``.
+    """
+
+    def __init__(self, *, ttl: float, enabled: bool = True) -> None:
+        self.ttl = ttl
+        self.enabled = enabled
+        self._by_id: dict[int, PostalCode] = {}
+        self._by_code: dict[str, PostalCode] = {}
+        self._code_index = PrefixIndex([])
+        self._name_index = PrefixIndex([])
+        self._word_index = PrefixIndex([])
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+        self.found = 0
+        self.not_found = 0
+        self.fallbacks = 0
+        self.loads = 0
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the snapshot must be (re)loaded before answering lookups."""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    async def load(self, db: AsyncSession) -> None:
+        """Replace the snapshot with the current table contents."""
+        rows = await postal_code.get_all(db)
+        # Detach the rows, so a rollback of ``db`` cannot expire the snapshot
+        for row in rows:
+            db.expunge(row)
+        self._by_id = {row.id: row for row in rows}
+        self._by_code = {row.postal_code: row for row in rows}
+        self._build_indexes(rows)
+        self._loaded_at = time.monotonic()
+        self.loads += 1
+        logger.info("Postal code cache loaded", entries=len(rows))
+
+    def _build_indexes(self, rows: list[PostalCode]) -> None:
+        names = [(normalize(row.city_name), row.id) for row in rows]
+        # Later words of a name, so "bugey" finds "Ambérieu-en-Bugey"
+        words = [
+            (" ".join(parts[start:]), id)
+            for name, id in names
+            for parts in [name.split()]
+            for start in range(1, len(parts))
+        ]
+        self._code_index = PrefixIndex((row.postal_code, row.id) for row in rows)
+        self._name_index = PrefixIndex(names)
+        self._word_index = PrefixIndex(words)
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale so the next lookup reloads it."""
+        self._loaded_at = None
+
+    async def _ensure_fresh(self, db: AsyncSession) -> None:
+        if not self.is_stale:
+            return
+        async with self._lock:
+            if self.is_stale:
+                await self.load(db)
+
+    def _count(self, found: PostalCode | None) -> PostalCode | None:
+        if found is None:
+            self.not_found += 1
+        else:
+            self.found += 1
+        return found
+
+    def _fell_back(self, found_any: bool) -> None:
+        """Record a database lookup of keys missing from the snapshot."""
+        self.fallbacks += 1
+        if found_any:
+            # Written by another process since the snapshot was loaded
+            self.invalidate()
+
+    async def get(self, db: AsyncSession, id: int) -> PostalCode | None:
+        """Get a postal code by ID."""
+        if not self.enabled:
+            return await postal_code.get(db, id=id)
+        await self._ensure_fresh(db)
+        found = self._by_id.get(id)
+        record_cache_lookup("postal_code", found is not None)
+        if found is None:
+            found = await postal_code.get(db, id=id)
+            self._fell_back(found is not None)
+        return self._count(found)
+
+    async def get_by_postal_code(
+        self, db: AsyncSession, postal_code_str: str
+    ) -> PostalCode | None:
+        """Get a postal code by its postal code string."""
+        if not self.enabled:
+            return await postal_code.get_by_postal_code(db, postal_code=postal_code_str)
+        await self._ensure_fresh(db)
+        found = self._by_code.get(postal_code_str)
+        record_cache_lookup("postal_code", found is not None)
+        if found is None:
+            found = await postal_code.get_by_postal_code(
+                db, postal_code=postal_code_str
+            )
+            self._fell_back(found is not None)
+        return self._count(found)
+
+    async def get_many(
+        self, db: AsyncSession, ids: list[int]
+    ) -> list[PostalCode | None]:
+        """Get postal codes by ID, in the order of ``ids``, None for unknown IDs."""
+        if not self.enabled:
+            return await postal_code.get_many(db, ids)
+        await self._ensure_fresh(db)
+        found = {id: self._by_id[id] for id in ids if id in self._by_id}
+        missing = [id for id in set(ids) if id not in found]
+        for id in ids:
+            record_cache_lookup("postal_code", id in found)
+        if missing:
+            rows = [row for row in await postal_code.get_many(db, missing) if row]
+            found.update((row.id, row) for row in rows)
+            self._fell_back(bool(rows))
+        return [self._count(found.get(id)) for id in ids]
+
+    async def get_many_by_postal_code(
+        self, db: AsyncSession, postal_codes: list[str]
+    ) -> list[PostalCode | None]:
+        """Like ``get_many``, by postal code string."""
+        if not self.enabled:
+            return await postal_code.get_many_by_postal_code(db, postal_codes)
+        await self._ensure_fresh(db)
+        found = {
+            code: self._by_code[code] for code in postal_codes if code in self._by_code
+        }
+        missing = [code for code in set(postal_codes) if code not in found]
+        for code in postal_codes:
+            record_cache_lookup("postal_code", code in found)
+        if missing:
+            rows = [
+                row
+                for row in await postal_code.get_many_by_postal_code(db, missing)
+                if row
+            ]
+            found.update((row.postal_code, row) for row in rows)
+            self._fell_back(bool(rows))
+        return [self._count(found.get(code)) for code in postal_codes]
+
+    async def get_existing_ids(self, db: AsyncSession, ids: set[int]) -> set[int]:
+        """Return which of ``ids`` are known postal code IDs."""
+        if not self.enabled:
+            return await postal_code.get_existing_ids(db, ids)
+        await self._ensure_fresh(db)
+        known = {id for id in ids if id in self._by_id}
+        missing = ids - known
+        if missing:
+            added = await postal_code.get_existing_ids(db, missing)
+            self._fell_back(bool(added))
+            known |= added
+        return known
+
+    async def search(
+        self, db: AsyncSession, query: str, *, limit: int
+    ) -> list[PostalCode]:
+        """Postal codes whose code or city name starts with ``query``.
+
+        Code matches come first, then names starting with the query, then
+        names with a later word starting with it. Within each group, matches
+        ending at a word or number boundary come first, so ``paris 1`` ranks
+        ``Paris 1er`` before ``Paris 10e``, and numbers sort by value. Case,
+        accents and separators are ignored for names.
+        """
+        if not self.enabled:
+            return await postal_code.search(db, query, limit=limit)
+        await self._ensure_fresh(db)
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        found: dict[int, PostalCode] = {}
+        for index, key in (
+            (self._code_index, query.strip()),
+            (self._name_index, prefix),
+            (self._word_index, prefix),
+        ):
+            for id in index.top(key, limit):
+                found.setdefault(id, self._by_id[id])
+                if len(found) == limit:
+                    return list(found.values())
+        return list(found.values())
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache size, lookup outcomes and database fallbacks."""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._by_id),
+            "found": self.found,
+            "not_found": self.not_found,
+            "fallbacks": self.fallbacks,
+            "loads": self.loads,
+        }
+
+
+postal_code_cache = PostalCodeCache(
+    ttl=settings.POSTAL_CODE_CACHE_TTL,
+    enabled=settings.POSTAL_CODE_CACHE_ENABLED,
+)
+postal_code.on_change(postal_code_cache.invalidate)
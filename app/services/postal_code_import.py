@@ -0,0 +1,94 @@
+"""Streaming import of postal code datasets from CSV."""
+
+import csv
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.postal_code import postal_code
+
+
+@dataclass
+class ImportProgress:
+    """Running totals of an import, passed to the progress callback.
+
+    ``upserted`` counts rows inserted or changed; rows already holding the
+    file's city are not rewritten and not counted.
+    """
+
+    rows: int = 0
+    upserted: int = 0
+    skipped: int = 0
+    chunks: int = 0
+    start: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the import started."""
+        return time.perf_counter() - self.start
+
+    @property
+    def rows_per_second(self) -> float:
+        """Input rows processed per second."""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def read_postal_codes(
+    path: Path,
+    *,
+    postal_code_column: str = "postal_code",
+    city_column: str = "city_name",
+    delimiter: str = ",",
+    encoding: str = "utf-8-sig",
+) -> Iterator[dict[str, str]]:
+    """Yield ``{"postal_code", "city_name"}`` rows from a CSV file, lazily.
+
+    Rows missing either value are yielded with empty strings and counted as
+    skipped by ``import_postal_codes``.
+    """
+    with path.open(newline="", encoding=encoding) as csv_file:
+        reader = csv.DictReader(csv_file, delimiter=delimiter)
+        missing = {postal_code_column, city_column} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path} has no column {', '.join(sorted(missing))}")
+        for record in reader:
+            yield {
+                "postal_code": (record[postal_code_column] or "").strip(),
+                "city_name": (record[city_column] or "").strip(),
+            }
+
+
+def chunked(rows: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Split ``rows`` into lists of at most ``size`` items."""
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+async def import_postal_codes(
+    db: AsyncSession,
+    rows: Iterable[dict[str, str]],
+    *,
+    chunk_size: int = 1000,
+    on_progress: Callable[[ImportProgress], None] | None = None,
+) -> ImportProgress:
+    """Upsert ``rows`` in chunks, one transaction per chunk.
+
+    Only one chunk is held in memory at a time, and an interrupted import
+    can simply be rerun.
+    """
+    progress = ImportProgress()
+    for chunk in chunked(rows, chunk_size):
+        valid = [row for row in chunk if row["postal_code"] and row["city_name"]]
+        progress.rows += len(chunk)
+        progress.skipped += len(chunk) - len(valid)
+        progress.upserted += await postal_code.upsert_many(db, objs_in=valid)
+        progress.chunks += 1
+        if on_progress is not None:
+            on_progress(progress)
+    return progress
@@ -0,0 +1,147 @@
+"""Sorted-array prefix index for type-ahead search."""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from itertools import chain
+
+# Punctuation that separates words in place names
+_SEPARATORS = ("-", "'", "’", "_")
+_NUMBER = re.compile(r"(\d+)")
+# Sorts after any character a normalized key can contain
+_MAX_CHAR = chr(0x10FFFF)
+# Ranked results kept per index; type-ahead repeats the same short prefixes
+TOP_CACHE_SIZE = 4096
+
+
+def normalize(text: str) -> str:
+    """Fold case and accents and collapse separators.
+
+    ``L'Haÿ-les-Roses`` becomes ``l hay les roses``.
+    """
+    folded = text.casefold()
+    if not folded.isascii():
+        decomposed = unicodedata.normalize("NFKD", folded)
+        folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    # A chain of str.replace is several times faster than str.translate here
+    for separator in _SEPARATORS:
+        folded = folded.replace(separator, " ")
+    return " ".join(folded.split())
+
+
+def _natural_key(key: str) -> tuple[str | int, ...]:
+    """Sort key comparing runs of digits by value: ``2e`` before ``10e``."""
+    return tuple(
+        int(part) if index % 2 else part
+        for index, part in enumerate(_NUMBER.split(key))
+    )
+
+
+class PrefixIndex:
+    """Keys sorted once, so all keys with a prefix are one contiguous run.
+
+    A lookup is a binary search for the first key ``>= prefix`` followed by
+    a scan while keys still start with it: O(log n + matches), and two flat
+    lists instead of a node per character as in a trie.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, int]]) -> None:
+        pairs = sorted(entries)
+        self._keys = [key for key, _ in pairs]
+        self._ids = [id for _, id in pairs]
+        # Natural-order rank of each key, built on the first top() call
+        self._ranks: list[int] | None = None
+        self._rank_breaks: list[int] = []
+        self._top: dict[tuple[str, int], list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, prefix: str) -> Iterator[int]:
+        """Yield the IDs of keys starting with ``prefix``, in key order."""
+        keys = self._keys
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix):
+            yield self._ids[position]
+            position += 1
+
+    def top(self, prefix: str, limit: int) -> list[int]:
+        """IDs of up to ``limit`` keys starting with ``prefix``, best first.
+
+        Keys where the prefix ends at a word or a number rank first, so
+        ``paris 1`` finds ``paris 1er`` before ``paris 10e``; then keys in
+        natural order, comparing numbers by value.
+        """
+        cached = self._top.get((prefix, limit))
+        if cached is not None:
+            return cached
+        if len(self._top) >= TOP_CACHE_SIZE:
+            self._top.clear()
+        ranks = self._natural_ranks()
+        keys = self._keys
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + _MAX_CHAR, start)
+        if start == end:
+            self._top[prefix, limit] = []
+            return []
+
+        def run(low: str, high: str) -> tuple[int, int]:
+            return (
+                bisect_left(keys, prefix + low, start, end),
+                bisect_left(keys, prefix + high, start, end),
+            )
+
+        # Next character after the prefix: " " < digits < letters
+        spaces = run(" ", "!")
+        digits = run("0", ":")
+        if prefix[-1:].isdigit():
+            # The number goes on in the digits run; everything else ends it
+            boundary = [(start, digits[0]), (digits[1], end)]
+            inner = [digits]
+        else:
+            exact = start + 1 if keys[start] == prefix else start
+            boundary = [(start, exact), spaces, digits]
+            inner = [(exact, spaces[0]), (spaces[1], digits[0]), (digits[1], end)]
+
+        found: list[int] = []
+        for ranges in (boundary, inner):
+            if len(found) < limit:
+                found += self._first(ranges, limit - len(found), ranks)
+        ids = [self._ids[position] for position in found]
+        self._top[prefix, limit] = ids
+        return ids
+
+    def _first(
+        self, ranges: list[tuple[int, int]], count: int, ranks: list[int]
+    ) -> list[int]:
+        """The ``count`` positions in ``ranges`` that come first naturally."""
+        ranges = [(low, high) for low, high in ranges if low < high]
+        if len(ranges) == 1:
+            low, high = ranges[0]
+            # Key order is natural order unless a break falls inside the run
+            if bisect_left(self._rank_breaks, high) == bisect_left(
+                self._rank_breaks, low + 1
+            ):
+                return list(range(low, min(high, low + count)))
+        positions = chain.from_iterable(range(low, high) for low, high in ranges)
+        return sorted(positions, key=ranks.__getitem__)[:count]
+
+    def _natural_ranks(self) -> list[int]:
+        if self._ranks is not None:
+            return self._ranks
+        order = sorted(
+            range(len(self._keys)),
+            key=lambda position: _natural_key(self._keys[position]),
+        )
+        ranks = [0] * len(order)
+        for rank, position in enumerate(order):
+            ranks[position] = rank
+        self._ranks = ranks
+        # Positions whose key sorts naturally before the previous key
+        self._rank_breaks = [
+            position
+            for position in range(1, len(ranks))
+            if ranks[position] < ranks[position - 1]
+        ]
+        return ranks
@@ -0,0 +1,70 @@
+"""Benchmark access token verification with and without the verified-token cache.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_jwt_verify --tokens 1000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from jose import jwt
+
+from app.core import security
+from app.core.config import settings
+from benchmarks.common import quiet_logging
+
+
+def _legacy_verify(token: str) -> str | None:
+    # The previous implementation: string secret, no cache
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return payload.get("sub")
+
+
+def _measure(
+    verify: Callable[[str], str | None], tokens: list[str], rounds: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            if verify(token) is None:
+                raise RuntimeError("token failed verification")
+    return rounds * len(tokens) / (time.perf_counter() - start)
+
+
+def run(token_count: int, rounds: int) -> None:
+    """Verify ``token_count`` distinct tokens ``rounds`` times per variant."""
+    tokens = [security.create_access_token(f"user{i}") for i in range(token_count)]
+
+    def uncached(token: str) -> str | None:
+        security.verified_token_cache.clear()
+        return security.verify_token(token)
+
+    variants: dict[str, Callable[[str], str | None]] = {
+        "jwt.decode (before)": _legacy_verify,
+        "keyring, no cache": uncached,
+        "keyring + cache": security.verify_token,
+    }
+    security.verified_token_cache.clear()
+    for name, verify in variants.items():
+        rate = _measure(verify, tokens, rounds)
+        print(f"{name:>20}: {rate:>10.0f} verifications/s")
+    print(
+        f"cache: {security.verified_token_cache.hits} hits, "
+        f"{security.verified_token_cache.misses} misses"
+    )
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    quiet_logging()
+    run(args.tokens, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
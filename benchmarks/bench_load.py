@@ -0,0 +1,287 @@
+"""Load test the user and postal code endpoints against a baseline.
+
+Seeds a database with ``--users`` users spread over ``--postal-codes``
+synthetic postal codes (or La Poste's dataset, with ``--postal-csv``),
+starts ``app.main:app`` (built by ``create_application()``) with the
+production launcher in a separate process, and drives each scenario over
+HTTP with ``--concurrency`` concurrent clients. Throughput and p50/p95/p99
+latency per scenario are printed and written to ``--output`` as JSON.
+
+With ``--save-baseline`` the report becomes the new baseline. Otherwise,
+when the baseline file exists, each scenario is compared to it and the run
+exits with status 1 if throughput drops, or p95 latency rises, by more than
+``--threshold``. Baselines are only comparable on the machine that recorded
+them.
+
+Seeding 100k users takes a while; pass ``--database`` to keep the SQLite
+file and reuse it on the next run.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_load --save-baseline
+    poetry run python -m benchmarks.bench_load --database /tmp/load.db
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.pagination import encode_cursor
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.models.postal_code import PostalCode
+from app.models.user import User
+from app.services.postal_code_import import import_postal_codes, read_postal_codes
+from benchmarks.bench_postal_code_search import make_queries, make_rows
+from benchmarks.common import LoadResult, drive
+
+DEFAULT_BASELINE = Path(__file__).with_name("load_baseline.json")
+
+# Metrics compared against the baseline, and whether higher is better
+COMPARED = {"rps": True, "p95_ms": False}
+
+
+def _postal_code_rows(args: argparse.Namespace) -> Iterator[dict[str, str]]:
+    if args.postal_csv is None:
+        return iter(make_rows(args.postal_codes))
+    return read_postal_codes(
+        args.postal_csv,
+        postal_code_column=args.postal_code_column,
+        city_column=args.city_column,
+        delimiter=args.delimiter,
+    )
+
+
+async def seed(database_url: str, args: argparse.Namespace) -> tuple[int, int]:
+    """Create the schema and seed it unless it already holds enough users.
+
+    Returns the user and postal code counts.
+    """
+    engine = create_async_engine(database_url)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with factory() as db:
+            users = await db.scalar(select(func.count()).select_from(User))
+            if users < args.users:
+                print(f"seeding {args.users - users} users and postal codes...")
+                await import_postal_codes(db, _postal_code_rows(args))
+                postal_code_ids = list(await db.scalars(select(PostalCode.id)))
+                # One shared hash: seeding is about rows, not bcrypt
+                hashed_password = get_password_hash("benchmark")
+                rng = random.Random(0)
+                rows = (
+                    {
+                        "email": f"load{i}@example.com",
+                        "hashed_password": hashed_password,
+                        "full_name": f"Load User {i}",
+                        "age": rng.randint(18, 90),
+                        "postal_code_id": rng.choice(postal_code_ids),
+                    }
+                    for i in range(users, args.users)
+                )
+                while chunk := list(islice(rows, 5000)):
+                    await db.execute(insert(User), chunk)
+                await db.commit()
+            return (
+                await db.scalar(select(func.count()).select_from(User)),
+                await db.scalar(select(func.count()).select_from(PostalCode)),
+            )
+    finally:
+        await engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def start_server(database_url: str, workers: int) -> tuple[subprocess.Popen, str]:
+    """Start the production launcher on a free local port."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "ENVIRONMENT": "production",
+        "DATABASE_URL": database_url,
+        "DATABASE_STARTUP_MODE": "skip",
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "WORKERS": str(workers),
+        "LOG_LEVEL": "ERROR",
+    }
+    process = subprocess.Popen(  # nosec B603
+        [sys.executable, "-m", "app.serve"], env=env
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def wait_until_ready(base_url: str, process: subprocess.Popen) -> None:
+    """Poll ``/health`` until the server answers."""
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with status {process.returncode}")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start within 30s")
+
+
+def scenarios(users: int, postal_codes: int) -> dict[str, Callable[[int], str]]:
+    """Request paths per scenario; each picks rows at random."""
+    rng = random.Random(2)
+    prefixes = make_queries(make_rows(min(postal_codes, 1000)), 1000)
+    api = "/api/v1"
+
+    def page(query: str = "") -> Callable[[int], str]:
+        def path(_: int) -> str:
+            cursor = encode_cursor(rng.randint(0, max(0, users - 50)))
+            return f"{api}/users/?limit=50&cursor={cursor}{query}"
+
+        return path
+
+    return {
+        "users_page": page(),
+        "users_page_include_postal_code": page("&include=postal_code"),
+        "user_detail": lambda _: f"{api}/users/{rng.randint(1, users)}",
+        "postal_codes_page": lambda _: f"{api}/postal-codes/?limit=50",
+        "postal_code_detail": (
+            lambda _: f"{api}/postal-codes/{rng.randint(1, postal_codes)}"
+        ),
+        "postal_code_search": lambda i: (
+            f"{api}/postal-codes/search?q={prefixes[i % len(prefixes)]}"
+        ),
+    }
+
+
+async def run_load(
+    base_url: str, paths: dict[str, Callable[[int], str]], args: argparse.Namespace
+) -> dict[str, LoadResult]:
+    """Warm up, then drive every scenario in turn."""
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        for name, path in paths.items():
+            await drive(
+                client, path, requests=args.warmup, concurrency=args.concurrency
+            )
+            results[name] = await drive(
+                client, path, requests=args.requests, concurrency=args.concurrency
+            )
+            print(f"{name:>32}: {results[name].summary()}")
+    return results
+
+
+def compare(
+    report: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Describe every metric that regressed by more than ``threshold``."""
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            change = (current[metric] - previous[metric]) / previous[metric]
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(
+                    f"{name} {metric}: {previous[metric]} -> {current[metric]} "
+                    f"({change:+.0%})"
+                )
+    return regressions
+
+
+async def run(database_url: str, args: argparse.Namespace) -> dict[str, Any]:
+    """Seed, serve and load the application; return the JSON report."""
+    users, postal_codes = await seed(database_url, args)
+    process, base_url = start_server(database_url, args.workers)
+    try:
+        await wait_until_ready(base_url, process)
+        results = await run_load(base_url, scenarios(users, postal_codes), args)
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "database": database_url.split(":", 1)[0],
+            "users": users,
+            "postal_codes": postal_codes,
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": {name: result.stats() for name, result in results.items()},
+    }
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--postal-codes", type=int, default=39_000)
+    parser.add_argument("--postal-csv", type=Path, help="La Poste CSV to load")
+    parser.add_argument("--postal-code-column", default="Code_postal")
+    parser.add_argument("--city-column", default="Nom_de_la_commune")
+    parser.add_argument("--delimiter", default=";")
+    parser.add_argument("--database", type=Path, help="SQLite file to keep")
+    parser.add_argument("--database-url", help="Use this database instead")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--output", type=Path, help="Also write the report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = args.database or Path(tmp) / "load.db"
+        database_url = args.database_url or f"sqlite+aiosqlite:///{database}"
+        report = asyncio.run(run(database_url, args))
+
+    rendered = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        args.output.write_text(rendered)
+    if args.save_baseline:
+        args.baseline.write_text(rendered)
+        print(f"baseline saved to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; rerun with --save-baseline")
+        return
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"no regression beyond {args.threshold:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark endpoint throughput with INFO logging, synchronous vs queued.
+
+stdout is replaced by a pipe drained at ``--pipe-rate`` bytes per second to
+reproduce a slow log collector; ``/dev/null`` is the unthrottled baseline.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_logging
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import TextIO
+
+from app.core import logging as app_logging
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.crud.postal_code import postal_code
+from app.main import create_application
+from benchmarks.common import asgi_client, drive, override_database, sqlite_database
+
+ROWS = 20
+
+
+def slow_pipe(rate: int) -> TextIO:
+    """Return a writable stream whose reader drains ``rate`` bytes/second."""
+    read_fd, write_fd = os.pipe()
+    chunk = 4096
+
+    def drain() -> None:
+        while os.read(read_fd, chunk):
+            time.sleep(chunk / rate)
+
+    threading.Thread(target=drain, daemon=True).start()
+    return os.fdopen(write_fd, "w", buffering=1)
+
+
+async def run(requests: int, concurrency: int, pipe_rate: int) -> None:
+    """Drive the same endpoint under each logging configuration."""
+    results = sys.stdout
+    async with sqlite_database() as (_, factory):
+        async with factory() as db:
+            for i in range(1, ROWS + 1):
+                await postal_code.create(
+                    db,
+                    obj_in={"postal_code": f"750{i:02d}", "city_name": f"Paris {i}e"},
+                )
+
+        # Every request reaches the endpoint and logs two lines
+        response_cache.enabled = False
+        app = create_application()
+        override_database(app, factory)
+
+        variants = [
+            ("sync, /dev/null", False, open(os.devnull, "w")),
+            ("sync, slow pipe", False, slow_pipe(pipe_rate)),
+            ("async, slow pipe", True, slow_pipe(pipe_rate)),
+        ]
+        settings.LOG_LEVEL = "INFO"
+        async with asgi_client(app) as client:
+            for name, log_async, stream in variants:
+                settings.LOG_ASYNC = log_async
+                sys.stdout = stream
+                app_logging.setup_logging()
+                try:
+                    result = await drive(
+                        client,
+                        lambda i: f"/api/v1/postal-codes/{i % ROWS + 1}",
+                        requests=requests,
+                        concurrency=concurrency,
+                    )
+                    stats = app_logging.logging_stats()
+                finally:
+                    sys.stdout = results
+                    app_logging.shutdown_logging()
+                dropped = stats.get("dropped", 0)
+                print(f"{name:>17}: {result.summary()}  dropped={dropped}")
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pipe-rate", type=int, default=256 * 1024)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.pipe_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark user page latency by depth for offset and keyset pagination.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_pagination --rows 200000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import insert
+
+from app.crud.user import user
+from app.models.user import User
+from benchmarks.common import quiet_logging, sqlite_database
+
+PAGE_SIZE = 100
+
+
+async def run(rows: int, repeat: int) -> None:
+    """Seed ``rows`` users and time one page at increasing depths."""
+    async with sqlite_database() as (engine, factory):
+        async with engine.begin() as conn:
+            for start in range(0, rows, 10_000):
+                await conn.execute(
+                    insert(User),
+                    [
+                        {"email": f"user{i}@example.com", "hashed_password": "x"}
+                        for i in range(start, min(rows, start + 10_000))
+                    ],
+                )
+
+        depths = [0, rows // 10, rows // 4, rows // 2, rows - PAGE_SIZE]
+        print(f"{'depth':>8} {'offset ms':>10} {'keyset ms':>10}")
+        async with factory() as db:
+            for depth in depths:
+                timings: dict[str, list[float]] = {"offset": [], "keyset": []}
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    await user.get_multi(db, skip=depth, limit=PAGE_SIZE)
+                    timings["offset"].append(time.perf_counter() - start)
+
+                    # IDs start at 1, so the row at ``depth`` follows id == depth
+                    start = time.perf_counter()
+                    await user.get_multi(db, limit=PAGE_SIZE, after_id=depth)
+                    timings["keyset"].append(time.perf_counter() - start)
+                    db.expunge_all()
+
+                print(
+                    f"{depth:>8} "
+                    f"{statistics.median(timings['offset']) * 1000:>10.2f} "
+                    f"{statistics.median(timings['keyset']) * 1000:>10.2f}"
+                )
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    quiet_logging()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
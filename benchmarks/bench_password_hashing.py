@@ -0,0 +1,87 @@
+"""Benchmark health endpoint latency while passwords are hashed concurrently.
+
+Compares hashing inline on the event loop (the previous behaviour) with the
+bounded password hashing pool. Run with::
+
+    poetry run python -m benchmarks.bench_password_hashing
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.core.executor import ExecutorSaturatedError
+from app.core.security import get_password_hash, get_password_hash_async
+from app.main import create_application
+from benchmarks.common import asgi_client, percentile, quiet_logging
+
+
+async def hash_load(mode: str, hashes: int, concurrency: int) -> None:
+    """Hash ``hashes`` passwords with ``concurrency`` concurrent tasks."""
+    remaining = iter(range(hashes))
+
+    async def worker() -> None:
+        for i in remaining:
+            if mode == "sync":
+                get_password_hash(f"password-{i}")
+                await asyncio.sleep(0)
+            else:
+                try:
+                    await get_password_hash_async(f"password-{i}")
+                except ExecutorSaturatedError:
+                    await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    """Poll the health endpoint on a fixed schedule until ``stop`` is set.
+
+    Latency is measured from the scheduled send time, so time spent waiting
+    for a blocked event loop is counted instead of silently skipped.
+    """
+    interval = 0.005
+    latencies: list[float] = []
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        response = await client.get("/api/v1/health/")
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+        response.raise_for_status()
+        scheduled = max(scheduled + interval, time.perf_counter())
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+    return latencies
+
+
+async def run(mode: str, hashes: int, concurrency: int) -> list[float]:
+    """Run one scenario and return health latencies in milliseconds."""
+    async with asgi_client(create_application()) as ac:
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(ac, stop))
+        await hash_load(mode, hashes, concurrency)
+        stop.set()
+        return await probe
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hashes", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    quiet_logging()
+
+    for mode in ("sync", "async"):
+        latencies = asyncio.run(run(mode, args.hashes, args.concurrency))
+        print(
+            f"{mode:>5}: {len(latencies):5d} probes  "
+            f"p50={statistics.median(latencies):8.2f}ms  "
+            f"p99={percentile(latencies, 99):8.2f}ms  "
+            f"max={max(latencies):8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
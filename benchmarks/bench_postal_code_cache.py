@@ -0,0 +1,70 @@
+"""Benchmark postal code lookups with and without the reference-data cache.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_postal_code_cache
+"""
+
+import argparse
+import asyncio
+
+from app.core.cache import response_cache
+from app.crud.postal_code import postal_code
+from app.main import create_application
+from app.services.postal_code_cache import postal_code_cache
+from benchmarks.common import (
+    asgi_client,
+    drive,
+    override_database,
+    quiet_logging,
+    sqlite_database,
+)
+
+ROWS = 20
+
+
+async def run(requests: int, concurrency: int) -> None:
+    """Seed a database and compare lookup throughput."""
+    async with sqlite_database() as (_, factory):
+        async with factory() as db:
+            for i in range(1, ROWS + 1):
+                await postal_code.create(
+                    db,
+                    obj_in={"postal_code": f"750{i:02d}", "city_name": f"Paris {i}e"},
+                )
+
+        # Measure the lookup path itself, not the response cache in front of it
+        response_cache.enabled = False
+        app = create_application()
+        override_database(app, factory)
+
+        def by_id(i: int) -> str:
+            return f"/api/v1/postal-codes/{i % ROWS + 1}"
+
+        def by_code(i: int) -> str:
+            return f"/api/v1/postal-codes/by-code/750{i % ROWS + 1:02d}"
+
+        async with asgi_client(app) as client:
+            for enabled in (False, True):
+                postal_code_cache.enabled = enabled
+                postal_code_cache.invalidate()
+                label = "cache" if enabled else "no cache"
+                for name, path in (("by id", by_id), ("by code", by_code)):
+                    result = await drive(
+                        client, path, requests=requests, concurrency=concurrency
+                    )
+                    print(f"{label:>8} {name:>7}: {result.summary()}")
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    quiet_logging()
+    asyncio.run(run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
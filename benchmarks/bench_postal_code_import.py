@@ -0,0 +1,93 @@
+"""Compare the row-by-row postal code seeder with the chunked CSV import.
+
+A synthetic CSV the size of the French national dataset is loaded into an
+empty SQLite database, then loaded again to time an idempotent rerun. The
+row-by-row seeder (lookup, insert and commit per code) is timed on the
+first ``--baseline-rows`` rows only and extrapolated.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_postal_code_import --rows 39000
+"""
+
+import argparse
+import asyncio
+import csv
+import tempfile
+import time
+from collections.abc import Iterator
+from itertools import islice
+from pathlib import Path
+
+from app.core.cache import response_cache
+from app.crud.postal_code import postal_code
+from app.services.postal_code_import import import_postal_codes, read_postal_codes
+from benchmarks.common import quiet_logging, sqlite_database
+
+
+def write_dataset(path: Path, rows: int) -> None:
+    """Write ``rows`` distinct postal codes in La Poste's CSV layout."""
+    with path.open("w", newline="") as csv_file:
+        writer = csv.writer(csv_file, delimiter=";")
+        writer.writerow(["Code_postal", "Nom_de_la_commune"])
+        for i in range(rows):
+            writer.writerow([f"{i:05d}", f"COMMUNE {i}"])
+
+
+def _rows(path: Path) -> Iterator[dict[str, str]]:
+    return read_postal_codes(
+        path,
+        postal_code_column="Code_postal",
+        city_column="Nom_de_la_commune",
+        delimiter=";",
+    )
+
+
+async def run(rows: int, baseline_rows: int, chunk_size: int) -> None:
+    """Time both loaders."""
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = Path(tmp) / "codes.csv"
+        write_dataset(dataset, rows)
+
+        async with sqlite_database(Path(tmp) / "row.db") as (_, factory):
+            async with factory() as db:
+                start = time.perf_counter()
+                for row in islice(_rows(dataset), baseline_rows):
+                    existing = await postal_code.get_by_postal_code(
+                        db, row["postal_code"]
+                    )
+                    if existing is None:
+                        await postal_code.create(db, obj_in=row)
+                seconds = time.perf_counter() - start
+            estimate = seconds / baseline_rows * rows
+            print(
+                f"row by row : {baseline_rows / seconds:9.0f} rows/s  "
+                f"(~{estimate:.1f}s for {rows} rows)"
+            )
+
+        async with sqlite_database(Path(tmp) / "bulk.db") as (_, factory):
+            async with factory() as db:
+                for label in ("bulk load", "bulk rerun"):
+                    progress = await import_postal_codes(
+                        db, _rows(dataset), chunk_size=chunk_size
+                    )
+                    print(
+                        f"{label:<11}: {progress.rows_per_second:9.0f} rows/s  "
+                        f"({progress.elapsed:.1f}s for {progress.rows} rows)"
+                    )
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=39000)
+    parser.add_argument("--baseline-rows", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    quiet_logging()
+    response_cache.enabled = False
+    asyncio.run(run(args.rows, args.baseline_rows, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
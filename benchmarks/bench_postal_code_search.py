@@ -0,0 +1,100 @@
+"""Compare type-ahead search latency: in-memory prefix index vs ``LIKE``.
+
+Loads ``--rows`` synthetic postal codes into SQLite and runs the same
+prefixes (2-5 characters of codes and city names, as typed) through
+``PostalCodeCache.search`` and ``CRUDPostalCode.search``.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_postal_code_search --rows 40000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+
+from app.core.cache import response_cache
+from app.crud.postal_code import postal_code
+from app.services.postal_code_cache import PostalCodeCache
+from benchmarks.common import percentile, quiet_logging, sqlite_database
+
+TOWNS = ["Saint", "Sainte", "Villeneuve", "Paris", "Lyon", "Montagne", "Bourg"]
+
+
+def make_rows(count: int) -> list[dict[str, str]]:
+    """Distinct codes with town names sharing common prefixes, like real data."""
+    rng = random.Random(0)
+    return [
+        {
+            "postal_code": f"{i:05d}",
+            "city_name": f"{rng.choice(TOWNS)}-{rng.choice(TOWNS)} {i}",
+        }
+        for i in range(count)
+    ]
+
+
+def make_queries(rows: list[dict[str, str]], count: int) -> list[str]:
+    """Prefixes a user would type while looking for a row."""
+    rng = random.Random(1)
+    queries = []
+    for _ in range(count):
+        row = rng.choice(rows)
+        field = row["postal_code"] if rng.random() < 0.5 else row["city_name"]
+        queries.append(field[: rng.randint(2, 5)])
+    return queries
+
+
+async def _measure(
+    search: Callable[[str], Awaitable[object]], queries: list[str]
+) -> list[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        await search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def run(rows: int, queries: int, limit: int) -> None:
+    """Time both search paths on the same queries."""
+    data = make_rows(rows)
+    prefixes = make_queries(data, queries)
+    async with sqlite_database() as (_, factory):
+        async with factory() as db:
+            await postal_code.upsert_many(db, objs_in=data)
+
+            cache = PostalCodeCache(ttl=3600)
+            start = time.perf_counter()
+            await cache.load(db)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"cache load (query + index build): {elapsed_ms:.0f} ms")
+
+            paths = {
+                "prefix index": lambda q: cache.search(db, q, limit=limit),
+                "SQL LIKE": lambda q: postal_code.search(db, q, limit=limit),
+            }
+            for name, search in paths.items():
+                latencies = await _measure(search, prefixes)
+                print(
+                    f"{name:>12}: p50={percentile(latencies, 50):8.3f}ms  "
+                    f"p99={percentile(latencies, 99):8.3f}ms  "
+                    f"{len(latencies) / (sum(latencies) / 1000):9.0f} queries/s"
+                )
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=40000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    quiet_logging()
+    response_cache.enabled = False
+    asyncio.run(run(args.rows, args.queries, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure the per-request overhead of rate limiting.
+
+Times ``RateLimiter.hit`` alone for the in-process buckets (and Redis, when
+``REDIS_URL`` is set), then drives the same trivial route with and without
+the ``rate_limit`` dependency and ``RateLimitHeadersMiddleware``. The limit
+is set high enough that no request is rejected.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_rate_limit --requests 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import Depends, FastAPI
+
+from app.core.rate_limit import (
+    InMemoryTokenBuckets,
+    Rate,
+    RateLimiter,
+    RateLimitHeadersMiddleware,
+    RedisTokenBuckets,
+    TokenBucketBackend,
+    rate_limit,
+)
+from app.core.redis import close_redis, get_redis
+from benchmarks.common import LoadResult, asgi_client, drive, quiet_logging
+
+UNLIMITED = "1000000/second"
+
+
+def build_app(limited: bool) -> FastAPI:
+    """A one-route app, optionally rate limited."""
+    app = FastAPI()
+    dependencies = []
+    if limited:
+        app.add_middleware(RateLimitHeadersMiddleware)
+        dependencies.append(Depends(rate_limit("bench", UNLIMITED)))
+
+    @app.get("/item", dependencies=dependencies)
+    async def item() -> dict[str, int]:
+        return {"id": 1}
+
+    return app
+
+
+async def time_backend(backend: TokenBucketBackend, calls: int, clients: int) -> float:
+    """Mean microseconds per ``hit`` spread over ``clients`` buckets."""
+    limiter = RateLimiter(backend, prefix="bench")
+    rate = Rate.parse(UNLIMITED)
+    start = time.perf_counter()
+    for i in range(calls):
+        await limiter.hit("bench", f"ip:{i % clients}", rate)
+    elapsed = time.perf_counter() - start
+    await limiter.clear()
+    return elapsed / calls * 1e6
+
+
+async def run(requests: int, concurrency: int, clients: int, rounds: int) -> None:
+    """Time the limiter alone, then per HTTP request."""
+    backends: dict[str, TokenBucketBackend] = {
+        "memory": InMemoryTokenBuckets(max_keys=clients)
+    }
+    if get_redis() is not None:
+        backends["redis"] = RedisTokenBuckets(get_redis())
+    for name, backend in backends.items():
+        per_call = await time_backend(backend, requests, clients)
+        print(f"limiter.hit ({name:>6}): {per_call:8.1f} us/call")
+
+    # Rounds alternate between the two apps and the best of each is kept,
+    # so a noisy moment does not land on one side only
+    results: dict[bool, LoadResult] = {}
+    apps = {limited: build_app(limited) for limited in (False, True)}
+    for _ in range(rounds):
+        for limited, app in apps.items():
+            async with asgi_client(app) as client:
+                await drive(client, lambda _: "/item", requests=200, concurrency=1)
+                result = await drive(
+                    client,
+                    lambda _: "/item",
+                    requests=requests,
+                    concurrency=concurrency,
+                )
+            if limited not in results or result.rps > results[limited].rps:
+                results[limited] = result
+    for limited, result in results.items():
+        label = "rate limited" if limited else "no limit"
+        print(f"{label:>19}: {result.summary()}")
+    overhead = (1 / results[True].rps - 1 / results[False].rps) * 1e6
+    print(f"overhead per request: {overhead:.0f} us")
+    await close_redis()
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    quiet_logging()
+    asyncio.run(run(args.requests, args.concurrency, args.clients, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark cached GET endpoints with the response cache off and on.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_response_cache
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import insert
+
+from app.core.cache import response_cache
+from app.main import create_application
+from app.models.postal_code import PostalCode
+from app.models.user import User
+from benchmarks.common import (
+    asgi_client,
+    drive,
+    override_database,
+    quiet_logging,
+    sqlite_database,
+)
+
+ROWS = 200
+
+
+async def run(requests: int, concurrency: int) -> None:
+    """Seed a database and compare throughput of cached endpoints."""
+    async with sqlite_database() as (engine, factory):
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(PostalCode),
+                [
+                    {"postal_code": f"75{i:03d}", "city_name": f"Paris {i}"}
+                    for i in range(1, ROWS + 1)
+                ],
+            )
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        "email": f"user{i}@example.com",
+                        "hashed_password": "x",
+                        "postal_code_id": i,
+                    }
+                    for i in range(1, ROWS + 1)
+                ],
+            )
+
+        app = create_application()
+        override_database(app, factory)
+
+        scenarios = {
+            "user detail": lambda i: f"/api/v1/users/{i % ROWS + 1}",
+            "postal page": lambda i: f"/api/v1/postal-codes/?limit=100&skip={i % 2 * 100}",
+        }
+        async with asgi_client(app) as client:
+            for enabled in (False, True):
+                response_cache.enabled = enabled
+                await response_cache.clear()
+                label = "cache" if enabled else "no cache"
+                for name, path in scenarios.items():
+                    # Warm up so the cached run measures hits
+                    await drive(client, path, requests=ROWS, concurrency=concurrency)
+                    result = await drive(
+                        client, path, requests=requests, concurrency=concurrency
+                    )
+                    print(f"{label:>8} {name:>11}: {result.summary()}")
+
+            first = await client.get("/api/v1/postal-codes/?limit=100")
+            etag = first.headers["ETag"]
+            size = len(first.content)
+            revalidated = await client.get(
+                "/api/v1/postal-codes/?limit=100", headers={"If-None-Match": etag}
+            )
+            print(
+                f"revalidation: {size} bytes -> {len(revalidated.content)} bytes "
+                f"(status {revalidated.status_code})"
+            )
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    quiet_logging()
+    asyncio.run(run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
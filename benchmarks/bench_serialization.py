@@ -0,0 +1,136 @@
+"""Compare response serialization paths for the user and postal code lists.
+
+Measures time and peak allocations per page for:
+
+* ``fastapi``: ``response_model`` validation, ``jsonable_encoder`` and the
+  stdlib JSON encoder (the default path);
+* ``fastapi+orjson``: the same with ``ORJSONResponse`` as response class;
+* ``typeadapter``: ``ResponseSerializer``, one precompiled validate + dump.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_serialization --limits 100 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.v1.endpoints.postal_codes import (
+    PostalCodeResponse,
+    postal_code_list_serializer,
+)
+from app.api.v1.endpoints.users import UserResponse, user_list_serializer
+from app.core.serialization import ResponseSerializer
+from app.models.postal_code import PostalCode
+from app.models.user import User
+from benchmarks.common import quiet_logging
+
+
+def _users(count: int) -> list[User]:
+    return [
+        User(
+            id=i,
+            email=f"user{i}@example.com",
+            full_name=f"User {i}",
+            is_active=True,
+            address=f"{i} rue de Rivoli",
+            age=20 + i % 50,
+            postal_code_id=i % 20 + 1,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def _postal_codes(count: int) -> list[PostalCode]:
+    return [
+        PostalCode(id=i, postal_code=f"75{i:03d}", city_name=f"Paris {i}")
+        for i in range(1, count + 1)
+    ]
+
+
+def _paths(
+    model: Any, serializer: ResponseSerializer
+) -> dict[str, Callable[[list[Any]], Awaitable[bytes]]]:
+    field = create_response_field(name="response", type_=model)
+
+    async def fastapi(rows: list[Any]) -> bytes:
+        content = await serialize_response(field=field, response_content=rows)
+        return JSONResponse(content).body
+
+    async def fastapi_orjson(rows: list[Any]) -> bytes:
+        content = await serialize_response(field=field, response_content=rows)
+        return ORJSONResponse(content).body
+
+    async def typeadapter(rows: list[Any]) -> bytes:
+        return serializer.dump(rows)
+
+    return {
+        "fastapi": fastapi,
+        "fastapi+orjson": fastapi_orjson,
+        "typeadapter": typeadapter,
+    }
+
+
+async def _measure(
+    render: Callable[[list[Any]], Awaitable[bytes]], rows: list[Any], repeat: int
+) -> tuple[float, float, int]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = await render(rows)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    await render(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings) * 1000, peak / 1024, len(body)
+
+
+async def run(limits: list[int], repeat: int) -> None:
+    """Render each list page size through every path."""
+    suites = {
+        "users": (list[UserResponse], user_list_serializer, _users),
+        "postal codes": (
+            list[PostalCodeResponse],
+            postal_code_list_serializer,
+            _postal_codes,
+        ),
+    }
+    print(
+        f"{'list':>12} {'limit':>6} {'path':>15} {'ms/page':>8} "
+        f"{'pages/s':>8} {'peak KiB':>9} {'bytes':>7}"
+    )
+    for name, (model, serializer, make_rows) in suites.items():
+        paths = _paths(model, serializer)
+        for limit in limits:
+            rows = make_rows(limit)
+            for path, render in paths.items():
+                ms, peak_kib, size = await _measure(render, rows, repeat)
+                print(
+                    f"{name:>12} {limit:>6} {path:>15} {ms:>8.3f} "
+                    f"{1000 / ms:>8.0f} {peak_kib:>9.1f} {size:>7}"
+                )
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limits", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    quiet_logging()
+    asyncio.run(run(args.limits, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Measure worker cold start: import time of ``app.main`` and lifespan startup.
+
+Each sample runs in a fresh interpreter. Import time comes from
+``python -X importtime``; the slowest top-level packages are listed so
+regressions can be traced. Lifespan startup is timed for every
+``DATABASE_STARTUP_MODE`` against a temporary SQLite database stamped at the
+Alembic head.
+
+Exits with status 1 when the median import time exceeds ``--budget-ms``, so
+it can gate CI.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_startup --budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess  # nosec B404
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+LIFESPAN_SCRIPT = """
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    print(json.dumps({"import": imported - start, "lifespan": ready - imported}))
+
+asyncio.run(main())
+"""
+
+
+def _run(code: str, env: dict[str, str], *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(  # nosec B603
+        [sys.executable, *flags, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_profile(env: dict[str, str]) -> tuple[float, dict[str, float]]:
+    """Import ``app.main`` once; return total ms and ms per top-level package."""
+    stderr = _run("import app.main", env, "-X", "importtime").stderr
+    total = 0.0
+    packages: dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, name = int(match[1]), int(match[2]), match[4]
+        if name == "app.main":
+            total = cumulative_us / 1000
+        packages[name.split(".")[0]] += self_us / 1000
+    return total, packages
+
+
+def prepare_database(env: dict[str, str]) -> None:
+    """Create the schema and stamp it at the Alembic head revision."""
+    code = """
+import asyncio
+from sqlalchemy import text
+from app.db.base import engine, init_db, migration_heads
+
+async def main():
+    await init_db()
+    (head,) = migration_heads()
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32))"))
+        await conn.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": head})
+    await engine.dispose()
+
+asyncio.run(main())
+"""
+    _run(code, env)
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Path(tmp) / "startup.db"
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{database}",
+            "LOG_LEVEL": "WARNING",
+        }
+        prepare_database(env)
+
+        totals = []
+        packages: dict[str, list[float]] = defaultdict(list)
+        for _ in range(args.runs):
+            total, per_package = import_profile(env)
+            totals.append(total)
+            for name, ms in per_package.items():
+                packages[name].append(ms)
+        median_total = statistics.median(totals)
+
+        print(f"import app.main: median {median_total:.1f} ms over {args.runs} runs")
+        slowest = sorted(
+            packages.items(), key=lambda item: statistics.median(item[1]), reverse=True
+        )
+        for name, samples in slowest[: args.top]:
+            print(f"  {name:<24} {statistics.median(samples):7.1f} ms")
+
+        print("lifespan startup by DATABASE_STARTUP_MODE:")
+        for mode in ("create", "check", "skip"):
+            mode_env = {**env, "DATABASE_STARTUP_MODE": mode}
+            samples = [
+                json.loads(_run(LIFESPAN_SCRIPT, mode_env).stdout.splitlines()[-1])
+                for _ in range(args.runs)
+            ]
+            lifespan_ms = statistics.median(s["lifespan"] for s in samples) * 1000
+            print(f"  {mode:<6} {lifespan_ms:7.1f} ms")
+
+    if median_total > args.budget_ms:
+        print(f"FAIL: import time over budget ({args.budget_ms:.0f} ms)")
+        sys.exit(1)
+    print(f"OK: within budget ({args.budget_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Count SQL statements and time per user write request.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_write_queries
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+
+from sqlalchemy import event
+
+from app.crud.postal_code import postal_code
+from app.main import create_application
+from benchmarks.common import (
+    asgi_client,
+    override_database,
+    quiet_logging,
+    sqlite_database,
+)
+
+
+async def run(requests: int) -> None:
+    """Issue POST and PUT requests and report statements per request."""
+    async with sqlite_database() as (engine, factory):
+        async with factory() as db:
+            await postal_code.create(
+                db, obj_in={"postal_code": "75001", "city_name": "Paris 1er"}
+            )
+
+        statements: list[str] = []
+
+        def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+            statements.append(statement.split(None, 1)[0])
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        app = create_application()
+        override_database(app, factory)
+
+        async with asgi_client(app) as client:
+            scenarios = {
+                "POST /users/": lambda i: client.post(
+                    "/api/v1/users/",
+                    json={
+                        "email": f"user{i}@example.com",
+                        "password": "secret123",
+                        "postal_code_id": 1,
+                    },
+                ),
+                "PUT /users/{id}": lambda i: client.put(
+                    f"/api/v1/users/{i + 1}",
+                    json={"email": f"renamed{i}@example.com", "postal_code_id": 1},
+                ),
+            }
+            for name, send in scenarios.items():
+                counts: list[int] = []
+                timings: list[float] = []
+                for i in range(requests):
+                    statements.clear()
+                    start = time.perf_counter()
+                    response = await send(i)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    response.raise_for_status()
+                    counts.append(len(statements))
+                print(
+                    f"{name:>16}: {statistics.mean(counts):.2f} statements/request "
+                    f"(max {max(counts)})  p50={statistics.median(timings):.2f}ms"
+                )
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    quiet_logging()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Shared helpers for the benchmark scripts."""
+
+import asyncio
+import tempfile
+import time
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.db.base import Base, enforce_sqlite_foreign_keys, get_db
+from app.db.replicas import get_read_db
+
+
+def quiet_logging() -> None:
+    """Only log warnings so per-request log lines do not skew results."""
+    settings.LOG_LEVEL = "WARNING"
+    setup_logging()
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``samples``."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@dataclass
+class LoadResult:
+    """Outcome of driving one set of requests."""
+
+    requests: int
+    seconds: float
+    latencies_ms: list[float]
+
+    @property
+    def rps(self) -> float:
+        """Requests per second."""
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        """One-line human readable summary."""
+        return (
+            f"{self.rps:9.1f} req/s  "
+            f"p50={percentile(self.latencies_ms, 50):7.2f}ms  "
+            f"p99={percentile(self.latencies_ms, 99):7.2f}ms"
+        )
+
+    def stats(self) -> dict[str, float]:
+        """Throughput and latency percentiles, for JSON reports."""
+        return {
+            "requests": self.requests,
+            "rps": round(self.rps, 1),
+            **{
+                f"p{pct}_ms": round(percentile(self.latencies_ms, pct), 3)
+                for pct in (50, 95, 99)
+            },
+        }
+
+
+@asynccontextmanager
+async def sqlite_database(
+    path: Path | None = None,
+) -> AsyncIterator[tuple[AsyncEngine, sessionmaker]]:
+    """Create a SQLite database with the application schema."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = path or Path(tmp) / "bench.db"
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        enforce_sqlite_foreign_keys(engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            yield engine, factory
+        finally:
+            await engine.dispose()
+
+
+def override_database(app: FastAPI, factory: sessionmaker) -> None:
+    """Point the app's read and write session dependencies at ``factory``."""
+
+    async def _get_db() -> AsyncIterator[AsyncSession]:
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_read_db] = _get_db
+
+
+@asynccontextmanager
+async def asgi_client(app: FastAPI) -> AsyncIterator[httpx.AsyncClient]:
+    """In-process HTTP client for ``app`` (the lifespan is not run)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as ac:
+        yield ac
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    next_path: Callable[[int], str],
+    *,
+    requests: int,
+    concurrency: int,
+) -> LoadResult:
+    """Issue ``requests`` GETs with ``concurrency`` concurrent workers."""
+    counter = iter(range(requests))
+    latencies: list[float] = []
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            response = await client.get(next_path(i))
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return LoadResult(requests, time.perf_counter() - start, latencies)
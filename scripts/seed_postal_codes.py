@@ -1,58 +1,104 @@
-"""Seed Parisian postal codes data."""
+"""Seed postal codes data.
 
+Without arguments the 20 Parisian postal codes are seeded. Given a CSV file,
+the file is streamed into ``postal_codes`` with chunked upserts: existing
+codes get the file's city name, and rerunning the same file changes nothing.
+
+``postal_code`` is unique, so when a dataset lists several towns for one
+code (La Poste's national file does) the last one listed is kept.
+
+Running API workers find new codes at once, but keep serving a renamed
+city from their postal code cache until ``POSTAL_CODE_CACHE_TTL`` expires.
+
+Load La Poste's semicolon separated dataset::
+
+    python scripts/seed_postal_codes.py codes.csv --delimiter ';' \\
+        --postal-code-column Code_postal --city-column Nom_de_la_commune
+"""
+
+import argparse
 import asyncio
+from pathlib import Path
+
+from app.db.base import AsyncSessionLocal
+from app.services.postal_code_import import (
+    ImportProgress,
+    import_postal_codes,
+    read_postal_codes,
+)
+
+# Parisian postal codes data
+PARISIAN_POSTAL_CODES = [
+    {"postal_code": "75001", "city_name": "Paris 1er"},
+    {"postal_code": "75002", "city_name": "Paris 2e"},
+    {"postal_code": "75003", "city_name": "Paris 3e"},
+    {"postal_code": "75004", "city_name": "Paris 4e"},
+    {"postal_code": "75005", "city_name": "Paris 5e"},
+    {"postal_code": "75006", "city_name": "Paris 6e"},
+    {"postal_code": "75007", "city_name": "Paris 7e"},
+    {"postal_code": "75008", "city_name": "Paris 8e"},
+    {"postal_code": "75009", "city_name": "Paris 9e"},
+    {"postal_code": "75010", "city_name": "Paris 10e"},
+    {"postal_code": "75011", "city_name": "Paris 11e"},
+    {"postal_code": "75012", "city_name": "Paris 12e"},
+    {"postal_code": "75013", "city_name": "Paris 13e"},
+    {"postal_code": "75014", "city_name": "Paris 14e"},
+    {"postal_code": "75015", "city_name": "Paris 15e"},
+    {"postal_code": "75016", "city_name": "Paris 16e"},
+    {"postal_code": "75017", "city_name": "Paris 17e"},
+    {"postal_code": "75018", "city_name": "Paris 18e"},
+    {"postal_code": "75019", "city_name": "Paris 19e"},
+    {"postal_code": "75020", "city_name": "Paris 20e"},
+]
 
-from app.crud.postal_code import postal_code
-from app.db.base import get_db
-
-
-async def seed_postal_codes() -> None:
-    """Seed the database with Parisian postal codes."""
-    # Parisian postal codes data
-    parisian_postal_codes = [
-        {"postal_code": "75001", "city_name": "Paris 1er"},
-        {"postal_code": "75002", "city_name": "Paris 2e"},
-        {"postal_code": "75003", "city_name": "Paris 3e"},
-        {"postal_code": "75004", "city_name": "Paris 4e"},
-        {"postal_code": "75005", "city_name": "Paris 5e"},
-        {"postal_code": "75006", "city_name": "Paris 6e"},
-        {"postal_code": "75007", "city_name": "Paris 7e"},
-        {"postal_code": "75008", "city_name": "Paris 8e"},
-        {"postal_code": "75009", "city_name": "Paris 9e"},
-        {"postal_code": "75010", "city_name": "Paris 10e"},
-        {"postal_code": "75011", "city_name": "Paris 11e"},
-        {"postal_code": "75012", "city_name": "Paris 12e"},
-        {"postal_code": "75013", "city_name": "Paris 13e"},
-        {"postal_code": "75014", "city_name": "Paris 14e"},
-        {"postal_code": "75015", "city_name": "Paris 15e"},
-        {"postal_code": "75016", "city_name": "Paris 16e"},
-        {"postal_code": "75017", "city_name": "Paris 17e"},
-        {"postal_code": "75018", "city_name": "Paris 18e"},
-        {"postal_code": "75019", "city_name": "Paris 19e"},
-        {"postal_code": "75020", "city_name": "Paris 20e"},
-    ]
-
-    async for db in get_db():
+
+def print_progress(progress: ImportProgress) -> None:
+    """Print one progress line per chunk."""
+    print(
+        f"{progress.rows:>9} rows  {progress.skipped:>6} skipped  "
+        f"{progress.elapsed:7.1f}s  {progress.rows_per_second:9.0f} rows/s",
+        flush=True,
+    )
+
+
+async def seed_postal_codes(args: argparse.Namespace) -> None:
+    """Seed the database from ``args.csv``, or with Parisian postal codes."""
+    if args.csv is None:
         print("Seeding Parisian postal codes...")
+        rows = iter(PARISIAN_POSTAL_CODES)
+    else:
+        print(f"Loading postal codes from {args.csv}...")
+        rows = read_postal_codes(
+            args.csv,
+            postal_code_column=args.postal_code_column,
+            city_column=args.city_column,
+            delimiter=args.delimiter,
+            encoding=args.encoding,
+        )
+
+    async with AsyncSessionLocal() as db:
+        progress = await import_postal_codes(
+            db, rows, chunk_size=args.chunk_size, on_progress=print_progress
+        )
+
+    print(
+        f"Postal codes seeding completed: {progress.rows} rows read, "
+        f"{progress.upserted} inserted or updated, {progress.skipped} skipped, "
+        f"in {progress.elapsed:.1f}s"
+    )
+
 
-        for postal_code_data in parisian_postal_codes:
-            # Check if postal code already exists
-            existing = await postal_code.get_by_postal_code(
-                db, postal_code=postal_code_data["postal_code"]
-            )
-            if not existing:
-                await postal_code.create(db, obj_in=postal_code_data)
-                print(
-                    f"Added: {postal_code_data['postal_code']} - {postal_code_data['city_name']}"
-                )
-            else:
-                print(
-                    f"Already exists: {postal_code_data['postal_code']} - {postal_code_data['city_name']}"
-                )
-
-        print("Postal codes seeding completed!")
-        break
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("csv", type=Path, nargs="?", help="CSV file to load")
+    parser.add_argument("--postal-code-column", default="postal_code")
+    parser.add_argument("--city-column", default="city_name")
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    asyncio.run(seed_postal_codes(parser.parse_args()))
 
 
 if __name__ == "__main__":
-    asyncio.run(seed_postal_codes())
+    main()
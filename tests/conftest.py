@@ -2,17 +2,31 @@
 
 import asyncio
 from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager
+from typing import Any
 
 import pytest
 import pytest_asyncio
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-
-from app.db.base import Base
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.core.cache import response_cache
+from app.core.rate_limit import rate_limiter
+from app.db.base import Base, enforce_sqlite_foreign_keys, get_db
+from app.db.replicas import get_read_db, get_read_session_factory
 from app.main import create_application
+from app.services.postal_code_cache import postal_code_cache
+
+# Statements the SAVEPOINT-per-test fixtures emit around the test's own SQL
+TRANSACTION_CONTROL = (
+    "BEGIN",
+    "SAVEPOINT",
+    "RELEASE SAVEPOINT",
+    "ROLLBACK TO SAVEPOINT",
+)
 
 
 @pytest.fixture(scope="session")  # type: ignore
@@ -23,6 +37,14 @@ def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     loop.close()
 
 
+@pytest_asyncio.fixture(autouse=True)  # type: ignore
+async def reset_caches() -> None:
+    """Drop caches so no test sees another test's data."""
+    postal_code_cache.invalidate()
+    await response_cache.clear()
+    await rate_limiter.clear()
+
+
 @pytest.fixture  # type: ignore
 def app() -> FastAPI:
     """Create a FastAPI application for testing."""
@@ -39,42 +61,70 @@ def client(app: FastAPI) -> Generator[TestClient, None, None]:
 @pytest_asyncio.fixture  # type: ignore
 async def async_client(app: FastAPI) -> AsyncGenerator[AsyncClient, None]:
     """Create an async test client for the FastAPI application."""
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
         yield ac
 
 
-@pytest.fixture  # type: ignore
-def test_db_url() -> str:
-    """Get test database URL."""
-    return "sqlite+aiosqlite:///./test.db"
+@pytest.fixture(scope="session")  # type: ignore
+def test_db_url(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """Get test database URL.
 
+    Each pytest-xdist worker has its own base temporary directory, so
+    workers never share a database file.
+    """
+    return f"sqlite+aiosqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}"
 
-@pytest_asyncio.fixture  # type: ignore
-async def test_db_session(test_db_url: str) -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session."""
-    engine = create_async_engine(
-        test_db_url,
-        echo=False,
-    )
-
-    async_session = sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+@pytest_asyncio.fixture(scope="session")  # type: ignore
+async def test_engine(test_db_url: str) -> AsyncGenerator[AsyncEngine, None]:
+    """Create the test database schema once per session."""
+    engine = create_async_engine(test_db_url, echo=False)
+    enforce_sqlite_foreign_keys(engine)
+
+    # pysqlite's implicit transactions break SAVEPOINT; let SQLAlchemy
+    # emit BEGIN itself
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_implicit_transactions(dbapi_connection: Any, _: Any) -> None:
+        dbapi_connection.isolation_level = None
 
-    async with async_session() as session:
-        yield session
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn: Any) -> None:
+        conn.exec_driver_sql("BEGIN")
 
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield engine
 
     await engine.dispose()
 
 
+@pytest_asyncio.fixture  # type: ignore
+async def test_db_session(
+    test_engine: AsyncEngine,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Create a test database session rolled back after the test.
+
+    The test runs inside one outer transaction: commits and rollbacks in the
+    code under test release or roll back SAVEPOINTs, and everything is
+    undone at teardown.
+    """
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
 @pytest.fixture  # type: ignore
 def override_get_db(
     test_db_session: AsyncSession,
@@ -85,3 +135,47 @@ def override_get_db(
         yield test_db_session
 
     return _override_get_db  # type: ignore
+
+
+@pytest_asyncio.fixture  # type: ignore
+async def db_client(
+    app: FastAPI, override_get_db: AsyncSession, test_db_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """Create an async test client whose sessions use the test database."""
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+
+    @asynccontextmanager
+    async def _session() -> AsyncGenerator[AsyncSession, None]:
+        yield test_db_session
+
+    def _override_session_factory() -> Any:
+        return _session
+
+    app.dependency_overrides[get_read_session_factory] = _override_session_factory
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture  # type: ignore
+def executed_statements(
+    test_db_session: AsyncSession,
+) -> Generator[list[str], None, None]:
+    """Collect the SQL statements sent through the test database engine.
+
+    Transaction control added by the ``test_db_session`` SAVEPOINTs is left
+    out, so counts match what the code under test sends in production.
+    """
+    statements: list[str] = []
+    sync_engine = test_db_session.bind.sync_engine
+
+    def _record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if not statement.startswith(TRANSACTION_CONTROL):
+            statements.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(sync_engine, "before_cursor_execute", _record)
@@ -0,0 +1,233 @@
+"""Tests for admission control."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient, Response
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionControlMiddleware,
+    AdmissionGate,
+    AIMDLimit,
+)
+
+
+class SlowDatabase:
+    """Stands in for a database whose queries have slowed down."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+
+    async def query(self) -> dict[str, int]:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return {"id": 1}
+
+
+def _app(controller: AdmissionController, db: SlowDatabase) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+
+    def get_db() -> SlowDatabase:
+        return db
+
+    @app.get("/items")
+    async def read_item(db: SlowDatabase = Depends(get_db)) -> dict[str, int]:
+        return await db.query()
+
+    @app.post("/items")
+    async def write_item(db: SlowDatabase = Depends(get_db)) -> dict[str, int]:
+        return await db.query()
+
+    @app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "healthy"}
+
+    return app
+
+
+def _controller(**overrides: Any) -> AdmissionController:
+    options: dict[str, Any] = {
+        "read_limit": 2,
+        "write_limit": 1,
+        "max_queue": 1,
+        "queue_timeout": 0.05,
+        "exempt_paths": ["/health"],
+    }
+    return AdmissionController(**{**options, **overrides})
+
+
+async def _burst(app: FastAPI, count: int, method: str = "GET") -> list[Response]:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return list(
+            await asyncio.gather(
+                *(client.request(method, "/items") for _ in range(count))
+            )
+        )
+
+
+async def test_excess_requests_are_rejected_with_retry_after() -> None:
+    """Test that in-flight requests are capped and the excess gets 503."""
+    db = SlowDatabase(delay=0.2)
+    responses = await _burst(_app(_controller(), db), 5)
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 200, 503, 503, 503]
+    rejected = next(r for r in responses if r.status_code == 503)
+    assert rejected.headers["Retry-After"] == "1"
+    assert rejected.json() == {"detail": "Server busy, please retry"}
+    assert db.peak == 2
+
+
+async def test_queued_request_is_admitted_before_its_deadline() -> None:
+    """Test that a request waits in the queue for a slot to free up."""
+    db = SlowDatabase(delay=0.05)
+    controller = _controller(queue_timeout=1.0)
+    responses = await _burst(_app(controller, db), 4)
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 200, 200, 503]
+    assert controller.read.stats() == {
+        "limit": 2,
+        "in_flight": 0,
+        "queued": 0,
+        "admitted": 3,
+        "rejected": 1,
+    }
+
+
+async def test_reads_and_writes_have_separate_limits() -> None:
+    """Test that writes are admitted while reads are saturated."""
+    db = SlowDatabase(delay=0.2)
+    app = _app(_controller(), db)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        reads = [asyncio.create_task(client.get("/items")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        write = await client.post("/items")
+        health = await client.get("/health")
+        assert [r.status_code for r in await asyncio.gather(*reads)] == [200, 200]
+
+    assert write.status_code == 200
+    assert health.status_code == 200
+
+
+async def test_health_bypasses_admission_control() -> None:
+    """Test that health checks pass when every slot and queue place is taken."""
+    db = SlowDatabase(delay=0.2)
+    controller = _controller(queue_timeout=1.0)
+    app = _app(controller, db)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        reads = [asyncio.create_task(client.get("/items")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert controller.read.in_flight == 2
+        assert controller.read.queue_depth == 1
+        assert (await client.get("/items")).status_code == 503
+        assert (await client.get("/health")).status_code == 200
+        await asyncio.gather(*reads)
+
+
+async def test_cancelled_waiter_does_not_leak_a_slot() -> None:
+    """Test that a request cancelled while queued gives up its place."""
+    gate = AdmissionGate("read", limit=1, max_queue=1)
+    assert await gate.acquire(0)
+    waiter = asyncio.create_task(gate.acquire(1.0))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    gate.release()
+    assert gate.in_flight == 0
+    assert await gate.acquire(0)
+
+
+def test_aimd_limit_backs_off_and_recovers(monkeypatch: Any) -> None:
+    """Test multiplicative decrease on slow requests and additive increase."""
+    now = 100.0
+    monkeypatch.setattr("app.core.admission.time.monotonic", lambda: now)
+    limit = AIMDLimit(10, minimum=2, maximum=10, latency_target=0.25)
+
+    limit.update(1.0, in_flight=10)
+    assert limit.limit == 9
+    # Further slow completions in the same window count as one signal
+    limit.update(1.0, in_flight=9)
+    assert limit.limit == 9
+    for _ in range(20):
+        now += 1
+        limit.update(1.0, in_flight=9)
+    assert limit.limit == 2
+
+    # Fast requests only grow a limit that is being used
+    limit.update(0.01, in_flight=0)
+    assert limit.limit == 2
+    for _ in range(30):
+        limit.update(0.01, in_flight=limit.limit)
+    assert 5 <= limit.limit <= 10
+
+
+async def test_adaptive_limit_sheds_load_when_database_slows() -> None:
+    """Test that slow queries lower the adaptive limit to its minimum."""
+    db = SlowDatabase(delay=0.06)
+    controller = _controller(
+        read_limit=8,
+        max_queue=0,
+        adaptive=True,
+        min_limit=2,
+        latency_target=0.05,
+    )
+    app = _app(controller, db)
+    for _ in range(20):
+        await _burst(app, 8)
+    assert controller.read.limit == 2
+
+    db.delay = 0.001
+    for _ in range(60):
+        await _burst(app, 8)
+    assert controller.read.limit > 2
+
+
+async def test_adaptive_limit_ignores_streamed_body_time() -> None:
+    """Test that a slow streamed body neither lowers the limit nor frees its slot."""
+    controller = _controller(
+        read_limit=4, adaptive=True, min_limit=1, latency_target=0.05
+    )
+    in_flight_while_streaming: list[int] = []
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+
+    @app.get("/export")
+    async def export() -> StreamingResponse:
+        async def rows() -> AsyncIterator[bytes]:
+            for _ in range(3):
+                await asyncio.sleep(0.04)
+                in_flight_while_streaming.append(controller.read.in_flight)
+                yield b"row\n"
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for _ in range(5):
+            response = await client.get("/export")
+            assert response.text == "row\n" * 3
+
+    assert controller.read.limit == 4
+    assert set(in_flight_while_streaming) == {1}
+    assert controller.read.in_flight == 0
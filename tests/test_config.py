@@ -0,0 +1,48 @@
+"""Tests for application settings."""
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import DATABASE_POOL_PROFILES, Settings
+
+
+def test_database_pool_profile_applied() -> None:
+    """Test that unset pool settings come from the environment profile."""
+    production = Settings(ENVIRONMENT="production")
+    profile = DATABASE_POOL_PROFILES["production"]
+    assert production.DATABASE_POOL_SIZE == profile["DATABASE_POOL_SIZE"]
+    assert production.DATABASE_POOL_PRE_PING is True
+
+
+def test_database_pool_explicit_setting_wins() -> None:
+    """Test that explicit pool settings override the profile."""
+    custom = Settings(ENVIRONMENT="production", DATABASE_POOL_SIZE=3)
+    assert custom.DATABASE_POOL_SIZE == 3
+    assert custom.DATABASE_MAX_OVERFLOW == (
+        DATABASE_POOL_PROFILES["production"]["DATABASE_MAX_OVERFLOW"]
+    )
+
+
+def test_jwt_signing_keys_parsing() -> None:
+    """Test JWT_SIGNING_KEYS from a JSON object and from kid:secret pairs."""
+    from_json = Settings(JWT_SIGNING_KEYS='{"a": "secret-a", "b": "secret-b"}')
+    from_pairs = Settings(JWT_SIGNING_KEYS="a:secret-a, b:secret-b")
+    assert from_json.JWT_SIGNING_KEYS == {"a": "secret-a", "b": "secret-b"}
+    assert from_pairs.JWT_SIGNING_KEYS == from_json.JWT_SIGNING_KEYS
+
+
+def test_database_startup_mode() -> None:
+    """Test that auto checks the Alembic head only in production."""
+    assert Settings(ENVIRONMENT="production").database_startup_mode == "check"
+    assert Settings(ENVIRONMENT="development").database_startup_mode == "create"
+    explicit = Settings(ENVIRONMENT="production", DATABASE_STARTUP_MODE="skip")
+    assert explicit.database_startup_mode == "skip"
+
+
+def test_password_hash_executor_validated() -> None:
+    """Test that an unknown executor kind is rejected when settings load."""
+    assert Settings(PASSWORD_HASH_EXECUTOR="process").PASSWORD_HASH_EXECUTOR == (
+        "process"
+    )
+    with pytest.raises(ValidationError):
+        Settings(PASSWORD_HASH_EXECUTOR="procss")
@@ -0,0 +1,65 @@
+"""Tests for database startup helpers."""
+
+import subprocess  # nosec B404
+import sys
+from pathlib import Path
+
+import pytest
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.base import (
+    MIGRATIONS_DIR,
+    SchemaOutOfDateError,
+    check_schema_revision,
+    migration_heads,
+)
+
+
+async def test_check_schema_revision(tmp_path: Path) -> None:
+    """Test that startup rejects a database behind the Alembic head."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'schema.db'}")
+    try:
+        with pytest.raises(SchemaOutOfDateError):
+            await check_schema_revision(engine)
+
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("CREATE TABLE alembic_version (version_num VARCHAR(32))")
+            )
+            await conn.execute(text("INSERT INTO alembic_version VALUES ('0001')"))
+        with pytest.raises(SchemaOutOfDateError, match="0001"):
+            await check_schema_revision(engine)
+
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("UPDATE alembic_version SET version_num = 'bb20d7236d61'")
+            )
+        await check_schema_revision(engine)
+
+        # Migrated by a newer release during a rolling deploy
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("UPDATE alembic_version SET version_num = 'ffffffffffff'")
+            )
+        await check_schema_revision(engine)
+    finally:
+        await engine.dispose()
+
+
+def test_migration_heads_match_alembic() -> None:
+    """Test that the heads read from the scripts are the ones Alembic sees."""
+    config = Config("alembic.ini")
+    config.set_main_option("script_location", str(MIGRATIONS_DIR.parent))
+    assert migration_heads() == set(ScriptDirectory.from_config(config).get_heads())
+
+
+def test_alembic_not_imported_by_application() -> None:
+    """Test that Alembic stays off the worker import path."""
+    code = "import sys, app.main; print('alembic' in sys.modules)"
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
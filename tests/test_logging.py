@@ -0,0 +1,101 @@
+"""Tests for the logging pipeline."""
+
+import json
+import logging
+import queue
+
+import pytest
+import structlog
+
+from app.core import logging as app_logging
+from app.core.config import settings
+from app.core.logging import (
+    DroppingQueueHandler,
+    logging_stats,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+def test_dropping_queue_handler_counts_overflow() -> None:
+    """Test that a full queue drops records instead of blocking."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("test_dropping_queue_handler")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(5):
+            logger.warning("line %d", i)
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    assert handler.queue.get_nowait().msg == "line 0"
+
+
+def test_async_logging_writes_json_from_listener(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that queued lines are rendered as JSON and flushed on shutdown."""
+    monkeypatch.setattr(settings, "LOG_ASYNC", True)
+    monkeypatch.setattr(settings, "LOG_FORMAT", "json")
+    monkeypatch.setattr(settings, "LOG_LEVEL", "INFO")
+    setup_logging()
+    try:
+        structlog.get_logger("test").info("Queued line", answer=42)
+        assert logging_stats()["async"] is True
+    finally:
+        shutdown_logging()
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert {"event": "Queued line", "answer": 42}.items() <= lines[-1].items()
+
+
+def test_async_logging_keeps_tracebacks(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that a stdlib logger's traceback survives the queue.
+
+    Also checks that the record other handlers see keeps its ``exc_info``.
+    """
+    monkeypatch.setattr(settings, "LOG_ASYNC", True)
+    setup_logging()
+    seen: list[logging.LogRecord] = []
+    handler = logging.Handler()
+    handler.emit = seen.append  # type: ignore[method-assign]
+    root = logging.getLogger()
+    root.addHandler(handler)
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("uvicorn.error").exception(
+                "Exception in ASGI application"
+            )
+    finally:
+        root.removeHandler(handler)
+        shutdown_logging()
+
+    out = capsys.readouterr().out
+    assert "Exception in ASGI application" in out
+    assert "Traceback (most recent call last)" in out
+    assert "ValueError: boom" in out
+    assert seen[0].exc_info is not None
+
+
+def test_shutdown_logs_dropped_count(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the number of dropped records is logged on shutdown."""
+    monkeypatch.setattr(settings, "LOG_ASYNC", True)
+    monkeypatch.setattr(settings, "LOG_FORMAT", "json")
+    setup_logging()
+    handler = app_logging._handler
+    assert isinstance(handler, DroppingQueueHandler)
+    handler.dropped = 3
+    shutdown_logging()
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    expected = {"event": "Log records were dropped", "dropped": 3}
+    assert expected.items() <= lines[-1].items()
@@ -1,6 +1,12 @@
 """Tests for main application endpoints."""
 
+from typing import Any
+
 from fastapi.testclient import TestClient
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.replicas import read_router
 
 
 def test_root_endpoint(client: TestClient) -> None:
@@ -94,3 +100,18 @@ def test_create_user_endpoint(client: TestClient) -> None:
     assert data["full_name"] == user_data["full_name"]
     assert data["is_active"] == user_data["is_active"]
     assert "id" in data
+
+
+async def test_api_db_pool_endpoint(db_client: AsyncClient, monkeypatch: Any) -> None:
+    """Test the database pool status endpoint, replica pools included."""
+    replica = create_async_engine("sqlite+aiosqlite:///:memory:")
+    monkeypatch.setattr(read_router, "engines", [replica])
+    try:
+        response = await db_client.get("/api/v1/health/db-pool")
+    finally:
+        await replica.dispose()
+    assert response.status_code == 200
+    data = response.json()
+    assert "timestamp" in data
+    assert "pool_class" in data["pool"]
+    assert [pool["pool_class"] for pool in data["replicas"]] == ["StaticPool"]
@@ -0,0 +1,68 @@
+"""Tests for Prometheus metrics."""
+
+import os
+import subprocess  # nosec B404
+import sys
+from pathlib import Path
+
+from httpx import AsyncClient
+
+WORKER_SCRIPT = """
+from app.core import metrics
+
+metrics.record_cache_lookup("response", True)
+metrics.record_cache_lookup("response", False)
+metrics.REQUESTS_IN_FLIGHT.labels("GET").inc()
+"""
+
+SCRAPE_SCRIPT = """
+from app.core import metrics
+print(metrics.metrics_response().body.decode())
+"""
+
+
+async def test_metrics_endpoint_labels_route_template(db_client: AsyncClient) -> None:
+    """Test that request metrics use the route template, not the raw path."""
+    await db_client.get("/api/v1/postal-codes/123456")
+    await db_client.get("/no-such-page")
+    await db_client.request("BREW-1234", "/api/v1/postal-codes/123456")
+
+    response = await db_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/api/v1/postal-codes/{postal_code_id}"' in body
+    )
+    assert 'route="unmatched",status="404"' in body
+    assert "/123456" not in body
+    assert 'method="other"' in body
+    assert "BREW-1234" not in body
+    assert "db_query_duration_seconds" in body
+    assert "executor_queue_depth" in body
+
+
+def _run(script: str, multiproc_dir: Path) -> str:
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(multiproc_dir)}
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+def test_metrics_aggregate_across_processes(tmp_path: Path) -> None:
+    """Test that samples from several worker processes are summed."""
+    for _ in range(3):
+        _run(WORKER_SCRIPT, tmp_path)
+
+    body = _run(SCRAPE_SCRIPT, tmp_path)
+
+    assert 'cache_lookups_total{cache="response",result="hit"} 3.0' in body
+    assert 'cache_lookups_total{cache="response",result="miss"} 3.0' in body
+    assert 'http_requests_in_flight{method="GET"} 3.0' in body
@@ -0,0 +1,87 @@
+"""Tests for the precomputed OpenAPI schema."""
+
+from pathlib import Path
+from typing import Any
+
+import orjson
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.openapi import write_schema
+from app.main import create_application
+
+OPENAPI_URL = f"{settings.API_V1_STR}/openapi.json"
+
+
+async def _get(app: Any, **headers: str) -> Any:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get(OPENAPI_URL, headers=headers)
+
+
+async def test_openapi_generated_live_with_etag() -> None:
+    """Test live generation in development and revalidation with 304."""
+    app = create_application()
+
+    response = await _get(app)
+    assert response.status_code == 200
+    assert response.json()["info"]["title"] == settings.PROJECT_NAME
+    etag = response.headers["ETag"]
+
+    not_modified = await _get(app, **{"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+
+
+def _precompute(path: Path) -> None:
+    """Write the schema, marked so a served copy is told from a live one."""
+    write_schema(create_application(), path)
+    schema = orjson.loads(path.read_bytes())
+    schema["info"]["title"] = "Precomputed"
+    path.write_bytes(orjson.dumps(schema))
+
+
+async def test_openapi_served_from_precomputed_file(
+    tmp_path: Path, monkeypatch: Any
+) -> None:
+    """Test that outside development the file is served as written."""
+    schema_file = tmp_path / "openapi.json"
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    monkeypatch.setattr(settings, "OPENAPI_SCHEMA_FILE", str(schema_file))
+    _precompute(schema_file)
+
+    app = create_application()
+    response = await _get(app)
+
+    assert response.content == schema_file.read_bytes()
+    assert app.openapi()["info"]["title"] == "Precomputed"
+
+
+async def test_openapi_ignores_file_for_other_settings(
+    tmp_path: Path, monkeypatch: Any
+) -> None:
+    """Test that a schema generated with other limits is regenerated live."""
+    schema_file = tmp_path / "openapi.json"
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    monkeypatch.setattr(settings, "OPENAPI_SCHEMA_FILE", str(schema_file))
+    _precompute(schema_file)
+    monkeypatch.setattr(settings, "MAX_PAGE_SIZE", settings.MAX_PAGE_SIZE + 1)
+
+    response = await _get(create_application())
+
+    assert response.json()["info"]["title"] == settings.PROJECT_NAME
+
+
+async def test_openapi_ignores_file_for_other_version(
+    tmp_path: Path, monkeypatch: Any
+) -> None:
+    """Test that a schema built for another version is regenerated live."""
+    schema_file = tmp_path / "openapi.json"
+    schema_file.write_bytes(orjson.dumps({"info": {"version": "0.0.0-old"}}))
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    monkeypatch.setattr(settings, "OPENAPI_SCHEMA_FILE", str(schema_file))
+
+    response = await _get(create_application())
+
+    assert response.json()["info"]["version"] == settings.APP_VERSION
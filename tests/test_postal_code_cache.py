@@ -0,0 +1,191 @@
+"""Tests for the postal code reference-data cache."""
+
+from typing import Any
+
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.postal_code import postal_code
+from app.models.postal_code import PostalCode
+from app.services.postal_code_cache import PostalCodeCache, postal_code_cache
+
+
+async def test_postal_code_cache_answers_without_database(
+    test_db_session: AsyncSession, executed_statements: list[str]
+) -> None:
+    """Test that a loaded cache serves both indexes without queries."""
+    created = await postal_code.create(
+        test_db_session, obj_in={"postal_code": "75001", "city_name": "Paris 1er"}
+    )
+    cache = PostalCodeCache(ttl=300)
+    await cache.load(test_db_session)
+
+    executed_statements.clear()
+    by_id = await cache.get(test_db_session, id=created.id)
+    by_code = await cache.get_by_postal_code(test_db_session, "75001")
+    assert executed_statements == []
+    assert by_id is not None and by_id.city_name == "Paris 1er"
+    assert by_code is not None and by_code.id == created.id
+
+    # An unknown key is confirmed against the database
+    assert await cache.get(test_db_session, id=created.id + 1) is None
+    assert len(executed_statements) == 1
+    assert cache.stats() == {
+        "enabled": True,
+        "entries": 1,
+        "found": 2,
+        "not_found": 1,
+        "fallbacks": 1,
+        "loads": 1,
+    }
+
+
+async def test_postal_code_cache_invalidated_on_write(
+    test_db_session: AsyncSession,
+) -> None:
+    """Test that CRUD writes make the cache reload."""
+    cache = PostalCodeCache(ttl=300)
+    postal_code.on_change(cache.invalidate)
+    try:
+        await cache.load(test_db_session)
+        assert await cache.get_by_postal_code(test_db_session, "75002") is None
+
+        await postal_code.create(
+            test_db_session, obj_in={"postal_code": "75002", "city_name": "Paris 2e"}
+        )
+        assert cache.is_stale
+        found = await cache.get_by_postal_code(test_db_session, "75002")
+        assert found is not None and found.city_name == "Paris 2e"
+        assert cache.loads == 2
+    finally:
+        postal_code.off_change(cache.invalidate)
+
+
+async def test_postal_code_cache_finds_codes_written_elsewhere(
+    test_db_session: AsyncSession,
+) -> None:
+    """Test that codes added by another process are found before the TTL."""
+    cache = PostalCodeCache(ttl=300)
+    await cache.load(test_db_session)
+    # Written without notifying this process's cache, as another worker would
+    await test_db_session.execute(
+        insert(PostalCode), [{"postal_code": "75003", "city_name": "Paris 3e"}]
+    )
+    added = (await postal_code.get_by_postal_code(test_db_session, "75003")).id
+
+    assert await cache.get_existing_ids(test_db_session, {added, added + 1}) == {added}
+    assert cache.is_stale
+    found = await cache.get_many(test_db_session, [added, added + 1])
+    assert [row and row.postal_code for row in found] == ["75003", None]
+    assert cache.loads == 2 and cache.stats()["entries"] == 1
+
+
+async def test_postal_code_cache_ttl_refresh(test_db_session: AsyncSession) -> None:
+    """Test that a zero TTL reloads the snapshot on every lookup."""
+    cache = PostalCodeCache(ttl=0)
+    await cache.get(test_db_session, id=1)
+    await cache.get(test_db_session, id=1)
+    assert cache.loads == 2
+
+
+async def test_postal_code_search(test_db_session: AsyncSession) -> None:
+    """Test prefix search on codes and on normalized city names."""
+    await postal_code.upsert_many(
+        test_db_session,
+        objs_in=[
+            {"postal_code": "75001", "city_name": "Paris 1er"},
+            {"postal_code": "75010", "city_name": "Paris 10e"},
+            {"postal_code": "75002", "city_name": "Paris 2e"},
+            {"postal_code": "94240", "city_name": "L'Haÿ-les-Roses"},
+            {"postal_code": "01500", "city_name": "Ambérieu-en-Bugey"},
+        ],
+    )
+    cache = PostalCodeCache(ttl=300)
+
+    async def codes(query: str, limit: int = 10) -> list[str]:
+        results = await cache.search(test_db_session, query, limit=limit)
+        return [result.postal_code for result in results]
+
+    assert await codes("750") == ["75001", "75002", "75010"]
+    assert await codes("750", limit=2) == ["75001", "75002"]
+    assert await codes("paris 1") == ["75001", "75010"]  # "1er" ends the number
+    assert await codes("l hay") == ["94240"]
+    assert await codes("AMBERIEU") == ["01500"]
+    assert await codes("bugey") == ["01500"]
+    assert await codes("lyon") == []
+
+
+async def test_postal_code_search_endpoint(
+    db_client: AsyncClient, test_db_session: AsyncSession, monkeypatch: Any
+) -> None:
+    """Test the search route, with the cache and with the SQL fallback."""
+    await postal_code.upsert_many(
+        test_db_session,
+        objs_in=[
+            {"postal_code": "75001", "city_name": "Paris 1er"},
+            {"postal_code": "75002", "city_name": "Paris 2e"},
+        ],
+    )
+
+    response = await db_client.get("/api/v1/postal-codes/search", params={"q": "paris"})
+    assert response.status_code == 200
+    assert [item["postal_code"] for item in response.json()] == ["75001", "75002"]
+
+    monkeypatch.setattr(postal_code_cache, "enabled", False)
+    fallback = await db_client.get(
+        "/api/v1/postal-codes/search", params={"q": "7500", "limit": 1}
+    )
+    assert [item["postal_code"] for item in fallback.json()] == ["75001"]
+
+
+async def test_postal_code_search_endpoint_returns_all_arrondissements(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test that the default limit covers every Paris code, 1st first."""
+    await postal_code.upsert_many(
+        test_db_session,
+        objs_in=[
+            {
+                "postal_code": f"750{n:02d}",
+                "city_name": f"Paris {n}{'er' if n == 1 else 'e'}",
+            }
+            for n in range(1, 21)
+        ],
+    )
+    url = "/api/v1/postal-codes/search"
+
+    by_code = await db_client.get(url, params={"q": "750"})
+    assert [item["postal_code"] for item in by_code.json()] == [
+        f"750{n:02d}" for n in range(1, 21)
+    ]
+
+    by_name = await db_client.get(url, params={"q": "Paris 1"})
+    codes = [item["postal_code"] for item in by_name.json()]
+    assert codes[0] == "75001"
+    assert codes == ["75001"] + [f"750{n}" for n in range(10, 20)]
+
+    by_city = await db_client.get(url, params={"q": "paris"})
+    assert [item["postal_code"] for item in by_city.json()] == [
+        f"750{n:02d}" for n in range(1, 21)
+    ]
+
+
+async def test_postal_code_batch_endpoint(
+    db_client: AsyncClient, test_db_session: AsyncSession, monkeypatch: Any
+) -> None:
+    """Test batch lookups by ID and by code, cached and from the database."""
+    first = await postal_code.create(
+        test_db_session, obj_in={"postal_code": "75001", "city_name": "Paris 1er"}
+    )
+    url = "/api/v1/postal-codes/batch"
+
+    by_code = await db_client.post(url, json={"codes": ["75002", "75001"]})
+    assert [item and item["id"] for item in by_code.json()] == [None, first.id]
+
+    monkeypatch.setattr(postal_code_cache, "enabled", False)
+    by_id = await db_client.post(url, json={"ids": [first.id, first.id + 1]})
+    assert [item and item["postal_code"] for item in by_id.json()] == ["75001", None]
+
+    both = await db_client.post(url, json={"ids": [1], "codes": ["75001"]})
+    assert both.status_code == 422
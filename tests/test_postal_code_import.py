@@ -0,0 +1,88 @@
+"""Tests for the postal code CSV import."""
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.postal_code import postal_code
+from app.services.postal_code_import import (
+    ImportProgress,
+    import_postal_codes,
+    read_postal_codes,
+)
+
+
+async def test_upsert_many_inserts_and_updates(test_db_session: AsyncSession) -> None:
+    """Test that upserts insert new codes, update cities and dedupe input."""
+    await postal_code.create(
+        test_db_session, obj_in={"postal_code": "75001", "city_name": "Old name"}
+    )
+
+    count = await postal_code.upsert_many(
+        test_db_session,
+        objs_in=[
+            {"postal_code": "75001", "city_name": "Paris 1er"},
+            {"postal_code": "75002", "city_name": "First"},
+            {"postal_code": "75002", "city_name": "Paris 2e"},
+        ],
+    )
+    assert count == 2
+    unchanged = await postal_code.upsert_many(
+        test_db_session, objs_in=[{"postal_code": "75001", "city_name": "Paris 1er"}]
+    )
+    assert unchanged == 0
+
+    test_db_session.expire_all()
+    rows = {
+        row.postal_code: row.city_name
+        for row in await postal_code.get_all(test_db_session)
+    }
+    assert rows == {"75001": "Paris 1er", "75002": "Paris 2e"}
+
+
+async def test_import_postal_codes_from_csv(
+    test_db_session: AsyncSession, tmp_path: Path
+) -> None:
+    """Test a chunked, rerunnable import from a semicolon separated file."""
+    csv_file = tmp_path / "codes.csv"
+    csv_file.write_text(
+        "Code_postal;Nom_de_la_commune\n"
+        "01400;L ABERGEMENT CLEMENCIAT\n"
+        "01640;L ABERGEMENT DE VAREY\n"
+        ";MISSING CODE\n"
+        "01500;AMBERIEU EN BUGEY\n"
+    )
+
+    def rows() -> Iterator[dict[str, str]]:
+        return read_postal_codes(
+            csv_file,
+            postal_code_column="Code_postal",
+            city_column="Nom_de_la_commune",
+            delimiter=";",
+        )
+
+    reports: list[int] = []
+
+    def on_progress(progress: ImportProgress) -> None:
+        reports.append(progress.rows)
+
+    progress = await import_postal_codes(
+        test_db_session, rows(), chunk_size=2, on_progress=on_progress
+    )
+    assert (progress.rows, progress.upserted, progress.skipped) == (4, 3, 1)
+    assert reports == [2, 4]
+
+    again = await import_postal_codes(test_db_session, rows(), chunk_size=2)
+    assert again.upserted == 0
+    codes = [row.postal_code for row in await postal_code.get_all(test_db_session)]
+    assert sorted(codes) == ["01400", "01500", "01640"]
+
+
+def test_read_postal_codes_missing_column(tmp_path: Path) -> None:
+    """Test that a file without the configured columns is rejected."""
+    csv_file = tmp_path / "codes.csv"
+    csv_file.write_text("code,name\n75001,Paris\n")
+    with pytest.raises(ValueError, match="postal_code"):
+        list(read_postal_codes(csv_file))
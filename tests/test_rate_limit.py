@@ -0,0 +1,133 @@
+"""Tests for route rate limiting."""
+
+from typing import Any
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core import rate_limit as rate_limit_module
+from app.core.config import settings
+from app.core.rate_limit import (
+    InMemoryTokenBuckets,
+    Rate,
+    RateLimiter,
+    RateLimitHeadersMiddleware,
+    RedisTokenBuckets,
+    rate_limit,
+)
+from app.core.security import create_access_token
+
+
+def test_rate_parse() -> None:
+    """Test the ``<limit>/<period>`` syntax."""
+    assert Rate.parse("20/minute") == Rate(20, 60)
+    assert Rate.parse("5/ seconds") == Rate(5, 1)
+    for invalid in ("20", "20/fortnight", "0/minute", "many/hour"):
+        with pytest.raises(ValueError, match="Invalid rate limit"):
+            Rate.parse(invalid)
+
+
+async def test_in_memory_bucket_refills(monkeypatch: Any) -> None:
+    """Test that a bucket allows bursts of ``limit`` and refills over time."""
+    now = 1000.0
+    monkeypatch.setattr(rate_limit_module.time, "monotonic", lambda: now)
+    backend = InMemoryTokenBuckets(max_keys=10)
+    rate = Rate(2, 60)
+
+    assert await backend.take("a", rate) == (True, 1)
+    assert await backend.take("a", rate) == (True, 0)
+    assert await backend.take("a", rate) == (False, 0)
+    assert (await backend.take("b", rate))[0]
+
+    now += 30
+    assert await backend.take("a", rate) == (True, 0)
+    now += 3600
+    assert await backend.take("a", rate) == (True, 1)
+
+
+async def test_in_memory_bucket_evicts_least_recently_used() -> None:
+    """Test that the number of buckets stays bounded."""
+    backend = InMemoryTokenBuckets(max_keys=2)
+    for key in ("a", "b", "c"):
+        await backend.take(key, Rate(1, 60))
+    assert len(backend) == 2
+    assert await backend.take("a", Rate(1, 60)) == (True, 0)
+
+
+def _limited_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RateLimitHeadersMiddleware)
+
+    @app.post("/limited", dependencies=[Depends(rate_limit("test", "2/minute"))])
+    async def limited() -> dict[str, bool]:
+        return {"ok": True}
+
+    return app
+
+
+async def test_rate_limit_headers_and_429() -> None:
+    """Test the RateLimit headers, then 429 with Retry-After once exhausted."""
+    async with AsyncClient(
+        transport=ASGITransport(app=_limited_app()), base_url="http://test"
+    ) as client:
+        first = await client.post("/limited")
+        second = await client.post("/limited")
+        third = await client.post("/limited")
+
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Remaining"] == "1"
+    assert first.headers["RateLimit-Policy"] == "2;w=60"
+    assert second.headers["RateLimit-Remaining"] == "0"
+    assert third.status_code == 429
+    assert third.headers["RateLimit-Remaining"] == "0"
+    assert third.headers["Retry-After"] == "30"
+
+
+async def test_rate_limit_identifies_verified_clients(monkeypatch: Any) -> None:
+    """Test that token subjects and known API keys get their own buckets."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_API_KEYS", ["partner-key"])
+    identities = {
+        "token": {"Authorization": f"Bearer {create_access_token('alice')}"},
+        "api key": {"X-API-Key": "partner-key"},
+        "ip": {},
+    }
+    async with AsyncClient(
+        transport=ASGITransport(app=_limited_app()), base_url="http://test"
+    ) as client:
+        for headers in identities.values():
+            for _ in range(2):
+                assert (await client.post("/limited", headers=headers)).is_success
+
+        # Unverified credentials count against the IP address
+        for headers in ({"X-API-Key": "made-up"}, {"Authorization": "Bearer junk"}):
+            response = await client.post("/limited", headers=headers)
+            assert response.status_code == 429
+
+
+async def test_create_user_is_rate_limited(db_client: AsyncClient) -> None:
+    """Test that user creation declares its limit."""
+    response = await db_client.post(
+        "/api/v1/users/", json={"email": "one@example.com", "password": "secret123"}
+    )
+    assert response.status_code == 201
+    assert response.headers["RateLimit-Policy"] == "20;w=60"
+    assert response.headers["RateLimit-Remaining"] == "19"
+
+
+class _FailingScript:
+    async def __call__(self, **_: Any) -> Any:
+        raise ConnectionError("redis is down")
+
+
+class _FailingRedis:
+    def register_script(self, _: str) -> _FailingScript:
+        return _FailingScript()
+
+
+async def test_rate_limiter_fails_open() -> None:
+    """Test that requests are allowed when the backend is unreachable."""
+    limiter = RateLimiter(RedisTokenBuckets(_FailingRedis()), prefix="test")
+    assert await limiter.hit("scope", "ip:1.2.3.4", Rate(1, 60)) is None
+    assert limiter.stats()["errors"] == 1
@@ -0,0 +1,99 @@
+"""Tests for read replica routing."""
+
+from pathlib import Path
+
+import httpx
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.replicas import (
+    READ_PRIMARY_COOKIE,
+    ReadReplicaRouter,
+    ReadYourWritesMiddleware,
+    must_read_primary,
+    read_only,
+)
+
+
+async def _create_database(url: str, city_name: str) -> None:
+    """Create the schema and one marker row identifying the database."""
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            text(
+                "INSERT INTO postal_codes (id, postal_code, city_name, created_at,"
+                " updated_at) VALUES (1, '75001', :city, '2024-01-01',"
+                " '2024-01-01')"
+            ),
+            {"city": city_name},
+        )
+    await engine.dispose()
+
+
+async def _city_name(factory: sessionmaker) -> str:
+    async with factory() as session:
+        result = await session.execute(text("SELECT city_name FROM postal_codes"))
+        return str(result.scalar_one())
+
+
+async def test_read_router_round_robin_and_primary_fallback(tmp_path: Path) -> None:
+    """Test reads alternate across replicas and can be pinned to the primary."""
+    primary_url = f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    await _create_database(primary_url, "primary")
+    await _create_database(replica_url, "replica")
+
+    primary_engine = create_async_engine(primary_url)
+    primary = sessionmaker(primary_engine, class_=AsyncSession)
+    router = ReadReplicaRouter([replica_url, primary_url], primary)
+    try:
+        assert router.enabled
+        reads = [await _city_name(router.session_factory()) for _ in range(4)]
+        assert reads == ["replica", "primary", "replica", "primary"]
+        assert await _city_name(router.session_factory(use_primary=True)) == ("primary")
+    finally:
+        await router.dispose()
+        await primary_engine.dispose()
+
+
+def test_read_router_without_replicas_uses_primary() -> None:
+    """Test that the primary factory is used when no replica is configured."""
+    primary = object()
+    router = ReadReplicaRouter([], primary)
+    assert not router.enabled
+    assert router.session_factory() is primary
+
+
+async def test_read_your_writes_cookie() -> None:
+    """Test that writes pin the client's next reads to the primary."""
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window=5.0)
+
+    def read_primary(request: Request) -> bool:
+        return must_read_primary(request)
+
+    @app.get("/items")
+    async def read_items(primary: bool = Depends(read_primary)) -> dict[str, bool]:
+        return {"primary": primary}
+
+    @app.post("/items")
+    async def create_item() -> dict[str, str]:
+        return {"status": "created"}
+
+    @app.post("/items/lookup")
+    @read_only
+    async def lookup_items() -> list[str]:
+        return []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        assert (await ac.get("/items")).json() == {"primary": False}
+        lookup = await ac.post("/items/lookup")
+        assert READ_PRIMARY_COOKIE not in lookup.cookies
+        response = await ac.post("/items")
+        assert READ_PRIMARY_COOKIE in response.cookies
+        assert (await ac.get("/items")).json() == {"primary": True}
@@ -0,0 +1,173 @@
+"""Tests for the response cache."""
+
+from typing import Any
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import (
+    CacheBackend,
+    InMemoryLRUBackend,
+    etag_matches,
+    response_cache,
+)
+from app.core.config import settings
+from app.crud.postal_code import postal_code
+from app.models.user import User
+
+
+async def test_in_memory_backend_evicts_least_recently_used() -> None:
+    """Test LRU eviction and per-entry expiry."""
+    backend = InMemoryLRUBackend(max_entries=2)
+    await backend.set("a", b"1", ttl=60)
+    await backend.set("b", b"2", ttl=60)
+    assert await backend.get("a") == b"1"
+    await backend.set("c", b"3", ttl=60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == b"1"
+    assert await backend.get("c") == b"3"
+
+    await backend.set("d", b"4", ttl=0)
+    assert await backend.get("d") is None
+
+
+def test_etag_matching() -> None:
+    """Test If-None-Match parsing."""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"abc"', 'W/"abc", "def"')
+    assert etag_matches('"abc"', "*")
+    assert not etag_matches('"abc"', '"def"')
+    assert not etag_matches('"abc"', None)
+
+
+async def test_cached_response_etag_and_not_modified(
+    db_client: AsyncClient,
+    test_db_session: AsyncSession,
+    executed_statements: list[str],
+) -> None:
+    """Test that repeated GETs are served from cache and revalidate with 304."""
+    created = await postal_code.create(
+        test_db_session, obj_in={"postal_code": "75001", "city_name": "Paris 1er"}
+    )
+    url = f"/api/v1/postal-codes/{created.id}"
+
+    first = await db_client.get(url)
+    assert first.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    etag = first.headers["ETag"]
+
+    executed_statements.clear()
+    second = await db_client.get(url)
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert executed_statements == []
+
+    not_modified = await db_client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+
+async def test_cached_response_keeps_endpoint_headers(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test that headers set by the endpoint are replayed on a hit."""
+    for i in range(3):
+        await postal_code.create(
+            test_db_session,
+            obj_in={"postal_code": f"7500{i + 1}", "city_name": f"Paris {i + 1}"},
+        )
+
+    first = await db_client.get("/api/v1/postal-codes/", params={"limit": 2})
+    second = await db_client.get("/api/v1/postal-codes/", params={"limit": 2})
+    other = await db_client.get("/api/v1/postal-codes/", params={"limit": 3})
+
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+    assert other.headers["X-Cache"] == "MISS"
+    assert len(other.json()) == 3
+
+
+async def test_cached_user_invalidated_on_update(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test that a user update drops the cached detail response."""
+    db_user = User(email="before@example.com", hashed_password="x")  # nosec B106
+    test_db_session.add(db_user)
+    await test_db_session.commit()
+    url = f"/api/v1/users/{db_user.id}"
+
+    first = await db_client.get(url)
+    assert first.json()["email"] == "before@example.com"
+
+    response = await db_client.put(url, json={"email": "after@example.com"})
+    assert response.status_code == 200
+    # Requests share the test session; drop its identity map like a new one would
+    test_db_session.expire_all()
+
+    updated = await db_client.get(url)
+    assert updated.headers["X-Cache"] == "MISS"
+    assert updated.json()["email"] == "after@example.com"
+    assert updated.headers["ETag"] != first.headers["ETag"]
+
+
+async def test_cached_response_from_fast_serializer(
+    db_client: AsyncClient, test_db_session: AsyncSession, monkeypatch: Any
+) -> None:
+    """Test that a pre-rendered list response is cached with its headers."""
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    for i in range(3):
+        await postal_code.create(
+            test_db_session,
+            obj_in={"postal_code": f"7500{i + 1}", "city_name": f"Paris {i + 1}"},
+        )
+
+    first = await db_client.get("/api/v1/postal-codes/", params={"limit": 2})
+    second = await db_client.get("/api/v1/postal-codes/", params={"limit": 2})
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert [item["postal_code"] for item in second.json()] == ["75001", "75002"]
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+
+class _FailingBackend(CacheBackend):
+    name = "failing"
+
+    async def get(self, key: str) -> bytes | None:
+        raise ConnectionError("redis is down")
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise ConnectionError("redis is down")
+
+    async def get_counter(self, key: str) -> int:
+        raise ConnectionError("redis is down")
+
+    async def incr(self, key: str) -> int:
+        raise ConnectionError("redis is down")
+
+    async def clear(self, prefix: str) -> None:
+        raise ConnectionError("redis is down")
+
+
+async def test_cache_backend_failure_serves_uncached(
+    db_client: AsyncClient, test_db_session: AsyncSession, monkeypatch: Any
+) -> None:
+    """Test that an unreachable backend degrades to uncached responses."""
+    created = await postal_code.create(
+        test_db_session, obj_in={"postal_code": "75001", "city_name": "Paris 1er"}
+    )
+    monkeypatch.setattr(response_cache, "backend", _FailingBackend())
+    errors = response_cache.errors
+
+    for url in (
+        f"/api/v1/postal-codes/{created.id}",
+        "/api/v1/postal-codes/",
+        "/api/v1/health/detailed",
+    ):
+        response = await db_client.get(url)
+        assert response.status_code == 200, url
+        assert "X-Cache" not in response.headers
+    assert response_cache.errors == errors + 3
@@ -0,0 +1,144 @@
+"""Tests for security utilities."""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+
+from app.core import security
+from app.core.executor import BoundedExecutor, ExecutorSaturatedError
+from app.core.security import (
+    JWTKeyring,
+    VerifiedTokenCache,
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+    verify_token,
+)
+
+
+async def test_password_hash_async_roundtrip() -> None:
+    """Test hashing and verifying a password off the event loop."""
+    hashed = await get_password_hash_async("testpassword123")
+    assert hashed != "testpassword123"
+    assert await verify_password_async("testpassword123", hashed)
+    assert not await verify_password_async("wrongpassword", hashed)
+
+
+async def test_bounded_executor_rejects_when_saturated() -> None:
+    """Test that the executor sheds work beyond workers plus queue."""
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    try:
+        running = [
+            asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        assert executor.in_flight == 2
+        assert executor.queue_depth == 1
+
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(release.wait, 5)
+
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        assert executor.in_flight == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+async def test_bounded_executor_map_waits_for_capacity() -> None:
+    """Test that batch mapping preserves order and never over-submits."""
+    executor = BoundedExecutor("test", max_workers=2, max_queue=0)
+    try:
+        results = await executor.map(abs, range(-10, 0))
+        assert results == list(range(10, 0, -1))
+        assert executor.in_flight == 0
+    finally:
+        executor.shutdown()
+
+
+async def test_bounded_executor_holds_slot_of_cancelled_caller() -> None:
+    """Test that a cancelled caller's task keeps its slot until it finishes."""
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+    release = threading.Event()
+    try:
+        task = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert executor.in_flight == 1
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(release.wait, 5)
+
+        # A batch waits for the slot instead of failing or polling
+        batch = asyncio.ensure_future(executor.map(abs, [-1, -2]))
+        await asyncio.sleep(0.01)
+        assert not batch.done()
+        release.set()
+        assert await asyncio.wait_for(batch, 5) == [1, 2]
+        assert executor.in_flight == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_verify_token_uses_cache() -> None:
+    """Test that a verified token is answered from the cache."""
+    security.verified_token_cache.clear()
+    token = create_access_token("alice")
+    hits = security.verified_token_cache.hits
+
+    assert verify_token(token) == "alice"
+    assert verify_token(token) == "alice"
+    assert security.verified_token_cache.hits == hits + 1
+    assert verify_token(token[:-4] + "abcd") is None
+
+
+def test_verify_token_with_rotated_keys(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that tokens signed with any configured kid verify."""
+    security.verified_token_cache.clear()
+    old = JWTKeyring({"old": "old-secret"}, active_kid=None, algorithm="HS256")
+    monkeypatch.setattr(security, "jwt_keyring", old)
+    old_token = create_access_token("alice")
+    legacy_token = jwt.encode(
+        {"sub": "bob", "exp": datetime.utcnow() + timedelta(minutes=5)},
+        "old-secret",
+        algorithm="HS256",
+    )
+
+    rotated = JWTKeyring(
+        {"old": "old-secret", "new": "new-secret"}, active_kid="new", algorithm="HS256"
+    )
+    monkeypatch.setattr(security, "jwt_keyring", rotated)
+    new_token = create_access_token("carol")
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert verify_token(old_token) == "alice"
+    assert verify_token(legacy_token) == "bob"
+    assert verify_token(new_token) == "carol"
+
+    retired = JWTKeyring({"new": "new-secret"}, active_kid=None, algorithm="HS256")
+    monkeypatch.setattr(security, "jwt_keyring", retired)
+    security.verified_token_cache.clear()
+    assert verify_token(old_token) is None
+
+
+def test_verified_token_cache_bounded_by_exp_and_size() -> None:
+    """Test that entries expire with the token and the LRU stays bounded."""
+    cache = VerifiedTokenCache(max_entries=2, ttl=300)
+    cache.set(b"expired", "alice", exp=time.time() - 1)
+    assert cache.get(b"expired") is None
+
+    cache.set(b"a", "alice", exp=None)
+    cache.set(b"b", "bob", exp=time.time() + 60)
+    assert cache.get(b"a") == "alice"
+    cache.set(b"c", "carol", exp=None)
+    assert cache.get(b"b") is None
+    assert len(cache) == 2
@@ -0,0 +1,41 @@
+"""Tests for the precompiled response serializers."""
+
+import json
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.v1.endpoints.users import UserResponse
+from app.core.serialization import ResponseSerializer
+from app.models.user import User
+
+
+def test_serializer_matches_response_model() -> None:
+    """Test that ORM rows dump to the same JSON as response_model validation."""
+    rows = [
+        User(
+            id=i,
+            email=f"user{i}@example.com",
+            full_name=f"User {i}",
+            is_active=True,
+            address=None,
+            age=30,
+            postal_code_id=None,
+        )
+        for i in range(3)
+    ]
+    expected = jsonable_encoder(
+        [UserResponse.model_validate(row, from_attributes=True) for row in rows]
+    )
+
+    assert json.loads(ResponseSerializer(list[UserResponse]).dump(rows)) == expected
+
+
+def test_serializer_reads_unloaded_fields_through_attributes() -> None:
+    """Test that rows missing a field in their state are not misread."""
+    row = User(id=1, email="user@example.com", is_active=False)
+    assert "full_name" not in row.__dict__
+
+    data = json.loads(ResponseSerializer(UserResponse).dump(row))
+
+    assert data["is_active"] is False
+    assert data["full_name"] is None
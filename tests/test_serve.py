@@ -0,0 +1,79 @@
+"""Tests for the production server launcher."""
+
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.openapi import stored_fingerprint
+from app.serve import (
+    RecyclingServer,
+    build_config,
+    prepare_multiprocess_metrics,
+    prepare_openapi_schema,
+    worker_count,
+)
+
+
+def test_worker_count() -> None:
+    """Test explicit worker counts and CPU auto-detection."""
+    assert worker_count(3) == 3
+    assert worker_count(0) >= 1
+
+
+def test_prepare_multiprocess_metrics(tmp_path: Path, monkeypatch: Any) -> None:
+    """Test that stale sample files are removed before workers start."""
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    assert prepare_multiprocess_metrics(1) is None
+
+    directory = tmp_path / "prom"
+    directory.mkdir()
+    (directory / "counter_123.db").write_bytes(b"stale")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(directory))
+
+    assert prepare_multiprocess_metrics(4) == str(directory)
+    assert list(directory.iterdir()) == []
+
+
+def test_max_requests_jitter(monkeypatch: Any) -> None:
+    """Test that each worker adds its own jitter to the max-requests limit."""
+    monkeypatch.setattr(uvicorn.Server, "run", lambda self, sockets=None: None)
+    limits = set()
+    for _ in range(20):
+        config = uvicorn.Config("app.main:app", limit_max_requests=100)
+        RecyclingServer(config, max_requests_jitter=50).run()
+        assert config.limit_max_requests is not None
+        assert 100 <= config.limit_max_requests <= 150
+        limits.add(config.limit_max_requests)
+    assert len(limits) > 1
+
+
+def test_prepare_openapi_schema(tmp_path: Path, monkeypatch: Any) -> None:
+    """Test that a stale schema is regenerated once, before workers start."""
+    schema_file = tmp_path / "openapi.json"
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    monkeypatch.setattr(settings, "OPENAPI_SCHEMA_FILE", str(schema_file))
+
+    prepare_openapi_schema()
+    fingerprint = stored_fingerprint(schema_file)
+    assert fingerprint is not None
+    schema_file.write_bytes(b"{}")
+    prepare_openapi_schema()
+    assert schema_file.read_bytes() == b"{}"
+
+    # A deployment that overrides a limit the schema advertises
+    monkeypatch.setattr(settings, "MAX_PAGE_SIZE", settings.MAX_PAGE_SIZE + 1)
+    prepare_openapi_schema()
+    assert stored_fingerprint(schema_file) != fingerprint
+    assert schema_file.read_bytes() != b"{}"
+
+
+def test_build_config_trusts_configured_proxies(monkeypatch: Any) -> None:
+    """Test that forwarded headers are trusted from FORWARDED_ALLOW_IPS only."""
+    monkeypatch.setattr(settings, "FORWARDED_ALLOW_IPS", "10.0.0.5,10.0.0.6")
+
+    config = build_config(1)
+
+    assert config.proxy_headers is True
+    assert config.forwarded_allow_ips == "10.0.0.5,10.0.0.6"
@@ -0,0 +1,63 @@
+"""Tests for request timing and the Server-Timing header."""
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog.testing import capture_logs
+
+from app.core.timing import RequestTimingMiddleware, instrument_engine
+from app.models.user import User
+
+
+def _timing_fields(header: str) -> dict[str, str]:
+    return {part.split(";")[0].strip(): part for part in header.split(",")}
+
+
+async def test_server_timing_reports_db_and_serialization(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test that each request reports its queries, DB and serialize time."""
+    instrument_engine(test_db_session.bind)
+    test_db_session.add(User(email="user@example.com", hashed_password="x"))  # nosec
+    await test_db_session.commit()
+    # Open the test's next SAVEPOINT now so the request only sends its query
+    await test_db_session.connection()
+
+    with capture_logs() as logs:
+        response = await db_client.get("/api/v1/users/")
+
+    assert response.status_code == 200
+    fields = _timing_fields(response.headers["Server-Timing"])
+    assert set(fields) == {"total", "db", "serialize", "app"}
+    assert 'desc="1 queries"' in fields["db"]
+
+    [line] = [log for log in logs if log["event"] == "Request processed"]
+    assert line["route"] == "/api/v1/users/"
+    assert line["status_code"] == 200
+    assert line["db_queries"] == 1
+    assert line["serialize_ms"] > 0
+
+
+async def test_request_log_sampling_and_slow_threshold() -> None:
+    """Test that unsampled requests are only logged when slow."""
+    app = FastAPI()
+
+    @app.get("/ping")  # type: ignore
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    async def get(middleware: RequestTimingMiddleware) -> list[dict]:
+        async with AsyncClient(
+            transport=ASGITransport(app=middleware), base_url="http://test"
+        ) as client:
+            with capture_logs() as logs:
+                await client.get("/ping")
+        return logs
+
+    unsampled = RequestTimingMiddleware(app, sample_rate=0.0, slow_threshold_ms=1e6)
+    assert await get(unsampled) == []
+
+    slow = RequestTimingMiddleware(app, sample_rate=0.0, slow_threshold_ms=0.0)
+    [line] = await get(slow)
+    assert line["event"] == "Slow request"
+    assert line["log_level"] == "warning"
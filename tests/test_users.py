@@ -0,0 +1,362 @@
+"""Tests for user endpoints."""
+
+import csv
+import importlib
+import io
+import json
+from typing import Any
+
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.postal_code import postal_code
+from app.crud.user import user
+from app.models.postal_code import PostalCode
+from app.models.user import User
+from app.services.postal_code_cache import postal_code_cache
+
+
+async def _seed_users(db: AsyncSession, count: int) -> None:
+    db.add_all(
+        User(email=f"user{i}@example.com", hashed_password="x")  # nosec B106
+        for i in range(count)
+    )
+    await db.commit()
+
+
+async def test_users_cursor_pagination(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test walking every user page by page with the next cursor."""
+    await _seed_users(test_db_session, 5)
+
+    seen: list[int] = []
+    response = await db_client.get("/api/v1/users/", params={"limit": 2})
+    while True:
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        assert 'rel="next"' in response.headers["Link"]
+        response = await db_client.get(
+            "/api/v1/users/", params={"limit": 2, "cursor": cursor}
+        )
+
+    assert seen == sorted(seen)
+    assert len(seen) == 5
+
+
+async def test_users_offset_pagination_fallback(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test that skip/limit paging still works."""
+    await _seed_users(test_db_session, 3)
+    response = await db_client.get("/api/v1/users/", params={"skip": 1, "limit": 5})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_users_pagination_limits(db_client: AsyncClient) -> None:
+    """Test the server-side page size cap and cursor validation."""
+    response = await db_client.get(
+        "/api/v1/users/", params={"limit": settings.MAX_PAGE_SIZE + 1}
+    )
+    assert response.status_code == 422
+
+    response = await db_client.get("/api/v1/users/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+async def test_export_users_ndjson(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test streaming every user as NDJSON."""
+    await _seed_users(test_db_session, 3)
+    response = await db_client.get("/api/v1/users/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["email"] for line in lines] == [
+        f"user{i}@example.com" for i in range(3)
+    ]
+    assert "hashed_password" not in lines[0]
+
+
+async def test_export_users_csv(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test streaming every user as CSV with a header row."""
+    await _seed_users(test_db_session, 2)
+    response = await db_client.get("/api/v1/users/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 2
+    assert rows[0]["email"] == "user0@example.com"
+
+
+async def test_create_users_bulk(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test bulk creation with per-record errors."""
+    await _seed_users(test_db_session, 1)
+    code = await postal_code.create(
+        test_db_session, obj_in={"postal_code": "75001", "city_name": "Paris 1er"}
+    )
+    payload = [
+        {"email": "new1@example.com", "password": "secret123"},
+        {"email": "user0@example.com", "password": "secret123"},
+        {"email": "new2@example.com", "password": "secret123", "postal_code_id": 999},
+        {"email": "new1@example.com", "password": "secret123"},
+        {
+            "email": "new3@example.com",
+            "password": "secret123",
+            "full_name": "New",
+            "postal_code_id": code.id,
+        },
+    ]
+    response = await db_client.post("/api/v1/users/bulk", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert [u["email"] for u in data["created"]] == [
+        "new1@example.com",
+        "new3@example.com",
+    ]
+    assert data["created"][1]["full_name"] == "New"
+    assert [(e["index"], e["detail"]) for e in data["errors"]] == [
+        (1, "User with this email already exists"),
+        (2, "Invalid postal code ID"),
+        (3, "User with this email already exists"),
+    ]
+    # The postal code snapshot loaded during validation survives its rollback
+    response = await db_client.get(f"/api/v1/postal-codes/{code.id}")
+    assert response.json()["city_name"] == "Paris 1er"
+
+
+async def test_create_users_bulk_conflict_rejects_only_conflicting_rows(
+    db_client: AsyncClient, test_db_session: AsyncSession, monkeypatch: Any
+) -> None:
+    """Test that a write racing the validation only rejects its own row."""
+    await _seed_users(test_db_session, 1)
+    hashing_in_transaction: list[bool] = []
+
+    async def racing_existing_emails(db: AsyncSession, emails: list[str]) -> set[str]:
+        return set()  # user0 was created after validation read the table
+
+    async def hashes(passwords: list[str]) -> list[str]:
+        hashing_in_transaction.append(test_db_session.in_transaction())
+        return ["x"] * len(passwords)
+
+    monkeypatch.setattr(user, "get_existing_emails", racing_existing_emails)
+    monkeypatch.setattr(
+        importlib.import_module("app.crud.user"), "get_password_hashes_async", hashes
+    )
+    payload = [
+        {"email": email, "password": "secret123"}
+        for email in ("new1@example.com", "user0@example.com", "new2@example.com")
+    ]
+    response = await db_client.post("/api/v1/users/bulk", json=payload)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [u["email"] for u in data["created"]] == [
+        "new1@example.com",
+        "new2@example.com",
+    ]
+    assert [(e["index"], e["detail"]) for e in data["errors"]] == [
+        (1, "User with this email already exists"),
+    ]
+    assert hashing_in_transaction == [False]
+
+
+async def test_create_user_single_statement(
+    db_client: AsyncClient, executed_statements: list[str]
+) -> None:
+    """Test that creating a user is one INSERT ... RETURNING."""
+    payload = {"email": "one@example.com", "password": "secret123"}
+    response = await db_client.post("/api/v1/users/", json=payload)
+    assert response.status_code == 201
+    assert response.json()["email"] == "one@example.com"
+    assert len(executed_statements) == 1
+    assert executed_statements[0].startswith("INSERT INTO users")
+
+    response = await db_client.post("/api/v1/users/", json=payload)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with this email already exists"
+
+
+async def test_user_writes_check_postal_code_with_foreign_key(
+    db_client: AsyncClient, test_db_session: AsyncSession
+) -> None:
+    """Test that postal codes are validated by the database, not the cache."""
+    await postal_code_cache.load(test_db_session)
+    # Added without notifying this process's cache, as another worker would
+    await test_db_session.execute(
+        insert(PostalCode), [{"postal_code": "75001", "city_name": "Paris 1er"}]
+    )
+    code = await postal_code.get_by_postal_code(test_db_session, "75001")
+    assert code is not None
+
+    payload = {"email": "one@example.com", "password": "secret123"}
+    response = await db_client.post(
+        "/api/v1/users/", json={**payload, "postal_code_id": code.id}
+    )
+    assert response.status_code == 201
+    user_id = response.json()["id"]
+
+    invalid = {**payload, "email": "two@example.com", "postal_code_id": 999}
+    for response in (
+        await db_client.post("/api/v1/users/", json=invalid),
+        await db_client.put(f"/api/v1/users/{user_id}", json=invalid),
+    ):
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid postal code ID"
+
+
+async def test_update_user_single_statement(
+    db_client: AsyncClient,
+    test_db_session: AsyncSession,
+    executed_statements: list[str],
+) -> None:
+    """Test that updating a user is one UPDATE ... RETURNING."""
+    await _seed_users(test_db_session, 2)
+    executed_statements.clear()
+
+    response = await db_client.put(
+        "/api/v1/users/1", json={"email": "renamed@example.com", "age": 42}
+    )
+    assert response.status_code == 200
+    assert response.json()["age"] == 42
+    assert len(executed_statements) == 1
+    assert executed_statements[0].startswith("UPDATE users")
+
+    response = await db_client.put(
+        "/api/v1/users/2", json={"email": "renamed@example.com"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with this email already exists"
+
+    response = await db_client.put(
+        "/api/v1/users/999", json={"email": "missing@example.com"}
+    )
+    assert response.status_code == 404
+
+
+async def test_users_fast_json_matches_default(
+    db_client: AsyncClient, test_db_session: AsyncSession, monkeypatch: Any
+) -> None:
+    """Test that the precompiled serializer renders the same page and headers."""
+    await _seed_users(test_db_session, 3)
+    default = await db_client.get("/api/v1/users/", params={"limit": 2})
+
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = await db_client.get("/api/v1/users/", params={"limit": 2})
+
+    assert fast.status_code == 200
+    assert fast.json() == default.json()
+    assert fast.headers["X-Next-Cursor"] == default.headers["X-Next-Cursor"]
+    assert fast.headers["Link"] == default.headers["Link"]
+
+
+async def test_users_batch_lookup(
+    db_client: AsyncClient,
+    test_db_session: AsyncSession,
+    executed_statements: list[str],
+) -> None:
+    """Test that a batch lookup is one query, in request order, with nulls."""
+    await _seed_users(test_db_session, 3)
+    ids = [3, 999, 1, 3]
+
+    executed_statements.clear()
+    response = await db_client.post("/api/v1/users/batch", json={"ids": ids})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item and item["id"] for item in body] == [3, None, 1, 3]
+    assert len(executed_statements) == 1
+
+    too_many = {"ids": list(range(settings.BATCH_LOOKUP_MAX_ITEMS + 1))}
+    response = await db_client.post("/api/v1/users/batch", json=too_many)
+    assert response.status_code == 422
+
+
+async def test_users_include_postal_code_bounded_queries(
+    db_client: AsyncClient,
+    test_db_session: AsyncSession,
+    executed_statements: list[str],
+) -> None:
+    """Test that a page of 100 users embeds postal codes in two queries."""
+    codes = [
+        PostalCode(postal_code=f"7500{i}", city_name=f"Paris {i}") for i in range(5)
+    ]
+    test_db_session.add_all(codes)
+    await test_db_session.flush()
+    test_db_session.add_all(
+        User(
+            email=f"user{i}@example.com",
+            hashed_password="x",  # nosec B106
+            postal_code_id=codes[i % 5].id if i % 10 else None,
+        )
+        for i in range(100)
+    )
+    await test_db_session.commit()
+    test_db_session.expire_all()
+
+    executed_statements.clear()
+    response = await db_client.get(
+        "/api/v1/users/", params={"limit": 100, "include": "postal_code"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == 100
+    assert body[0]["postal_code"] is None
+    assert body[1]["postal_code"] == {
+        "id": codes[1].id,
+        "postal_code": "75001",
+        "city_name": "Paris 1",
+    }
+    assert len(executed_statements) == 2
+
+    plain = await db_client.get("/api/v1/users/", params={"limit": 1})
+    assert "postal_code" not in plain.json()[0]
+
+
+async def test_user_detail_include_postal_code(
+    db_client: AsyncClient,
+    test_db_session: AsyncSession,
+    executed_statements: list[str],
+) -> None:
+    """Test that a user embeds its postal code in one query, kept fresh."""
+    code = PostalCode(postal_code="75001", city_name="Paris 1er")
+    test_db_session.add(code)
+    await test_db_session.flush()
+    test_db_session.add(
+        User(
+            email="one@example.com",
+            hashed_password="x",  # nosec B106
+            postal_code_id=code.id,
+        )
+    )
+    await test_db_session.commit()
+    test_db_session.expire_all()
+
+    executed_statements.clear()
+    response = await db_client.get("/api/v1/users/1", params={"include": "postal_code"})
+    assert response.status_code == 200
+    assert response.json()["postal_code"]["city_name"] == "Paris 1er"
+    assert len(executed_statements) == 1
+
+    response = await db_client.get("/api/v1/users/1", params={"include": "addresses"})
+    assert response.status_code == 422
+
+    await postal_code.update(
+        test_db_session, db_obj=code, obj_in={"city_name": "Paris Centre"}
+    )
+    test_db_session.expire_all()
+    response = await db_client.get("/api/v1/users/1", params={"include": "postal_code"})
+    assert response.json()["postal_code"]["city_name"] == "Paris Centre"